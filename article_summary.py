@@ -0,0 +1,240 @@
+"""
+Resumen Desnormalizado de Artículos
+Tabla article_summaries con una fila por publicación activa: título, resumen y autores
+ya limpios, submission_id, contexto y fechas. Se mantiene de forma incremental con
+PublicationChangeTracker, así los lectores leen una fila indexada en lugar de repetir
+los JOIN sobre publication_settings, authors y author_settings con GROUP_CONCAT
+"""
+
+import re
+import html
+from datetime import datetime
+
+from change_tracker import PublicationChangeTracker, STATE_BATCH_SIZE
+
+SUMMARY_TABLE = 'article_summaries'
+
+# Caracteres del resumen que se guardan como vista previa
+ABSTRACT_PREVIEW_LENGTH = 200
+
+# Campos cuyo cambio actualiza la fila del resumen
+SUMMARY_FIELDS = (
+    'submission_id', 'context_id', 'date_published', 'title', 'abstract',
+    'authors', 'affiliations', 'category_ids'
+)
+
+def clean_html_text(text):
+    """Decodificar entidades, quitar etiquetas HTML y espacios extra"""
+    if not text:
+        return ''
+    text = html.unescape(text)
+    text = re.sub(r'<[^>]+>', ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+def clean_authors(authors_text):
+    """
+    Normalizar la lista de autores 'Nombre Apellido; ...' sin duplicados ni vacíos
+    Conserva el respaldo (email o 'Autor desconocido'); los lectores deciden si lo muestran
+    """
+    if not authors_text:
+        return ''
+    authors = []
+    for author in authors_text.split(';'):
+        author = re.sub(r'\s+', ' ', author).strip()
+        if author and author not in authors:
+            authors.append(author)
+    return '; '.join(authors)
+
+# ================================
+# TABLA DE RESUMEN
+# ================================
+
+def create_summary_table(cursor):
+    """CREATE TABLE IF NOT EXISTS de article_summaries (también lo usa el esquema de la API)"""
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {SUMMARY_TABLE} (
+            publication_id BIGINT NOT NULL PRIMARY KEY,
+            submission_id BIGINT NOT NULL,
+            context_id BIGINT NULL,
+            status TINYINT NOT NULL DEFAULT 3,
+            date_published DATE NULL,
+            last_modified DATETIME NULL,
+            title TEXT NOT NULL,
+            abstract MEDIUMTEXT,
+            abstract_preview VARCHAR({ABSTRACT_PREVIEW_LENGTH * 2}),
+            authors TEXT,
+            affiliations TEXT,
+            category_ids VARCHAR(255),
+            updated_at DATETIME NOT NULL,
+
+            INDEX idx_status_date (status, date_published),
+            INDEX idx_submission (submission_id),
+            INDEX idx_context (context_id),
+            INDEX idx_updated (updated_at)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+
+class ArticleSummaryStore:
+    """Mantiene article_summaries sincronizada con las publicaciones de OJS"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.tracker = PublicationChangeTracker(
+            connection, consumer='article_summary', hash_fields=SUMMARY_FIELDS
+        )
+
+    def ensure_table(self):
+        """
+        Crear la tabla de resumen si no existe; devuelve True si está vacía
+        (recién creada aquí o por el esquema de la API) y hay que llenarla completa
+        """
+        with self.connection.cursor() as cursor:
+            create_summary_table(cursor)
+            cursor.execute(f"SELECT 1 FROM {SUMMARY_TABLE} LIMIT 1")
+            empty = cursor.fetchone() is None
+        self.connection.commit()
+        return empty
+
+    def fetch_source_records(self, publication_ids):
+        """
+        Leer desde las tablas EAV de OJS solo las publicaciones indicadas y limpiarlas
+        Es el único lugar que arma título, resumen y autores con JOIN + GROUP_CONCAT
+        """
+        if not publication_ids:
+            return {}
+
+        publication_ids = list(publication_ids)
+        records = {}
+        with self.connection.cursor() as cursor:
+            for start in range(0, len(publication_ids), STATE_BATCH_SIZE):
+                batch = publication_ids[start:start + STATE_BATCH_SIZE]
+                cursor.execute(f"""
+                    SELECT
+                        p.publication_id,
+                        p.submission_id,
+                        s.context_id,
+                        p.date_published,
+                        p.last_modified,
+
+                        COALESCE(ps_title_es.setting_value, ps_title_en.setting_value, 'Sin título') as title,
+                        COALESCE(ps_abstract_es.setting_value, ps_abstract_en.setting_value, '') as abstract,
+
+                        GROUP_CONCAT(DISTINCT COALESCE(
+                            NULLIF(TRIM(CONCAT(
+                                COALESCE(aus_fname.setting_value, ''), ' ',
+                                COALESCE(aus_lname.setting_value, '')
+                            )), ''),
+                            a.email,
+                            'Autor desconocido'
+                        ) SEPARATOR '; ') as authors,
+
+                        GROUP_CONCAT(DISTINCT aus_affiliation.setting_value SEPARATOR '; ') as affiliations,
+                        GROUP_CONCAT(DISTINCT pc.category_id) as category_ids
+
+                    FROM publications p
+                    JOIN submissions s ON p.submission_id = s.submission_id
+
+                    LEFT JOIN publication_settings ps_title_es ON p.publication_id = ps_title_es.publication_id
+                        AND ps_title_es.setting_name = 'title' AND ps_title_es.locale = 'es'
+                    LEFT JOIN publication_settings ps_title_en ON p.publication_id = ps_title_en.publication_id
+                        AND ps_title_en.setting_name = 'title' AND ps_title_en.locale = 'en'
+                    LEFT JOIN publication_settings ps_abstract_es ON p.publication_id = ps_abstract_es.publication_id
+                        AND ps_abstract_es.setting_name = 'abstract' AND ps_abstract_es.locale = 'es'
+                    LEFT JOIN publication_settings ps_abstract_en ON p.publication_id = ps_abstract_en.publication_id
+                        AND ps_abstract_en.setting_name = 'abstract' AND ps_abstract_en.locale = 'en'
+
+                    LEFT JOIN authors a ON p.publication_id = a.publication_id
+                    LEFT JOIN author_settings aus_fname ON a.author_id = aus_fname.author_id
+                        AND aus_fname.setting_name = 'givenName'
+                    LEFT JOIN author_settings aus_lname ON a.author_id = aus_lname.author_id
+                        AND aus_lname.setting_name = 'familyName'
+                    LEFT JOIN author_settings aus_affiliation ON a.author_id = aus_affiliation.author_id
+                        AND aus_affiliation.setting_name = 'affiliation'
+
+                    LEFT JOIN publication_categories pc ON p.publication_id = pc.publication_id
+
+                    WHERE p.status = 3
+                    AND p.publication_id IN ({', '.join(['%s'] * len(batch))})
+                    GROUP BY p.publication_id, p.submission_id, s.context_id, p.date_published, p.last_modified
+                """, tuple(batch))
+
+                for row in cursor.fetchall():
+                    abstract = clean_html_text(row['abstract'])
+                    records[row['publication_id']] = {
+                        'publication_id': row['publication_id'],
+                        'submission_id': row['submission_id'],
+                        'context_id': row['context_id'],
+                        'date_published': row['date_published'],
+                        'last_modified': row['last_modified'],
+                        'title': clean_html_text(row['title']) or 'Sin título',
+                        'abstract': abstract,
+                        'abstract_preview': abstract[:ABSTRACT_PREVIEW_LENGTH],
+                        'authors': clean_authors(row['authors']),
+                        'affiliations': row['affiliations'] or '',
+                        'category_ids': row['category_ids'] or ''
+                    }
+        return records
+
+    def refresh(self, full_scan=False):
+        """
+        Aplicar a article_summaries solo las publicaciones nuevas, modificadas o
+        despublicadas desde la última actualización. Devuelve el delta aplicado
+        full_scan (o una tabla vacía) reconstruye todas las filas
+        """
+        if self.ensure_table() or full_scan:
+            self.tracker.reset()
+            full_scan = True
+
+        changes = self.tracker.detect_changes(self.fetch_source_records, full_scan=full_scan)
+        if not self.tracker.has_changes(changes):
+            self.tracker.commit(changes)
+            return changes
+
+        updated_at = datetime.now()
+        rows = [
+            (
+                record['publication_id'], record['submission_id'], record['context_id'],
+                record['date_published'], record['last_modified'], record['title'],
+                record['abstract'], record['abstract_preview'], record['authors'],
+                record['affiliations'], record['category_ids'], updated_at
+            )
+            for record in list(changes['new'].values()) + list(changes['modified'].values())
+        ]
+
+        with self.connection.cursor() as cursor:
+            for start in range(0, len(rows), STATE_BATCH_SIZE):
+                cursor.executemany(f"""
+                    INSERT INTO {SUMMARY_TABLE}
+                    (publication_id, submission_id, context_id, date_published, last_modified,
+                     title, abstract, abstract_preview, authors, affiliations, category_ids, updated_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                    submission_id = VALUES(submission_id),
+                    context_id = VALUES(context_id),
+                    date_published = VALUES(date_published),
+                    last_modified = VALUES(last_modified),
+                    title = VALUES(title),
+                    abstract = VALUES(abstract),
+                    abstract_preview = VALUES(abstract_preview),
+                    authors = VALUES(authors),
+                    affiliations = VALUES(affiliations),
+                    category_ids = VALUES(category_ids),
+                    updated_at = VALUES(updated_at)
+                """, rows[start:start + STATE_BATCH_SIZE])
+
+            removed = changes['removed']
+            for start in range(0, len(removed), STATE_BATCH_SIZE):
+                batch = removed[start:start + STATE_BATCH_SIZE]
+                cursor.execute(f"""
+                    DELETE FROM {SUMMARY_TABLE}
+                    WHERE publication_id IN ({', '.join(['%s'] * len(batch))})
+                """, tuple(batch))
+
+        self.connection.commit()
+        self.tracker.commit(changes)
+        print(f"🗂️ {SUMMARY_TABLE}: {len(rows)} filas actualizadas, {len(changes['removed'])} eliminadas")
+        return changes
+
+def refresh_article_summaries(connection, full_scan=False):
+    """Actualizar article_summaries con los cambios de OJS desde la última corrida"""
+    return ArticleSummaryStore(connection).refresh(full_scan=full_scan)
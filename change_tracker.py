@@ -0,0 +1,250 @@
+"""
+Detección de Cambios en Publicaciones
+Registra por consumidor una marca de agua (publications.last_modified) y el hash
+del contenido limpio de cada artículo, para que cada corrida procese solo las
+publicaciones nuevas, modificadas o despublicadas desde la corrida anterior
+"""
+
+import os
+import hashlib
+from datetime import datetime
+
+from model_snapshot import (
+    DEFAULT_SNAPSHOT_DIR, current_generation, generation_dir,
+    load_engine_snapshot, publish_generation, save_engine_snapshot
+)
+from recommendation_engine import OJSRecommendationEngine
+
+# Campos limpios que definen el contenido de un artículo
+CONTENT_HASH_FIELDS = ('title', 'abstract', 'authors')
+
+# Filas por lote al guardar el estado de hashes
+STATE_BATCH_SIZE = 1000
+
+def compute_record_hash(record, fields=CONTENT_HASH_FIELDS):
+    """Hash SHA-256 de los campos limpios de un artículo"""
+    digest = hashlib.sha256()
+    for field in fields:
+        digest.update(str(record.get(field) or '').encode('utf-8'))
+        digest.update(b'\x1f')
+    return digest.hexdigest()
+
+# ================================
+# RASTREADOR DE CAMBIOS
+# ================================
+
+class PublicationChangeTracker:
+    """
+    Encuentra publicaciones nuevas, modificadas o despublicadas desde la última corrida
+    Cada consumidor (motor, calculadora, ...) mantiene su propia marca de agua y hashes
+    source_table/modified_column indican de dónde se leen las publicaciones activas
+    (status = 3) y su fecha de modificación; hash_fields, qué campos definen el contenido
+    """
+
+    def __init__(self, connection, consumer='default', source_table='publications',
+                 modified_column='last_modified', hash_fields=CONTENT_HASH_FIELDS):
+        self.connection = connection
+        self.consumer = consumer
+        self.source_table = source_table
+        self.modified_column = modified_column
+        self.hash_fields = hash_fields
+
+    def ensure_tables(self):
+        """Crear tablas de estado si no existen"""
+        with self.connection.cursor() as cursor:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS publication_change_state (
+                    consumer VARCHAR(64) NOT NULL,
+                    publication_id BIGINT NOT NULL,
+                    content_hash CHAR(64) NOT NULL,
+                    last_modified DATETIME NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                    PRIMARY KEY (consumer, publication_id)
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+            """)
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS publication_change_watermarks (
+                    consumer VARCHAR(64) NOT NULL PRIMARY KEY,
+                    watermark DATETIME NULL,
+                    last_run_at DATETIME NOT NULL,
+                    new_count INT DEFAULT 0,
+                    modified_count INT DEFAULT 0,
+                    removed_count INT DEFAULT 0
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+            """)
+        self.connection.commit()
+
+    def get_watermark(self):
+        """Marca de agua de la última corrida confirmada; None si nunca corrió"""
+        with self.connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT watermark FROM publication_change_watermarks WHERE consumer = %s
+            """, (self.consumer,))
+            row = cursor.fetchone()
+            return row['watermark'] if row else None
+
+    def detect_changes(self, load_records, full_scan=False):
+        """
+        Calcular el delta desde la última corrida
+        load_records(publication_ids) -> {publication_id: registro limpio}
+        Solo se cargan las publicaciones nuevas o con last_modified posterior a la
+        marca de agua (todas si full_scan o si no hay marca); un cambio en
+        last_modified sin cambio de contenido no cuenta como modificación
+        """
+        self.ensure_tables()
+        watermark = None if full_scan else self.get_watermark()
+
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"""
+                SELECT publication_id, {self.modified_column} AS last_modified
+                FROM {self.source_table} WHERE status = 3
+            """)
+            published = {row['publication_id']: row['last_modified'] for row in cursor.fetchall()}
+
+            cursor.execute("""
+                SELECT publication_id, content_hash FROM publication_change_state WHERE consumer = %s
+            """, (self.consumer,))
+            known_hashes = {row['publication_id']: row['content_hash'] for row in cursor.fetchall()}
+
+        candidates = [
+            pub_id for pub_id, last_modified in published.items()
+            if watermark is None or pub_id not in known_hashes
+            or (last_modified is not None and last_modified > watermark)
+        ]
+        records = load_records(candidates) if candidates else {}
+
+        new, modified, hashes = {}, {}, {}
+        for pub_id, record in records.items():
+            content_hash = compute_record_hash(record, self.hash_fields)
+            hashes[pub_id] = content_hash
+            if pub_id not in known_hashes:
+                new[pub_id] = record
+            elif known_hashes[pub_id] != content_hash:
+                modified[pub_id] = record
+
+        # Despublicadas, o que dejaron de cumplir el filtro del cargador (p. ej. sin título)
+        removed = set(known_hashes) - set(published)
+        removed.update(pub_id for pub_id in candidates if pub_id in known_hashes and pub_id not in records)
+
+        modified_dates = [value for value in published.values() if value is not None]
+        changes = {
+            'new': new,
+            'modified': modified,
+            'removed': sorted(removed),
+            'hashes': hashes,
+            'last_modified': {pub_id: published.get(pub_id) for pub_id in hashes},
+            'watermark': max(modified_dates) if modified_dates else watermark,
+            'candidates': len(candidates)
+        }
+
+        print(f"🔎 Cambios [{self.consumer}]: {len(new)} nuevos, {len(modified)} modificados, "
+              f"{len(changes['removed'])} eliminados ({len(candidates)} revisados de {len(published)})")
+        return changes
+
+    def has_changes(self, changes):
+        return bool(changes['new'] or changes['modified'] or changes['removed'])
+
+    def commit(self, changes):
+        """
+        Confirmar el delta ya procesado: guardar hashes, borrar eliminados y avanzar la marca de agua
+        Llamar solo después de que los consumidores aplicaron el delta con éxito
+        """
+        rows = [
+            (self.consumer, pub_id, content_hash, changes['last_modified'].get(pub_id))
+            for pub_id, content_hash in changes['hashes'].items()
+        ]
+
+        with self.connection.cursor() as cursor:
+            for start in range(0, len(rows), STATE_BATCH_SIZE):
+                cursor.executemany("""
+                    INSERT INTO publication_change_state
+                    (consumer, publication_id, content_hash, last_modified)
+                    VALUES (%s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                    content_hash = VALUES(content_hash),
+                    last_modified = VALUES(last_modified)
+                """, rows[start:start + STATE_BATCH_SIZE])
+
+            removed = changes['removed']
+            for start in range(0, len(removed), STATE_BATCH_SIZE):
+                batch = removed[start:start + STATE_BATCH_SIZE]
+                cursor.execute(f"""
+                    DELETE FROM publication_change_state
+                    WHERE consumer = %s AND publication_id IN ({', '.join(['%s'] * len(batch))})
+                """, (self.consumer, *batch))
+
+            cursor.execute("""
+                INSERT INTO publication_change_watermarks
+                (consumer, watermark, last_run_at, new_count, modified_count, removed_count)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                watermark = VALUES(watermark),
+                last_run_at = VALUES(last_run_at),
+                new_count = VALUES(new_count),
+                modified_count = VALUES(modified_count),
+                removed_count = VALUES(removed_count)
+            """, (
+                self.consumer,
+                changes['watermark'],
+                datetime.now(),
+                len(changes['new']),
+                len(changes['modified']),
+                len(removed)
+            ))
+
+        self.connection.commit()
+
+    def reset(self):
+        """Olvidar el estado del consumidor; la próxima corrida hará un escaneo completo"""
+        self.ensure_tables()
+        with self.connection.cursor() as cursor:
+            cursor.execute("DELETE FROM publication_change_state WHERE consumer = %s", (self.consumer,))
+            cursor.execute("DELETE FROM publication_change_watermarks WHERE consumer = %s", (self.consumer,))
+        self.connection.commit()
+
+# ================================
+# ACTUALIZACIÓN INCREMENTAL DEL MOTOR
+# ================================
+
+def refresh_engine_snapshot(connection, snapshot_dir=DEFAULT_SNAPSHOT_DIR):
+    """
+    Aplicar al snapshot publicado del motor solo las publicaciones que cambiaron
+    Sin snapshot previo se construye completo y se registra la línea base de hashes
+    El motor lee de article_summaries, así que primero se actualiza ese resumen y el
+    delta del motor se calcula sobre él
+    Devuelve el delta aplicado, o None si falló
+    """
+    from article_summary import SUMMARY_TABLE, refresh_article_summaries
+
+    refresh_article_summaries(connection)
+
+    engine_root = os.path.join(snapshot_dir, 'ojs_engine')
+    tracker = PublicationChangeTracker(
+        connection, consumer='ojs_engine', source_table=SUMMARY_TABLE, modified_column='updated_at'
+    )
+    engine = OJSRecommendationEngine(connection)
+
+    generation = current_generation(engine_root)
+    has_snapshot = generation is not None and load_engine_snapshot(engine, generation_dir(engine_root, generation))
+
+    if has_snapshot:
+        changes = tracker.detect_changes(engine.fetch_article_records)
+        if tracker.has_changes(changes):
+            changed_articles = dict(changes['new'])
+            changed_articles.update(changes['modified'])
+            if not engine.update_articles(changed_articles, changes['removed']):
+                return None
+            publish_generation(engine_root, lambda path: save_engine_snapshot(engine, path))
+    else:
+        # Sin snapshot el estado guardado no describe ningún modelo: escaneo completo
+        tracker.reset()
+        changes = tracker.detect_changes(engine.fetch_article_records, full_scan=True)
+        engine.articles_data = dict(changes['new'])
+        engine.articles_data.update(changes['modified'])
+        if not engine.build_similarity_matrix():
+            return None
+        publish_generation(engine_root, lambda path: save_engine_snapshot(engine, path))
+
+    tracker.commit(changes)
+    return changes
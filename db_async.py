@@ -0,0 +1,125 @@
+"""
+Acceso Asíncrono a Base de Datos
+Pool aiomysql para los endpoints de lectura async: mientras MySQL responde, el
+worker atiende otras peticiones en lugar de retener un hilo del threadpool
+Si aiomysql no está instalado, no conecta o ASYNC_DB_CONFIG['enabled'] es False,
+las mismas llamadas se ejecutan con el pool síncrono en hilos (asyncio.to_thread),
+que equivale al camino síncrono anterior y sirve para comparar rendimiento
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+try:
+    import aiomysql
+except ImportError:
+    aiomysql = None
+
+ASYNC_DB_CONFIG = {
+    'enabled': True,
+    'minsize': 1,
+    'maxsize': 20,          # Conexiones async abiertas como máximo
+    'pool_recycle': 3600,   # Segundos de vida antes de reciclar una conexión
+    'connect_timeout': 10
+}
+
+class _ThreadCursor:
+    """Cursor pymysql del pool síncrono con la misma interfaz awaitable que aiomysql"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    async def execute(self, query, args=None):
+        return await asyncio.to_thread(self._cursor.execute, query, args)
+
+    async def fetchone(self):
+        return await asyncio.to_thread(self._cursor.fetchone)
+
+    async def fetchall(self):
+        return await asyncio.to_thread(self._cursor.fetchall)
+
+class AsyncConnectionPool:
+    """
+    Pool async de solo lectura (autocommit) con respaldo en hilos sobre el pool síncrono
+    Uso: async with async_db.cursor() as cursor: await cursor.execute(...)
+    """
+
+    def __init__(self, db_config, sync_pool, config=None):
+        self.db_config = db_config
+        self.sync_pool = sync_pool
+        self.config = dict(ASYNC_DB_CONFIG, **(config or {}))
+        self._pool = None
+
+    @property
+    def backend(self):
+        return 'aiomysql' if self._pool is not None else 'threadpool'
+
+    async def start(self):
+        """
+        Crear el pool aiomysql; ante cualquier problema queda el respaldo en hilos
+        Devuelve False solo si aiomysql no pudo conectar (vale la pena reintentar)
+        """
+        if self._pool is not None or not self.config['enabled']:
+            return True
+        if aiomysql is None:
+            print("⚠️ aiomysql no está instalado; endpoints async usan el pool síncrono en hilos")
+            return True
+        try:
+            self._pool = await aiomysql.create_pool(
+                host=self.db_config['host'],
+                port=self.db_config.get('port', 3306),
+                user=self.db_config['user'],
+                password=self.db_config['password'],
+                db=self.db_config['database'],
+                charset=self.db_config.get('charset', 'utf8mb4'),
+                cursorclass=aiomysql.DictCursor,
+                autocommit=True,
+                minsize=self.config['minsize'],
+                maxsize=self.config['maxsize'],
+                pool_recycle=self.config['pool_recycle'],
+                connect_timeout=self.config['connect_timeout']
+            )
+            print(f"✅ Pool async aiomysql listo (máx. {self.config['maxsize']} conexiones)")
+            return True
+        except Exception as e:
+            self._pool = None
+            print(f"⚠️ No se pudo crear el pool aiomysql ({e}); endpoints async usan el pool síncrono en hilos")
+            return False
+
+    @asynccontextmanager
+    async def cursor(self):
+        """Cursor de diccionarios; la conexión vuelve a su pool al salir"""
+        if self._pool is not None:
+            async with self._pool.acquire() as connection:
+                async with connection.cursor() as cursor:
+                    yield cursor
+            return
+
+        pooled = await asyncio.to_thread(self.sync_pool.acquire)
+        failed = False
+        try:
+            with pooled.connection.cursor() as cursor:
+                yield _ThreadCursor(cursor)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            await asyncio.to_thread(self.sync_pool.release, pooled, failed)
+
+    async def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            await self._pool.wait_closed()
+            self._pool = None
+
+    def get_info(self):
+        """Métricas del pool async para /status"""
+        info = {'backend': self.backend, 'enabled': self.config['enabled']}
+        if self._pool is not None:
+            info.update({
+                'size': self._pool.size,
+                'free': self._pool.freesize,
+                'in_use': self._pool.size - self._pool.freesize,
+                'max_size': self._pool.maxsize
+            })
+        return info
@@ -0,0 +1,212 @@
+"""
+Pool de Conexiones MySQL
+Mantiene un número acotado de conexiones pymysql reutilizables en lugar de abrir y
+cerrar una por petición. Al entregar una conexión se verifica con ping si estuvo
+inactiva, se descartan las inactivas demasiado tiempo y se reciclan las más viejas
+que max_lifetime; al devolverla se hace rollback para no arrastrar transacciones
+"""
+
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+import pymysql
+
+POOL_CONFIG = {
+    'max_size': 10,           # Conexiones abiertas como máximo (en uso + libres)
+    'min_idle': 1,            # Conexiones libres que se conservan aunque superen max_idle
+    'checkout_timeout': 10,   # Segundos esperando una conexión antes de fallar
+    'ping_after': 30,         # Segundos de inactividad a partir de los cuales se hace ping al entregar
+    'max_idle': 300,          # Segundos libre antes de cerrarla
+    'max_lifetime': 3600      # Segundos de vida antes de reciclarla
+}
+
+class PoolTimeoutError(Exception):
+    """No se obtuvo una conexión libre dentro de checkout_timeout"""
+
+class _PooledConnection:
+    """Conexión del pool con sus marcas de tiempo"""
+
+    __slots__ = ('connection', 'created_at', 'last_used')
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+class ConnectionPool:
+    """Pool acotado de conexiones pymysql, seguro entre hilos"""
+
+    def __init__(self, db_config, config=None, connect=None):
+        self.db_config = db_config
+        self.config = dict(POOL_CONFIG, **(config or {}))
+        self._connect = connect or (lambda: pymysql.connect(**self.db_config))
+        self._idle = deque()
+        self._in_use = 0
+        self._waiting = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self.stats = {
+            'created': 0,
+            'recycled': 0,
+            'discarded': 0,
+            'checkouts': 0,
+            'timeouts': 0,
+            'wait_seconds': 0.0
+        }
+
+    # ================================
+    # ENTREGA Y DEVOLUCIÓN
+    # ================================
+
+    @contextmanager
+    def connection(self):
+        """Contexto que entrega una conexión del pool y la devuelve al salir"""
+        pooled = self.acquire()
+        failed = False
+        try:
+            yield pooled.connection
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.release(pooled, failed=failed)
+
+    def acquire(self):
+        """Obtener una conexión sana; espera hasta checkout_timeout si el pool está lleno"""
+        started = time.monotonic()
+        deadline = started + self.config['checkout_timeout']
+
+        with self._condition:
+            if self._closed:
+                raise PoolTimeoutError("El pool de conexiones está cerrado")
+            self._waiting += 1
+            try:
+                while not self._idle and self._in_use >= self.config['max_size']:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.stats['timeouts'] += 1
+                        raise PoolTimeoutError(
+                            f"Sin conexiones libres tras {self.config['checkout_timeout']}s "
+                            f"({self._in_use} en uso)"
+                        )
+                    self._condition.wait(remaining)
+            finally:
+                self._waiting -= 1
+
+            pooled = self._idle.pop() if self._idle else None
+            self._in_use += 1
+            self.stats['checkouts'] += 1
+            self.stats['wait_seconds'] += time.monotonic() - started
+
+        # Conectar y hacer ping fuera del lock; si falla se libera el cupo
+        try:
+            if pooled is not None:
+                pooled = self._validate(pooled)
+            if pooled is None:
+                pooled = self._create()
+        except Exception:
+            with self._condition:
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+
+        pooled.last_used = time.monotonic()
+        return pooled
+
+    def release(self, pooled, failed=False):
+        """Devolver una conexión: rollback de lo no confirmado y cierre si está rota o vieja"""
+        keep = not self._closed
+        try:
+            pooled.connection.rollback()
+        except Exception:
+            keep = False
+
+        if keep and failed and not pooled.connection.open:
+            keep = False
+        if keep and time.monotonic() - pooled.created_at > self.config['max_lifetime']:
+            self.stats['recycled'] += 1
+            keep = False
+
+        if keep:
+            pooled.last_used = time.monotonic()
+        else:
+            self._close(pooled)
+
+        with self._condition:
+            self._in_use -= 1
+            if keep:
+                self._idle.append(pooled)
+            self._prune_idle()
+            self._condition.notify()
+
+    def _create(self):
+        connection = self._connect()
+        with self._condition:
+            self.stats['created'] += 1
+        return _PooledConnection(connection)
+
+    def _validate(self, pooled):
+        """Devolver la conexión si sigue sana, o None si hubo que cerrarla"""
+        now = time.monotonic()
+        if now - pooled.created_at > self.config['max_lifetime']:
+            with self._condition:
+                self.stats['recycled'] += 1
+            self._close(pooled)
+            return None
+
+        if now - pooled.last_used > self.config['ping_after']:
+            try:
+                pooled.connection.ping(reconnect=False)
+            except Exception:
+                with self._condition:
+                    self.stats['discarded'] += 1
+                self._close(pooled)
+                return None
+        return pooled
+
+    def _prune_idle(self):
+        """Cerrar conexiones libres inactivas más de max_idle (con el lock tomado)"""
+        now = time.monotonic()
+        while len(self._idle) > self.config['min_idle'] and now - self._idle[0].last_used > self.config['max_idle']:
+            pooled = self._idle.popleft()
+            self.stats['recycled'] += 1
+            self._close(pooled)
+
+    def _close(self, pooled):
+        try:
+            pooled.connection.close()
+        except Exception:
+            pass
+
+    # ================================
+    # ADMINISTRACIÓN
+    # ================================
+
+    def close(self):
+        """Cerrar las conexiones libres; las que están en uso se cierran al devolverse"""
+        with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._condition.notify_all()
+        for pooled in idle:
+            self._close(pooled)
+
+    def get_info(self):
+        """Métricas del pool para /status"""
+        with self._condition:
+            checkouts = self.stats['checkouts']
+            return {
+                'max_size': self.config['max_size'],
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'waiting': self._waiting,
+                'created': self.stats['created'],
+                'recycled': self.stats['recycled'],
+                'discarded': self.stats['discarded'],
+                'checkouts': checkouts,
+                'timeouts': self.stats['timeouts'],
+                'avg_wait_ms': round(self.stats['wait_seconds'] * 1000 / checkouts, 2) if checkouts else 0.0
+            }
@@ -40,6 +40,7 @@ const CONFIG = {
     API_BASE_URL: 'http://localhost:8000',
     ARTICLE_ENDPOINT: '/volumes-no-filter', // Usar endpoint sin filtro para buscar artículo
     RECOMMENDATIONS_ENDPOINT: '/admin/recommendations',
+    LOOKUP_ENDPOINT: '/articles/lookup', // Índice en memoria publication_id/submission_id → issue
     SIMILAR_LIMIT: 4,
     HYBRID_LIMIT: 4
 };
@@ -325,27 +326,24 @@ const UIManager = {
         console.log(`✅ ${recommendations.length} recomendaciones híbridas renderizadas y clickeables`);
     },
 
+    async lookupArticle(params) {
+        // Resolver ids con el índice del servidor (una sola petición)
+        const query = new URLSearchParams(params).toString();
+        const response = await fetch(`${CONFIG.API_BASE_URL}${CONFIG.LOOKUP_ENDPOINT}?${query}`);
+        if (!response.ok) return null;
+        
+        const data = await response.json();
+        const entries = Object.values(data.articles || {});
+        return entries.length > 0 ? entries[0] : null;
+    },
+
     async findSubmissionIdForPublication(publicationId) {
         // Función para convertir publication_id a submission_id
         try {
-            const volumesResponse = await fetch(`${CONFIG.API_BASE_URL}/volumes`);
-            if (!volumesResponse.ok) return null;
-            
-            const volumesData = await volumesResponse.json();
-            const volumes = volumesData.volumes || [];
-            
-            for (const volume of volumes) {
-                const volumeResponse = await fetch(`${CONFIG.API_BASE_URL}/volumes-no-filter/${volume.issue_id}`);
-                if (volumeResponse.ok) {
-                    const volumeData = await volumeResponse.json();
-                    const articles = volumeData.articles || [];
-                    
-                    const found = articles.find(article => article.publication_id == publicationId);
-                    if (found && found.submission_id) {
-                        console.log(`🔍 Mapeado publication_id ${publicationId} → submission_id ${found.submission_id}`);
-                        return found.submission_id;
-                    }
-                }
+            const entry = await this.lookupArticle({ ids: publicationId });
+            if (entry && entry.submission_id) {
+                console.log(`🔍 Mapeado publication_id ${publicationId} → submission_id ${entry.submission_id}`);
+                return entry.submission_id;
             }
             
             console.warn(`⚠️ No se encontró submission_id para publication_id: ${publicationId}`);
@@ -499,7 +497,29 @@ const ArticleManager = {
 
     async findArticleInVolumes(submissionId) {
         try {
-            // Primero intentar obtener todos los volúmenes
+            // Ubicar el volumen con el índice del servidor y pedir solo ese volumen
+            try {
+                const entry = await UIManager.lookupArticle({ submission_ids: submissionId }) ||
+                              await UIManager.lookupArticle({ ids: submissionId });
+                
+                if (entry && entry.issue_id) {
+                    const volumeResponse = await fetch(`${CONFIG.API_BASE_URL}/volumes-no-filter/${entry.issue_id}`);
+                    if (volumeResponse.ok) {
+                        const volumeData = await volumeResponse.json();
+                        const foundArticle = (volumeData.articles || []).find(article => 
+                            article.publication_id == entry.publication_id
+                        );
+                        if (foundArticle) {
+                            console.log(`✅ Artículo encontrado en volumen ${entry.issue_id} (índice)`);
+                            return foundArticle;
+                        }
+                    }
+                }
+            } catch (lookupError) {
+                console.warn('⚠️ Índice de artículos no disponible, recorriendo volúmenes:', lookupError);
+            }
+
+            // Fallback: recorrer todos los volúmenes
             const volumesResponse = await fetch(`${CONFIG.API_BASE_URL}/volumes`);
             
             if (!volumesResponse.ok) {
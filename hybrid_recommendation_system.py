@@ -13,8 +13,15 @@ from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.decomposition import TruncatedSVD
 from sklearn.cluster import KMeans
 import math
+import os
 import re
 import html
+import threading
+import time
+from model_snapshot import (
+    DEFAULT_SNAPSHOT_DIR, compute_articles_hash, save_hybrid_snapshot, load_hybrid_snapshot,
+    current_generation, generation_dir, publish_generation
+)
 
 class HybridRecommendationSystem:
     """
@@ -30,11 +37,24 @@ class HybridRecommendationSystem:
         self.connection = connection
         self.articles_data = {}
         self.user_behavior_data = {}
+        self.data_fingerprint = None  # Usuarios con que se entrenó (clave del snapshot)
         self.user_item_matrix = None
         self.content_similarity_matrix = None
         self.user_profiles = {}
         self.article_popularity = {}
         
+        # Índices id -> fila, reconstruidos junto con cada matriz
+        self.user_ids = []
+        self.article_ids = []
+        self.user_index = {}
+        self.article_index = {}
+        self.content_article_index = {}
+        
+        # Agregados cluster x artículo (suma y conteo de ratings)
+        self.cluster_article_index = {}
+        self.cluster_rating_sums = None
+        self.cluster_rating_counts = None
+        
         # Modelos ML
         self.tfidf_vectorizer = None
         self.svd_model = None
@@ -44,6 +64,9 @@ class HybridRecommendationSystem:
         """Cargar todos los datos necesarios para el modelo híbrido"""
         print("📚 Cargando datos comprehensivos...")
         
+        # Tomada antes de leer, así un cambio durante la carga invalida el snapshot
+        self.data_fingerprint = self.fetch_data_fingerprint()
+        
         # 1. Cargar artículos
         self._load_articles_data()
         
@@ -58,63 +81,51 @@ class HybridRecommendationSystem:
         
         print(f"✅ Datos cargados: {len(self.articles_data)} artículos, {len(self.user_behavior_data)} usuarios")
     
-    def _load_articles_data(self):
+    def _load_articles_data(self, publication_ids=None):
         """Cargar artículos con metadatos completos"""
+        self.articles_data.update(self._fetch_article_records(publication_ids))
+    
+    def _fetch_article_records(self, publication_ids=None):
+        """
+        Consultar artículos publicados desde article_summaries (solo lectura; la actualiza el cálculo nocturno)
+        publication_ids limita la consulta a esas publicaciones
+        """
+        if publication_ids is not None and not publication_ids:
+            return {}
+        
+        id_filter = ''
+        params = None
+        if publication_ids is not None:
+            publication_ids = list(publication_ids)
+            id_filter = f"AND publication_id IN ({', '.join(['%s'] * len(publication_ids))})"
+            params = tuple(publication_ids)
+        
         with self.connection.cursor() as cursor:
-            cursor.execute("""
+            cursor.execute(f"""
                 SELECT 
-                    p.publication_id,
-                    p.submission_id,
-                    s.context_id,
-                    p.date_published,
-                    p.status,
-                    
-                    COALESCE(ps_title_es.setting_value, ps_title_en.setting_value, 'Sin título') as title,
-                    COALESCE(ps_abstract_es.setting_value, ps_abstract_en.setting_value, '') as abstract,
-                    
-                    GROUP_CONCAT(DISTINCT CONCAT(
-                        COALESCE(aus_fname.setting_value, ''), ' ', 
-                        COALESCE(aus_lname.setting_value, '')
-                    ) SEPARATOR '; ') as authors,
-                    
-                    GROUP_CONCAT(DISTINCT aus_affiliation.setting_value SEPARATOR '; ') as affiliations,
-                    
-                    -- Categorías si existen
-                    GROUP_CONCAT(DISTINCT pc.category_id) as category_ids
-                    
-                FROM publications p
-                JOIN submissions s ON p.submission_id = s.submission_id
-                
-                LEFT JOIN publication_settings ps_title_es ON p.publication_id = ps_title_es.publication_id 
-                    AND ps_title_es.setting_name = 'title' AND ps_title_es.locale = 'es'
-                LEFT JOIN publication_settings ps_title_en ON p.publication_id = ps_title_en.publication_id 
-                    AND ps_title_en.setting_name = 'title' AND ps_title_en.locale = 'en'
-                LEFT JOIN publication_settings ps_abstract_es ON p.publication_id = ps_abstract_es.publication_id 
-                    AND ps_abstract_es.setting_name = 'abstract' AND ps_abstract_es.locale = 'es'
-                LEFT JOIN publication_settings ps_abstract_en ON p.publication_id = ps_abstract_en.publication_id 
-                    AND ps_abstract_en.setting_name = 'abstract' AND ps_abstract_en.locale = 'en'
-                
-                LEFT JOIN authors a ON p.publication_id = a.publication_id
-                LEFT JOIN author_settings aus_fname ON a.author_id = aus_fname.author_id 
-                    AND aus_fname.setting_name = 'givenName'
-                LEFT JOIN author_settings aus_lname ON a.author_id = aus_lname.author_id 
-                    AND aus_lname.setting_name = 'familyName'
-                LEFT JOIN author_settings aus_affiliation ON a.author_id = aus_affiliation.author_id 
-                    AND aus_affiliation.setting_name = 'affiliation'
-                
-                LEFT JOIN publication_categories pc ON p.publication_id = pc.publication_id
-                
-                WHERE p.status = 3
-                GROUP BY p.publication_id, p.submission_id, s.context_id, p.date_published, p.status
-                HAVING title != 'Sin título'
-                ORDER BY p.date_published DESC
-            """)
+                    publication_id,
+                    submission_id,
+                    context_id,
+                    date_published,
+                    status,
+                    title,
+                    abstract,
+                    authors,
+                    affiliations,
+                    category_ids
+                FROM article_summaries
+                WHERE status = 3
+                AND title != 'Sin título'
+                {id_filter}
+                ORDER BY date_published DESC
+            """, params)
             
+            records = {}
             for article in cursor.fetchall():
                 clean_title = self._clean_html_text(article['title'])
                 clean_abstract = self._clean_html_text(article['abstract'])
                 
-                self.articles_data[article['publication_id']] = {
+                records[article['publication_id']] = {
                     'publication_id': article['publication_id'],
                     'submission_id': article['submission_id'],
                     'title': clean_title,
@@ -126,6 +137,22 @@ class HybridRecommendationSystem:
                     'days_since_published': self._calculate_days_since_published(article['date_published']),
                     'content_vector': None,  # Se calculará después
                 }
+            
+            return records
+    
+    def fetch_data_fingerprint(self):
+        """
+        Conteo y último registro de usuarios: cambia con usuarios nuevos o eliminados
+        Las sesiones cambian en casi cada visita y quedan fuera; las interacciones nuevas
+        llegan con el reentrenamiento nocturno
+        """
+        with self.connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT COUNT(*) as users, MAX(date_registered) as last_registered
+                FROM users
+            """)
+            row = cursor.fetchone()
+        return {key: value.isoformat() if hasattr(value, 'isoformat') else value for key, value in row.items()}
     
     def _load_user_behavior(self):
         """Cargar y analizar comportamiento de usuarios"""
@@ -260,6 +287,8 @@ class HybridRecommendationSystem:
         self.user_item_matrix = matrix
         self.user_ids = users
         self.article_ids = articles
+        self.user_index = {user_id: i for i, user_id in enumerate(users)}
+        self.article_index = {article_id: j for j, article_id in enumerate(articles)}
         
         print(f"✅ Matriz creada: {matrix.shape} (usuarios x artículos)")
         return matrix.shape[0] > 0 and matrix.shape[1] > 0
@@ -279,19 +308,14 @@ class HybridRecommendationSystem:
             article_ids.append(pub_id)
         
         # Crear vectorizador TF-IDF
-        self.tfidf_vectorizer = TfidfVectorizer(
-            max_features=1000,
-            stop_words=self._get_stopwords(),
-            ngram_range=(1, 2),
-            min_df=1,
-            max_df=0.8
-        )
+        self.tfidf_vectorizer = self._create_tfidf_vectorizer()
         
         # Crear matriz TF-IDF
         tfidf_matrix = self.tfidf_vectorizer.fit_transform(texts)
         
         # Calcular similitud coseno
         self.content_similarity_matrix = cosine_similarity(tfidf_matrix)
+        self.content_article_index = {pub_id: i for i, pub_id in enumerate(article_ids)}
         
         # Almacenar vectores de contenido en artículos
         for i, pub_id in enumerate(article_ids):
@@ -320,6 +344,16 @@ class HybridRecommendationSystem:
         print(f"✅ Modelo SVD entrenado: {self.user_factors.shape[1]} factores")
         return True
     
+    def _create_tfidf_vectorizer(self):
+        """Vectorizador TF-IDF (sin ajustar) con la configuración del sistema híbrido"""
+        return TfidfVectorizer(
+            max_features=1000,
+            stop_words=self._get_stopwords(),
+            ngram_range=(1, 2),
+            min_df=1,
+            max_df=0.8
+        )
+    
     def cluster_users(self):
         """Clustering de usuarios basado en comportamiento"""
         print("👥 Clustering de usuarios...")
@@ -333,14 +367,7 @@ class HybridRecommendationSystem:
         user_ids = []
         
         for user_id, behavior in self.user_behavior_data.items():
-            feature_vector = [
-                behavior['activity_level'],
-                behavior['session_count'],
-                behavior['registration_days'] / 365,  # Normalizar
-                len(behavior['article_interactions']),
-                np.mean([interaction['rating'] for interaction in behavior['article_interactions'].values()]) if behavior['article_interactions'] else 2.5
-            ]
-            features.append(feature_vector)
+            features.append(self._user_cluster_features(behavior))
             user_ids.append(user_id)
         
         # K-means clustering
@@ -353,9 +380,39 @@ class HybridRecommendationSystem:
             self.user_behavior_data[user_id]['cluster'] = cluster_labels[i]
         
         self.user_clusters = kmeans
+        self._build_cluster_rating_aggregates()
         print(f"✅ {n_clusters} clusters de usuarios creados")
         return True
     
+    def _user_cluster_features(self, behavior):
+        """Vector de características de un usuario para clustering"""
+        return [
+            behavior['activity_level'],
+            behavior['session_count'],
+            behavior['registration_days'] / 365,  # Normalizar
+            len(behavior['article_interactions']),
+            np.mean([interaction['rating'] for interaction in behavior['article_interactions'].values()]) if behavior['article_interactions'] else 2.5
+        ]
+    
+    def _build_cluster_rating_aggregates(self):
+        """Construir suma y conteo de ratings por cluster x artículo en una sola pasada"""
+        self.cluster_article_index = {article_id: j for j, article_id in enumerate(self.articles_data.keys())}
+        n_clusters = self.user_clusters.n_clusters
+        self.cluster_rating_sums = np.zeros((n_clusters, len(self.cluster_article_index)))
+        self.cluster_rating_counts = np.zeros((n_clusters, len(self.cluster_article_index)), dtype=np.int64)
+        
+        for behavior in self.user_behavior_data.values():
+            if 'cluster' in behavior:
+                self._apply_cluster_ratings(behavior['cluster'], behavior['article_interactions'])
+    
+    def _apply_cluster_ratings(self, cluster_id, interactions):
+        """Sumar las interacciones de un usuario al agregado de su cluster"""
+        for article_id, interaction in interactions.items():
+            article_index = self.cluster_article_index.get(article_id)
+            if article_index is not None:
+                self.cluster_rating_sums[cluster_id, article_index] += interaction['rating']
+                self.cluster_rating_counts[cluster_id, article_index] += 1
+    
     def predict_rating(self, user_id, article_id):
         """Predicción híbrida de rating para usuario-artículo"""
         
@@ -412,16 +469,16 @@ class HybridRecommendationSystem:
             return 0
         
         # Encontrar artículos similares que el usuario ha visto
-        article_index = self.article_ids.index(article_id) if article_id in self.article_ids else -1
-        if article_index == -1:
+        article_index = self.content_article_index.get(article_id)
+        if article_index is None:
             return 0
         
         similarities = self.content_similarity_matrix[article_index]
         weighted_ratings = []
         
         for other_article_id, interaction in user_interactions.items():
-            if other_article_id in self.article_ids:
-                other_index = self.article_ids.index(other_article_id)
+            other_index = self.content_article_index.get(other_article_id)
+            if other_index is not None:
                 similarity = similarities[other_index]
                 if similarity > 0.1:  # Umbral mínimo
                     weighted_ratings.append(interaction['rating'] * similarity)
@@ -430,12 +487,11 @@ class HybridRecommendationSystem:
     
     def _predict_collaborative(self, user_id, article_id):
         """Predicción collaborative filtering usando SVD"""
-        if user_id not in self.user_ids or article_id not in self.article_ids:
+        user_index = self.user_index.get(user_id)
+        article_index = self.article_index.get(article_id)
+        if user_index is None or article_index is None:
             return 0
         
-        user_index = self.user_ids.index(user_id)
-        article_index = self.article_ids.index(article_id)
-        
         # Predicción SVD
         user_vector = self.user_factors[user_index]
         item_vector = self.item_factors[article_index]
@@ -474,54 +530,192 @@ class HybridRecommendationSystem:
         # Ajustar por cluster de usuario (usuarios similares)
         if 'cluster' in user_behavior and self.user_clusters is not None:
             cluster_id = user_behavior['cluster']
-            # Encontrar usuarios del mismo cluster que han interactuado con este artículo
-            cluster_ratings = []
-            for other_user_id, other_behavior in self.user_behavior_data.items():
-                if (other_behavior.get('cluster') == cluster_id and 
-                    article_id in other_behavior['article_interactions']):
-                    cluster_ratings.append(other_behavior['article_interactions'][article_id]['rating'])
-            
-            if cluster_ratings:
-                cluster_avg = np.mean(cluster_ratings)
+            # Rating promedio de usuarios del mismo cluster desde el agregado precalculado
+            article_index = self.cluster_article_index.get(article_id)
+            if article_index is not None and self.cluster_rating_counts[cluster_id, article_index] > 0:
+                cluster_avg = (self.cluster_rating_sums[cluster_id, article_index] /
+                               self.cluster_rating_counts[cluster_id, article_index])
                 score = (score + cluster_avg) / 2  # Promedio con predicción de cluster
         
         return max(1.0, min(5.0, score))
     
+    def predict_ratings_batch(self, user_id, article_ids):
+        """
+        Predicción híbrida vectorizada para muchos artículos a la vez
+        Equivalente a predict_rating artículo por artículo; devuelve arrays alineados con article_ids
+        y la lista de componentes (método, scores, máscara de uso) para construir detalles
+        """
+        n_articles = len(article_ids)
+        
+        # Pesos para el modelo híbrido (los mismos que predict_rating)
+        content_weight = 0.4
+        collaborative_weight = 0.3
+        popularity_weight = 0.2
+        behavioral_weight = 0.1
+        
+        components = []
+        
+        # 1. Predicción basada en contenido
+        content_scores = self._predict_content_based_batch(user_id, article_ids)
+        components.append(('content', content_scores, content_scores > 0, content_weight))
+        
+        # 2. Predicción collaborative filtering (user_factors @ item_factors.T)
+        if self.svd_model is not None:
+            collab_scores = self._predict_collaborative_batch(user_id, article_ids)
+            components.append(('collaborative', collab_scores, collab_scores > 0, collaborative_weight))
+        
+        # 3. Predicción basada en popularidad
+        popularity_scores = np.array([
+            2.0 + self.article_popularity[article_id] * 3.0 if article_id in self.article_popularity else 2.5
+            for article_id in article_ids
+        ], dtype=float)
+        components.append(('popularity', popularity_scores, np.ones(n_articles, dtype=bool), popularity_weight))
+        
+        # 4. Predicción basada en comportamiento
+        behavioral_scores = self._predict_behavior_based_batch(user_id, article_ids)
+        components.append(('behavioral', behavioral_scores, np.ones(n_articles, dtype=bool), behavioral_weight))
+        
+        # Combinar predicciones solo con los métodos usados en cada artículo
+        weighted_sum = np.zeros(n_articles)
+        total_weight = np.zeros(n_articles)
+        methods_used = np.zeros(n_articles)
+        for _, scores, used, weight in components:
+            weighted_sum += np.where(used, scores * weight, 0.0)
+            total_weight += np.where(used, weight, 0.0)
+            methods_used += used
+        
+        final_ratings = weighted_sum / total_weight
+        confidences = np.minimum(methods_used / 4.0, 1.0)
+        
+        return final_ratings, confidences, components
+    
+    def _predict_content_based_batch(self, user_id, article_ids):
+        """Versión vectorizada de _predict_content_based"""
+        scores = np.zeros(len(article_ids))
+        
+        if user_id not in self.user_behavior_data or self.content_similarity_matrix is None:
+            return scores
+        
+        user_interactions = self.user_behavior_data[user_id]['article_interactions']
+        
+        # Artículos vistos por el usuario con fila en la matriz de contenido
+        seen_indices = []
+        seen_ratings = []
+        for other_article_id, interaction in user_interactions.items():
+            other_index = self.content_article_index.get(other_article_id)
+            if other_index is not None:
+                seen_indices.append(other_index)
+                seen_ratings.append(interaction['rating'])
+        
+        candidate_positions = []
+        candidate_indices = []
+        for position, article_id in enumerate(article_ids):
+            article_index = self.content_article_index.get(article_id)
+            if article_index is not None:
+                candidate_positions.append(position)
+                candidate_indices.append(article_index)
+        
+        if not seen_indices or not candidate_indices:
+            return scores
+        
+        similarities = self.content_similarity_matrix[np.ix_(candidate_indices, seen_indices)]
+        above_threshold = similarities > 0.1  # Umbral mínimo
+        counts = above_threshold.sum(axis=1)
+        sums = np.where(above_threshold, similarities * np.array(seen_ratings), 0.0).sum(axis=1)
+        
+        scores[candidate_positions] = np.divide(sums, counts, out=np.zeros(len(counts)), where=counts > 0)
+        return scores
+    
+    def _predict_collaborative_batch(self, user_id, article_ids):
+        """Versión vectorizada de _predict_collaborative"""
+        scores = np.zeros(len(article_ids))
+        
+        user_index = self.user_index.get(user_id)
+        if user_index is None:
+            return scores
+        
+        positions = []
+        item_indices = []
+        for position, article_id in enumerate(article_ids):
+            article_index = self.article_index.get(article_id)
+            if article_index is not None:
+                positions.append(position)
+                item_indices.append(article_index)
+        
+        if positions:
+            predicted = self.item_factors[item_indices] @ self.user_factors[user_index]
+            # Normalizar a escala 1-5
+            scores[positions] = np.clip(predicted + 2.5, 1.0, 5.0)
+        
+        return scores
+    
+    def _predict_behavior_based_batch(self, user_id, article_ids):
+        """Versión vectorizada de _predict_behavior_based"""
+        if user_id not in self.user_behavior_data:
+            return np.full(len(article_ids), 2.5)
+        
+        user_behavior = self.user_behavior_data[user_id]
+        
+        # Base ajustada por nivel de actividad del usuario
+        scores = np.full(len(article_ids), 2.5 + user_behavior['activity_level'] * 0.5)
+        
+        # Ajustar por recencia del artículo
+        recent = np.array([self.articles_data[article_id]['days_since_published'] < 30 for article_id in article_ids], dtype=bool)
+        scores += np.where(recent, 0.3, 0.0)
+        
+        # Ajustar por cluster de usuario desde el agregado precalculado
+        if 'cluster' in user_behavior and self.user_clusters is not None:
+            cluster_id = user_behavior['cluster']
+            article_indices = np.array([self.cluster_article_index.get(article_id, -1) for article_id in article_ids], dtype=np.int64)
+            known = article_indices >= 0
+            counts = np.where(known, self.cluster_rating_counts[cluster_id, article_indices], 0)
+            sums = np.where(known, self.cluster_rating_sums[cluster_id, article_indices], 0.0)
+            cluster_avg = np.divide(sums, counts, out=np.zeros(len(counts)), where=counts > 0)
+            scores = np.where(counts > 0, (scores + cluster_avg) / 2, scores)
+        
+        return np.clip(scores, 1.0, 5.0)
+    
     def get_hybrid_recommendations(self, user_id, n_recommendations=10):
         """Obtener recomendaciones híbridas para un usuario"""
         if user_id not in self.user_behavior_data:
             return []
         
-        recommendations = []
         user_interactions = self.user_behavior_data[user_id]['article_interactions']
         
-        # Evaluar todos los artículos que el usuario no ha visto
-        for article_id in self.articles_data.keys():
-            if article_id not in user_interactions:
-                
-                predicted_rating, confidence, details = self.predict_rating(user_id, article_id)
-                
-                if predicted_rating > 2.0:  # Umbral mínimo
-                    article = self.articles_data[article_id]
-                    
-                    recommendations.append({
-                        'publication_id': article_id,
-                        'submission_id': article['submission_id'],
-                        'title': article['title'],
-                        'abstract': article['abstract'][:300] + '...' if len(article['abstract']) > 300 else article['abstract'],
-                        'authors': article['authors'],
-                        'predicted_rating': predicted_rating,
-                        'confidence': confidence,
-                        'algorithm': 'hybrid_model',
-                        'prediction_details': details,
-                        'score': predicted_rating / 5.0,  # Normalizar a 0-1
-                        'date_published': article['date_published'].isoformat() if hasattr(article['date_published'], 'isoformat') else str(article['date_published']) if article['date_published'] else None,
-                        'url': f'/article/view/{article["submission_id"]}'
-                    })
-        
-        # Ordenar por rating predicho
-        recommendations.sort(key=lambda x: x['predicted_rating'], reverse=True)
-        return recommendations[:n_recommendations]
+        # Evaluar todos los artículos que el usuario no ha visto en una sola pasada vectorizada
+        candidate_ids = [article_id for article_id in self.articles_data.keys() if article_id not in user_interactions]
+        if not candidate_ids:
+            return []
+        
+        predicted_ratings, confidences, components = self.predict_ratings_batch(user_id, candidate_ids)
+        
+        # Umbral mínimo y orden por rating predicho
+        eligible = np.flatnonzero(predicted_ratings > 2.0)
+        ranked = eligible[np.argsort(-predicted_ratings[eligible], kind='stable')][:n_recommendations]
+        
+        recommendations = []
+        for position in ranked:
+            article_id = candidate_ids[position]
+            article = self.articles_data[article_id]
+            predicted_rating = float(predicted_ratings[position])
+            details = [f"{method}:{scores[position]:.2f}" for method, scores, used, _ in components if used[position]]
+            
+            recommendations.append({
+                'publication_id': article_id,
+                'submission_id': article['submission_id'],
+                'title': article['title'],
+                'abstract': article['abstract'][:300] + '...' if len(article['abstract']) > 300 else article['abstract'],
+                'authors': article['authors'],
+                'predicted_rating': predicted_rating,
+                'confidence': float(confidences[position]),
+                'algorithm': 'hybrid_model',
+                'prediction_details': details,
+                'score': predicted_rating / 5.0,  # Normalizar a 0-1
+                'date_published': article['date_published'].isoformat() if hasattr(article['date_published'], 'isoformat') else str(article['date_published']) if article['date_published'] else None,
+                'url': f'/article/view/{article["submission_id"]}'
+            })
+        
+        return recommendations
     
     # ================================
     # MÉTODOS AUXILIARES
@@ -651,23 +845,167 @@ class HybridRecommendationSystem:
             'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'
         ]
 
+# ================================
+# REGISTRO DE MODELO ENTRENADO EN PROCESO
+# ================================
+
+def train_hybrid_system(connection):
+    """Cargar datos y entrenar todos los modelos de un HybridRecommendationSystem nuevo"""
+    system = HybridRecommendationSystem(connection)
+    system.load_comprehensive_data()
+    system.build_user_item_matrix()
+    system.build_content_similarity_matrix()
+    system.train_collaborative_model()
+    system.cluster_users()
+    
+    # El modelo entrenado no necesita la conexión para predecir
+    system.connection = None
+    return system
+
+def load_or_train_hybrid_system(connection, snapshot_root):
+    """
+    Usar la generación publicada si coincide con los artículos y con la huella de
+    usuarios actual; si no, entrenar y publicar una generación nueva
+    Devuelve (sistema, generación)
+    """
+    system = HybridRecommendationSystem(connection)
+    system._load_articles_data()
+    expected_hash = compute_articles_hash(system.articles_data, fingerprint=system.fetch_data_fingerprint())
+    
+    generation = current_generation(snapshot_root)
+    if generation is not None and load_hybrid_snapshot(
+            system, generation_dir(snapshot_root, generation), expected_hash):
+        system.connection = None
+        return system, generation
+    
+    system = train_hybrid_system(connection)
+    generation = publish_generation(snapshot_root, lambda path: save_hybrid_snapshot(system, path))
+    return system, generation
+
+class HybridModelRegistry:
+    """
+    Mantiene un HybridRecommendationSystem entrenado en memoria
+    El modelo nuevo se construye completo fuera del registro y se publica con un
+    único intercambio de referencia, así los lectores nunca ven un modelo a medio construir
+    Con snapshot_dir, la versión es la generación publicada en disco: todos los workers
+    mapean los mismos archivos y cambian de generación cuando otro proceso publica una nueva
+    """
+    
+    def __init__(self, snapshot_dir=None, generation_check_interval=30):
+        self._current = None  # (modelo, versión, fecha de entrenamiento)
+        self._refresh_lock = threading.Lock()
+        self._version = 0
+        # Si se indica, el modelo se carga/publica como generación de snapshot en disco
+        self.snapshot_dir = snapshot_dir
+        self.generation_check_interval = generation_check_interval
+        self._last_generation_check = time.monotonic()
+    
+    def get_model(self, connection):
+        """Obtener el modelo actual, entrenándolo la primera vez"""
+        current = self._current
+        if current is None:
+            return self.refresh(connection, only_if_missing=True, use_snapshot=True)
+        
+        # Revisar periódicamente si otro proceso publicó una generación nueva
+        if self.snapshot_dir and time.monotonic() - self._last_generation_check >= self.generation_check_interval:
+            self.sync_generation()
+        
+        return self._current[0]
+    
+    def sync_generation(self):
+        """
+        Cambiar a la generación publicada en disco si difiere de la cargada
+        (p. ej. la del cálculo nocturno del worker); sin modelo cargado no hace nada
+        """
+        self._last_generation_check = time.monotonic()
+        current = self._current
+        if current is None or not self.snapshot_dir:
+            return False
+        generation = current_generation(self.snapshot_dir)
+        if generation is None or generation == current[1]:
+            return False
+        self._switch_generation(generation)
+        return True
+    
+    def _switch_generation(self, generation):
+        """Mapear una generación publicada por otro proceso y publicarla localmente"""
+        with self._refresh_lock:
+            if self._current is not None and self._current[1] == generation:
+                return
+            
+            system = HybridRecommendationSystem(None)
+            if load_hybrid_snapshot(system, generation_dir(self.snapshot_dir, generation)):
+                self._version = generation
+                self._current = (system, generation, datetime.now())
+                print(f"🔀 Modelo híbrido cambiado a la generación {generation}")
+    
+    def refresh(self, connection, only_if_missing=False, use_snapshot=False):
+        """
+        Entrenar un modelo nuevo y publicarlo de forma atómica
+        Con use_snapshot se reutiliza el snapshot en disco si sigue vigente
+        """
+        with self._refresh_lock:
+            # Otro hilo pudo haber entrenado mientras esperábamos
+            if only_if_missing and self._current is not None:
+                return self._current[0]
+            
+            print("🔁 Entrenando nueva versión del modelo híbrido...")
+            if self.snapshot_dir and use_snapshot:
+                system, self._version = load_or_train_hybrid_system(connection, self.snapshot_dir)
+            elif self.snapshot_dir:
+                system = train_hybrid_system(connection)
+                self._version = publish_generation(
+                    self.snapshot_dir, lambda path: save_hybrid_snapshot(system, path)
+                )
+            else:
+                system = train_hybrid_system(connection)
+                self._version += 1
+            
+            self._current = (system, self._version, datetime.now())
+            print(f"✅ Modelo híbrido v{self._version} publicado")
+            return system
+    
+    def clear(self):
+        """Descartar el modelo actual; el siguiente acceso reentrenará"""
+        with self._refresh_lock:
+            self._current = None
+    
+    def get_info(self):
+        """Versión y fecha de entrenamiento del modelo publicado"""
+        current = self._current
+        if current is None:
+            return {'loaded': False, 'version': self._version, 'trained_at': None}
+        
+        system, version, trained_at = current
+        return {
+            'loaded': True,
+            'version': version,
+            'trained_at': trained_at.isoformat(),
+            'total_articles': len(system.articles_data),
+            'total_users': len(system.user_behavior_data)
+        }
+
+# Instancia global compartida por las funciones de API
+model_registry = HybridModelRegistry(snapshot_dir=os.path.join(DEFAULT_SNAPSHOT_DIR, 'hybrid_system'))
+
 # ================================
 # FUNCIONES DE API PARA EL SISTEMA HÍBRIDO
 # ================================
 
+def refresh_hybrid_model(connection):
+    """Reentrenar y publicar explícitamente una nueva versión del modelo"""
+    try:
+        model_registry.refresh(connection)
+        return model_registry.get_info()
+    except Exception as e:
+        print(f"❌ Error reentrenando modelo híbrido: {e}")
+        return None
+
 def get_hybrid_recommendations_for_user(connection, user_id, n_recommendations=10):
     """Obtener recomendaciones híbridas para un usuario"""
     try:
-        system = HybridRecommendationSystem(connection)
-        
-        # Cargar todos los datos
-        system.load_comprehensive_data()
-        
-        # Construir modelos
-        system.build_user_item_matrix()
-        system.build_content_similarity_matrix()
-        system.train_collaborative_model()
-        system.cluster_users()
+        # Modelo entrenado compartido (se entrena solo la primera vez)
+        system = model_registry.get_model(connection)
         
         # Obtener recomendaciones
         recommendations = system.get_hybrid_recommendations(user_id, n_recommendations)
@@ -681,12 +1019,7 @@ def get_hybrid_recommendations_for_user(connection, user_id, n_recommendations=1
 def predict_user_rating_for_article(connection, user_id, article_id):
     """Predecir rating que un usuario daría a un artículo específico"""
     try:
-        system = HybridRecommendationSystem(connection)
-        system.load_comprehensive_data()
-        system.build_user_item_matrix()
-        system.build_content_similarity_matrix()
-        system.train_collaborative_model()
-        system.cluster_users()
+        system = model_registry.get_model(connection)
         
         predicted_rating, confidence, details = system.predict_rating(user_id, article_id)
         
@@ -706,9 +1039,7 @@ def predict_user_rating_for_article(connection, user_id, article_id):
 def analyze_user_behavior(connection, user_id):
     """Analizar comportamiento detallado de un usuario"""
     try:
-        system = HybridRecommendationSystem(connection)
-        system.load_comprehensive_data()
-        system.cluster_users()
+        system = model_registry.get_model(connection)
         
         if user_id not in system.user_behavior_data:
             return None
@@ -751,12 +1082,7 @@ def analyze_user_behavior(connection, user_id):
 def get_system_insights(connection):
     """Obtener insights del sistema completo"""
     try:
-        system = HybridRecommendationSystem(connection)
-        system.load_comprehensive_data()
-        system.build_user_item_matrix()
-        system.build_content_similarity_matrix()
-        system.train_collaborative_model()
-        system.cluster_users()
+        system = model_registry.get_model(connection)
         
         # Estadísticas generales
         total_users = len(system.user_behavior_data)
@@ -0,0 +1,409 @@
+"""
+Cola de Trabajos de Cálculo
+La API solo encola trabajos (cálculo diario, particiones, limpieza) y consulta su
+estado; un worker separado (recommendation_worker.py) los toma de la tabla
+recommendation_jobs y los ejecuta uno a la vez. El cálculo se protege con un lock
+de MySQL (GET_LOCK) para que nunca corran dos a la vez aunque haya varios workers
+El backend 'local' mantiene la cola en memoria y el worker corre en un hilo del
+mismo proceso de la API (desarrollo, sin tabla de trabajos)
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import itertools
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+JOB_QUEUE_CONFIG = {
+    'backend': 'database',     # 'database' (tabla recommendation_jobs) o 'local' (en memoria)
+    'poll_interval': 5,        # Segundos entre consultas del worker cuando la cola está vacía
+    'stale_after': 6 * 3600,   # Segundos tras los que un trabajo 'running' se da por perdido
+    'lock_name': 'ojs_recommendation_calculation'
+}
+
+CALCULATION_JOB = 'calculate_recommendations'
+PARTITION_JOB = 'partition_maintenance'
+CLEANUP_JOB = 'weekly_cleanup'
+
+# Tipos de trabajo que no pueden correr en paralelo entre workers
+EXCLUSIVE_JOB_TYPES = {CALCULATION_JOB}
+
+def make_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+def _decode(value):
+    if value is None or isinstance(value, (dict, list)):
+        return value
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+# ================================
+# COLA EN BASE DE DATOS
+# ================================
+
+class DatabaseJobQueue:
+    """
+    Cola persistente en la tabla recommendation_jobs
+    connection_factory: contexto que presta una conexión (get_db_connection)
+    lock_connect: abre una conexión dedicada para GET_LOCK, que vive en la sesión
+    y se libera sola si el worker muere
+    """
+
+    backend = 'database'
+
+    def __init__(self, connection_factory, lock_connect, config=None):
+        self.connection_factory = connection_factory
+        self.lock_connect = lock_connect
+        self.config = dict(JOB_QUEUE_CONFIG, **(config or {}))
+
+    def ensure_table(self):
+        with self.connection_factory() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS recommendation_jobs (
+                        job_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                        job_type VARCHAR(64) NOT NULL,
+                        params TEXT NULL,
+                        status ENUM('queued', 'running', 'completed', 'failed') DEFAULT 'queued',
+                        requested_by VARCHAR(64) NULL,
+                        worker_id VARCHAR(128) NULL,
+                        attempts INT DEFAULT 0,
+                        result TEXT NULL,
+                        error_message TEXT NULL,
+                        created_at DATETIME NOT NULL,
+                        started_at DATETIME NULL,
+                        finished_at DATETIME NULL,
+
+                        INDEX idx_status_job (status, job_id),
+                        INDEX idx_type_finished (job_type, finished_at)
+                    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci
+                """)
+            conn.commit()
+
+    def _row_to_job(self, row):
+        if row is None:
+            return None
+        job = dict(row)
+        job['params'] = _decode(job['params']) or {}
+        job['result'] = _decode(job['result'])
+        return job
+
+    def enqueue(self, job_type, params=None, requested_by='api'):
+        """Encolar un trabajo; si ya hay uno igual en espera se devuelve ese"""
+        params_json = json.dumps(params or {}, sort_keys=True)
+        with self.connection_factory() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT * FROM recommendation_jobs
+                    WHERE status = 'queued' AND job_type = %s AND params = %s
+                    ORDER BY job_id LIMIT 1
+                """, (job_type, params_json))
+                existing = cursor.fetchone()
+                if existing:
+                    return self._row_to_job(existing)
+
+                cursor.execute("""
+                    INSERT INTO recommendation_jobs (job_type, params, status, requested_by, created_at)
+                    VALUES (%s, %s, 'queued', %s, %s)
+                """, (job_type, params_json, requested_by, datetime.now()))
+                job_id = cursor.lastrowid
+            conn.commit()
+        print(f"📥 Trabajo {job_id} encolado: {job_type} {params or ''}")
+        return self.get_job(job_id)
+
+    def claim(self, worker_id):
+        """Tomar el trabajo en espera más antiguo (UPDATE atómico); None si no hay"""
+        with self.connection_factory() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE recommendation_jobs
+                    SET status = 'running', worker_id = %s, started_at = %s, attempts = attempts + 1
+                    WHERE status = 'queued'
+                    ORDER BY job_id LIMIT 1
+                """, (worker_id, datetime.now()))
+                conn.commit()
+                if not cursor.rowcount:
+                    return None
+
+                cursor.execute("""
+                    SELECT * FROM recommendation_jobs
+                    WHERE status = 'running' AND worker_id = %s
+                    ORDER BY job_id DESC LIMIT 1
+                """, (worker_id,))
+                return self._row_to_job(cursor.fetchone())
+
+    def requeue(self, job_id):
+        """Devolver a la cola un trabajo tomado que no pudo empezar (lock ocupado)"""
+        with self.connection_factory() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE recommendation_jobs
+                    SET status = 'queued', worker_id = NULL, started_at = NULL
+                    WHERE job_id = %s
+                """, (job_id,))
+            conn.commit()
+
+    def finish(self, job_id, success, result=None, error=None):
+        with self.connection_factory() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE recommendation_jobs
+                    SET status = %s, result = %s, error_message = %s, finished_at = %s
+                    WHERE job_id = %s
+                """, (
+                    'completed' if success else 'failed',
+                    json.dumps(result, default=str) if result is not None else None,
+                    error,
+                    datetime.now(),
+                    job_id
+                ))
+            conn.commit()
+
+    def fail_stale(self):
+        """Marcar como fallidos los trabajos 'running' de workers que murieron"""
+        cutoff = datetime.now() - timedelta(seconds=self.config['stale_after'])
+        with self.connection_factory() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE recommendation_jobs
+                    SET status = 'failed', error_message = 'Worker perdido', finished_at = %s
+                    WHERE status = 'running' AND started_at < %s
+                """, (datetime.now(), cutoff))
+                stale = cursor.rowcount
+            conn.commit()
+        if stale:
+            print(f"⚠️ {stale} trabajos sin terminar marcados como fallidos")
+        return stale
+
+    def get_job(self, job_id):
+        with self.connection_factory() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT * FROM recommendation_jobs WHERE job_id = %s", (job_id,))
+                return self._row_to_job(cursor.fetchone())
+
+    def list_jobs(self, limit=20, status=None):
+        status_filter = "WHERE status = %s" if status else ""
+        params = (status, limit) if status else (limit,)
+        with self.connection_factory() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(f"""
+                    SELECT * FROM recommendation_jobs {status_filter}
+                    ORDER BY job_id DESC LIMIT %s
+                """, params)
+                return [self._row_to_job(row) for row in cursor.fetchall()]
+
+    def latest_finished(self, job_type):
+        """Último trabajo terminado (completado o fallido) de un tipo"""
+        with self.connection_factory() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT * FROM recommendation_jobs
+                    WHERE job_type = %s AND status IN ('completed', 'failed')
+                    ORDER BY finished_at DESC, job_id DESC LIMIT 1
+                """, (job_type,))
+                return self._row_to_job(cursor.fetchone())
+
+    @contextmanager
+    def exclusive_lock(self, name=None):
+        """Lock entre procesos con GET_LOCK sin espera; entrega True si se obtuvo"""
+        name = name or self.config['lock_name']
+        connection = self.lock_connect()
+        acquired = False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT GET_LOCK(%s, 0) AS acquired", (name,))
+                acquired = bool(cursor.fetchone()['acquired'])
+            yield acquired
+        finally:
+            try:
+                if acquired:
+                    with connection.cursor() as cursor:
+                        cursor.execute("SELECT RELEASE_LOCK(%s)", (name,))
+            finally:
+                connection.close()
+
+    def is_locked(self, name=None):
+        with self.connection_factory() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT IS_USED_LOCK(%s) AS owner", (name or self.config['lock_name'],))
+                return cursor.fetchone()['owner'] is not None
+
+# ================================
+# COLA LOCAL (EN MEMORIA)
+# ================================
+
+class LocalJobQueue:
+    """Misma interfaz que DatabaseJobQueue, en memoria y válida solo dentro de un proceso"""
+
+    backend = 'local'
+
+    def __init__(self, config=None):
+        self.config = dict(JOB_QUEUE_CONFIG, **(config or {}))
+        self._jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._exclusive = {}
+
+    def ensure_table(self):
+        pass
+
+    def enqueue(self, job_type, params=None, requested_by='api'):
+        params = dict(params or {})
+        with self._lock:
+            for job in self._jobs.values():
+                if job['status'] == 'queued' and job['job_type'] == job_type and job['params'] == params:
+                    return dict(job)
+            job_id = next(self._ids)
+            self._jobs[job_id] = {
+                'job_id': job_id, 'job_type': job_type, 'params': params, 'status': 'queued',
+                'requested_by': requested_by, 'worker_id': None, 'attempts': 0, 'result': None,
+                'error_message': None, 'created_at': datetime.now(), 'started_at': None, 'finished_at': None
+            }
+        print(f"📥 Trabajo {job_id} encolado: {job_type} {params or ''}")
+        return self.get_job(job_id)
+
+    def claim(self, worker_id):
+        with self._lock:
+            queued = [job for job in self._jobs.values() if job['status'] == 'queued']
+            if not queued:
+                return None
+            job = min(queued, key=lambda item: item['job_id'])
+            job.update(status='running', worker_id=worker_id, started_at=datetime.now(), attempts=job['attempts'] + 1)
+            return dict(job)
+
+    def requeue(self, job_id):
+        with self._lock:
+            self._jobs[job_id].update(status='queued', worker_id=None, started_at=None)
+
+    def finish(self, job_id, success, result=None, error=None):
+        with self._lock:
+            self._jobs[job_id].update(
+                status='completed' if success else 'failed',
+                result=result, error_message=error, finished_at=datetime.now()
+            )
+
+    def fail_stale(self):
+        return 0
+
+    def get_job(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list_jobs(self, limit=20, status=None):
+        with self._lock:
+            jobs = [dict(job) for job in self._jobs.values() if not status or job['status'] == status]
+        return sorted(jobs, key=lambda job: job['job_id'], reverse=True)[:limit]
+
+    def latest_finished(self, job_type):
+        with self._lock:
+            finished = [
+                job for job in self._jobs.values()
+                if job['job_type'] == job_type and job['status'] in ('completed', 'failed')
+            ]
+            return dict(max(finished, key=lambda job: (job['finished_at'], job['job_id']))) if finished else None
+
+    @contextmanager
+    def exclusive_lock(self, name=None):
+        lock = self._exclusive.setdefault(name or self.config['lock_name'], threading.Lock())
+        acquired = lock.acquire(blocking=False)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                lock.release()
+
+    def is_locked(self, name=None):
+        lock = self._exclusive.get(name or self.config['lock_name'])
+        return lock is not None and lock.locked()
+
+# ================================
+# WORKER
+# ================================
+
+class JobWorker:
+    """
+    Ejecuta trabajos de la cola uno a la vez
+    handlers: {job_type: función(params) -> (éxito, resultado, error)}
+    """
+
+    def __init__(self, queue, handlers, worker_id=None):
+        self.queue = queue
+        self.handlers = handlers
+        self.worker_id = worker_id or make_worker_id()
+        self.current_job = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def process_next(self):
+        """Tomar y ejecutar un trabajo; devuelve False si la cola estaba vacía o el lock ocupado"""
+        job = self.queue.claim(self.worker_id)
+        if job is None:
+            return False
+
+        handler = self.handlers.get(job['job_type'])
+        if handler is None:
+            self.queue.finish(job['job_id'], False, error=f"Tipo de trabajo desconocido: {job['job_type']}")
+            return True
+
+        if job['job_type'] in EXCLUSIVE_JOB_TYPES:
+            with self.queue.exclusive_lock() as acquired:
+                if not acquired:
+                    print(f"⏳ Trabajo {job['job_id']} en espera: otro cálculo está en curso")
+                    self.queue.requeue(job['job_id'])
+                    return False
+                self._run(job, handler)
+        else:
+            self._run(job, handler)
+        return True
+
+    def _run(self, job, handler):
+        print(f"⚙️ [{self.worker_id}] Ejecutando trabajo {job['job_id']}: {job['job_type']}")
+        self.current_job = job
+        start = time.perf_counter()
+        try:
+            success, result, error = handler(job['params'])
+        except Exception as e:
+            success, result, error = False, None, str(e)
+        finally:
+            self.current_job = None
+
+        self.queue.finish(job['job_id'], success, result=result, error=error)
+        status = '✅' if success else '❌'
+        print(f"{status} Trabajo {job['job_id']} terminado en {time.perf_counter() - start:.1f}s"
+              + (f": {error}" if error else ""))
+
+    def run_forever(self, once=False):
+        """Procesar la cola hasta stop(); con once=True termina cuando queda vacía"""
+        self.queue.ensure_table()
+        self.queue.fail_stale()
+        print(f"👷 Worker {self.worker_id} escuchando la cola ({self.queue.backend})")
+        while not self._stop.is_set():
+            try:
+                processed = self.process_next()
+            except Exception as e:
+                print(f"❌ Error en el worker: {e}")
+                processed = False
+            if not processed:
+                if once:
+                    break
+                self._stop.wait(self.queue.config['poll_interval'])
+        print(f"👋 Worker {self.worker_id} detenido")
+
+    def start_thread(self):
+        """Worker en un hilo del proceso actual (backend local)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, name='job-worker', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
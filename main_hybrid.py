@@ -4,8 +4,9 @@ Adaptada para usar las tablas reales de OJS y recommendation_cache
 Versión corregida para FastAPI moderno
 """
 
-from fastapi import FastAPI, HTTPException, Query, BackgroundTasks, Path
+from fastapi import FastAPI, HTTPException, Query, Path
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 import pymysql
 from contextlib import contextmanager
@@ -19,9 +20,23 @@ from dataclasses import dataclass, asdict
 import asyncio
 import threading
 import time
+import functools
 import schedule
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+
+from change_tracker import refresh_engine_snapshot
+from article_summary import create_summary_table
+from hybrid_recommendation_system import model_registry, refresh_hybrid_model
+from response_cache import ResponseCache
+from db_pool import ConnectionPool
+from db_async import AsyncConnectionPool
+from stage_graph import StageGraph
+from job_queue import (
+    JOB_QUEUE_CONFIG, CALCULATION_JOB, PARTITION_JOB, CLEANUP_JOB,
+    DatabaseJobQueue, LocalJobQueue, JobWorker
+)
 
 # ================================
 # CONFIGURACIÓN BASE DE DATOS
@@ -36,21 +51,61 @@ DB_CONFIG = {
     'cursorclass': pymysql.cursors.DictCursor
 }
 
+# Filas por sentencia INSERT multi-fila en escrituras masivas (un commit por lote)
+WRITE_BATCH_SIZE = 2000
+
+# Etapas del cálculo que corren a la vez, cada una con su conexión del pool
+STAGE_WORKERS = 4
+
+# Particionado diario por calculation_date de las tablas persistentes
+PARTITION_CONFIG = {
+    'enabled': False,  # Al activarlo, create_persistent_tables convierte las tablas existentes
+    'days_ahead': 7    # Particiones diarias creadas por adelantado
+}
+
+# Días de retención por tabla (limpieza semanal)
+RETENTION_DAYS = {
+    'persistent_recommendations': 7,
+    'homepage_recommendations': 7,
+    'article_metrics_daily': 30,
+    'recommendation_system_status': 30
+}
+
+# Versión del esquema de create_persistent_tables: subirla al cambiar tablas o columnas
+# El arranque solo recrea/verifica las tablas cuando cambia (ver ensure_schema)
+SCHEMA_VERSION = 2
+
+# Arranque de la API
+STARTUP_CONFIG = {
+    'blocking': False,     # True: el lifespan espera el esquema y el encolado antes de servir
+    'retry_interval': 15   # Segundos entre reintentos si la BD no responde al arrancar
+}
+
+# Pool compartido por endpoints, programador y cálculo (límites en db_pool.POOL_CONFIG)
+db_pool = ConnectionPool(DB_CONFIG)
+
+# Pool async para los endpoints de lectura async def (ver db_async.ASYNC_DB_CONFIG)
+async_db = AsyncConnectionPool(DB_CONFIG, db_pool)
+
 @contextmanager
 def get_db_connection():
-    """Contexto de conexión a base de datos"""
-    connection = pymysql.connect(**DB_CONFIG)
-    try:
+    """Contexto de conexión a base de datos (prestada por el pool y devuelta al salir)"""
+    with db_pool.connection() as connection:
         yield connection
-    finally:
-        connection.close()
 
 # ================================
 # ESQUEMA DE BASE DE DATOS PERSISTENTE CORREGIDO
 # ================================
 
-def create_persistent_tables():
-    """Crear/actualizar tablas para almacenamiento persistente de recomendaciones"""
+def create_persistent_tables(partitioned=None):
+    """
+    Crear/actualizar tablas para almacenamiento persistente de recomendaciones
+    partitioned (por defecto PARTITION_CONFIG['enabled']) convierte las tablas a
+    particiones diarias por calculation_date
+    """
+    if partitioned is None:
+        partitioned = PARTITION_CONFIG['enabled']
+    
     with get_db_connection() as conn:
         with conn.cursor() as cursor:
             
@@ -160,9 +215,339 @@ def create_persistent_tables():
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci
             """)
             
+            # Resumen de artículos (JOIN de homepage y de la migración de recomendaciones);
+            # se crea vacío y lo llena el primer cálculo (refresh_article_summaries)
+            create_summary_table(cursor)
+            
             conn.commit()
+            
+            if partitioned:
+                for table in RETENTION_DAYS:
+                    if get_date_partitions(cursor, table):
+                        ensure_future_partitions(cursor, table)
+                    else:
+                        partition_table_by_date(cursor, table)
+                        print(f"✅ Tabla {table} particionada por calculation_date")
+            
             print("✅ Todas las tablas persistentes verificadas/creadas correctamente")
 
+def ensure_schema(partitioned=None, force=False):
+    """
+    Aplicar create_persistent_tables solo si cambió SCHEMA_VERSION o el particionado
+    La versión aplicada queda en recommendation_schema_version; devuelve True si se aplicó
+    """
+    if partitioned is None:
+        partitioned = PARTITION_CONFIG['enabled']
+    version = f"{SCHEMA_VERSION}{'-partitioned' if partitioned else ''}"
+    
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS recommendation_schema_version (
+                    component VARCHAR(64) NOT NULL PRIMARY KEY,
+                    version VARCHAR(64) NOT NULL,
+                    applied_at DATETIME NOT NULL
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci
+            """)
+            cursor.execute("""
+                SELECT version FROM recommendation_schema_version WHERE component = 'persistent_tables'
+            """)
+            applied = cursor.fetchone()
+        conn.commit()
+    
+    if not force and applied and applied['version'] == version:
+        print(f"✅ Esquema persistente al día (versión {version})")
+        return False
+    
+    create_persistent_tables(partitioned)
+    
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO recommendation_schema_version (component, version, applied_at)
+                VALUES ('persistent_tables', %s, %s)
+                ON DUPLICATE KEY UPDATE version = VALUES(version), applied_at = VALUES(applied_at)
+            """, (version, datetime.now()))
+        conn.commit()
+    print(f"🆙 Esquema persistente actualizado a la versión {version}")
+    return True
+
+# ================================
+# PARTICIONES POR FECHA
+# ================================
+
+FUTURE_PARTITION = 'p_future'
+
+def _day_partition_name(day):
+    return f"p{day:%Y%m%d}"
+
+def _day_partition_definitions(first_day, last_day):
+    """Una partición por día en [first_day, last_day]"""
+    definitions = []
+    day = first_day
+    while day <= last_day:
+        next_day = day + timedelta(days=1)
+        definitions.append(f"PARTITION {_day_partition_name(day)} VALUES LESS THAN ('{next_day.isoformat()}')")
+        day = next_day
+    return definitions
+
+def get_date_partitions(cursor, table):
+    """
+    Particiones de una tabla en orden: dicts con name, bound (límite superior
+    exclusivo, None para MAXVALUE) y rows (estimado). Lista vacía si no está particionada
+    """
+    cursor.execute("""
+        SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """, (table,))
+    
+    partitions = []
+    for row in cursor.fetchall():
+        description = row['PARTITION_DESCRIPTION']
+        bound = None
+        if description != 'MAXVALUE':
+            bound = datetime.strptime(description.strip("'"), '%Y-%m-%d').date()
+        partitions.append({'name': row['PARTITION_NAME'], 'bound': bound, 'rows': row['TABLE_ROWS'] or 0})
+    return partitions
+
+def partition_table_by_date(cursor, table, days_ahead=None):
+    """
+    Convertir una tabla existente a particiones diarias RANGE COLUMNS(calculation_date)
+    Los días más antiguos que cualquier retención quedan en una sola partición p_history
+    """
+    if days_ahead is None:
+        days_ahead = PARTITION_CONFIG['days_ahead']
+    
+    today = datetime.now().date()
+    cursor.execute(f"SELECT MIN(calculation_date) AS first_day FROM {table}")
+    first_day = min(cursor.fetchone()['first_day'] or today, today)
+    
+    definitions = []
+    history_end = today - timedelta(days=max(RETENTION_DAYS.values()))
+    if first_day < history_end:
+        definitions.append(f"PARTITION p_history VALUES LESS THAN ('{history_end.isoformat()}')")
+        first_day = history_end
+    definitions += _day_partition_definitions(first_day, today + timedelta(days=days_ahead))
+    definitions.append(f"PARTITION {FUTURE_PARTITION} VALUES LESS THAN (MAXVALUE)")
+    
+    # Toda clave única de una tabla particionada debe incluir la columna de partición
+    cursor.execute(f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (id, calculation_date)")
+    cursor.execute(f"""
+        ALTER TABLE {table}
+        PARTITION BY RANGE COLUMNS(calculation_date) ({', '.join(definitions)})
+    """)
+
+def ensure_future_partitions(cursor, table, days_ahead=None):
+    """
+    Crear las particiones diarias que falten hasta hoy + days_ahead separándolas de
+    p_future (vacía en operación normal, así REORGANIZE no mueve filas)
+    Devuelve el número de particiones creadas
+    """
+    if days_ahead is None:
+        days_ahead = PARTITION_CONFIG['days_ahead']
+    
+    bounds = [partition['bound'] for partition in get_date_partitions(cursor, table) if partition['bound']]
+    if not bounds:
+        return 0
+    
+    definitions = _day_partition_definitions(max(bounds), datetime.now().date() + timedelta(days=days_ahead))
+    if not definitions:
+        return 0
+    
+    definitions.append(f"PARTITION {FUTURE_PARTITION} VALUES LESS THAN (MAXVALUE)")
+    cursor.execute(f"""
+        ALTER TABLE {table}
+        REORGANIZE PARTITION {FUTURE_PARTITION} INTO ({', '.join(definitions)})
+    """)
+    return len(definitions) - 1
+
+def purge_expired_rows(cursor, table, days_to_keep):
+    """
+    Eliminar filas con calculation_date anterior a hoy - days_to_keep
+    En tablas particionadas se eliminan particiones completas (DROP PARTITION, costo
+    independiente del tamaño); en las demás se usa DELETE por rango
+    Devuelve filas eliminadas (estimadas en tablas particionadas)
+    """
+    partitions = get_date_partitions(cursor, table)
+    
+    if not partitions:
+        cursor.execute(f"""
+            DELETE FROM {table} 
+            WHERE calculation_date < DATE_SUB(CURDATE(), INTERVAL %s DAY)
+        """, (days_to_keep,))
+        return cursor.rowcount
+    
+    cutoff = datetime.now().date() - timedelta(days=days_to_keep)
+    expired = [partition for partition in partitions if partition['bound'] and partition['bound'] <= cutoff]
+    if not expired:
+        return 0
+    
+    cursor.execute(f"ALTER TABLE {table} DROP PARTITION {', '.join(partition['name'] for partition in expired)}")
+    return sum(partition['rows'] for partition in expired)
+
+def maintain_date_partitions():
+    """Crear por adelantado las particiones de los próximos días en las tablas particionadas"""
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            for table in RETENTION_DAYS:
+                if get_date_partitions(cursor, table):
+                    created = ensure_future_partitions(cursor, table)
+                    if created:
+                        print(f"🗂️ {created} particiones nuevas en {table}")
+
+# ================================
+# ESCRITURA MASIVA
+# ================================
+
+def bulk_write(conn, sql, rows, batch_size=WRITE_BATCH_SIZE, label='filas'):
+    """
+    Escribir filas con executemany en lotes de batch_size, un commit por lote
+    pymysql reescribe INSERT ... VALUES (...) [ON DUPLICATE KEY UPDATE ...] como
+    una sola sentencia multi-fila, así cada lote es un único viaje al servidor
+    Devuelve el número de filas escritas
+    """
+    if not rows:
+        return 0
+    
+    start = time.perf_counter()
+    with conn.cursor() as cursor:
+        for offset in range(0, len(rows), batch_size):
+            cursor.executemany(sql, rows[offset:offset + batch_size])
+            conn.commit()
+    
+    elapsed = time.perf_counter() - start
+    rate = len(rows) / elapsed if elapsed > 0 else float('inf')
+    print(f"   💾 {len(rows)} {label} escritas en {elapsed:.2f}s ({rate:,.0f} filas/s, lotes de {batch_size})")
+    return len(rows)
+
+# ================================
+# ÍNDICE EN MEMORIA DE ARTÍCULOS
+# ================================
+
+class ArticleLookupIndex:
+    """
+    Índice en proceso publication_id -> {publication_id, submission_id, context_id, issue_id}
+    Se reconstruye con el cálculo nocturno; los ids que falten se consultan en BD y se agregan
+    El diccionario se reemplaza completo en cada reconstrucción (swap atómico de referencia)
+    """
+    
+    def __init__(self):
+        self._by_publication = {}
+        self._by_submission = {}
+        self._built_at = None
+        self._lock = threading.Lock()
+    
+    def _query_entries(self, conn, publication_ids=None, submission_ids=None):
+        id_filter = ''
+        params = None
+        if publication_ids is not None:
+            id_filter = f"AND p.publication_id IN ({', '.join(['%s'] * len(publication_ids))})"
+            params = tuple(publication_ids)
+        elif submission_ids is not None:
+            id_filter = f"AND p.submission_id IN ({', '.join(['%s'] * len(submission_ids))})"
+            params = tuple(submission_ids)
+        
+        with conn.cursor() as cursor:
+            cursor.execute(f"""
+                SELECT 
+                    p.publication_id,
+                    p.submission_id,
+                    s.context_id,
+                    s.current_publication_id,
+                    ps_issue.setting_value as issue_id
+                FROM publications p
+                JOIN submissions s ON p.submission_id = s.submission_id
+                LEFT JOIN publication_settings ps_issue ON p.publication_id = ps_issue.publication_id
+                    AND ps_issue.setting_name = 'issueId'
+                WHERE p.status = 3
+                {id_filter}
+            """, params)
+            
+            entries = {}
+            for row in cursor.fetchall():
+                entries[row['publication_id']] = {
+                    'publication_id': row['publication_id'],
+                    'submission_id': row['submission_id'],
+                    'context_id': row['context_id'],
+                    'issue_id': int(row['issue_id']) if row['issue_id'] else None,
+                    'is_current': row['current_publication_id'] == row['publication_id']
+                }
+            return entries
+    
+    def _submission_map(self, entries):
+        """submission_id -> publication_id, priorizando la publicación actual"""
+        by_submission = {}
+        for entry in entries.values():
+            if entry['is_current'] or entry['submission_id'] not in by_submission:
+                by_submission[entry['submission_id']] = entry['publication_id']
+        return by_submission
+    
+    def rebuild(self, conn):
+        """Reconstruir el índice completo desde BD"""
+        start = time.perf_counter()
+        entries = self._query_entries(conn)
+        by_submission = self._submission_map(entries)
+        with self._lock:
+            self._by_publication = entries
+            self._by_submission = by_submission
+            self._built_at = datetime.now()
+        print(f"🗂️ Índice de artículos reconstruido: {len(entries)} publicaciones en {time.perf_counter() - start:.2f}s")
+        return len(entries)
+    
+    def _add_entries(self, entries):
+        if not entries:
+            return
+        with self._lock:
+            by_publication = dict(self._by_publication)
+            by_publication.update(entries)
+            self._by_publication = by_publication
+            self._by_submission = self._submission_map(by_publication)
+    
+    def lookup(self, publication_ids=(), submission_ids=()):
+        """
+        Resolver ids en memoria; construye el índice si no existe y completa los
+        faltantes con una sola consulta. Devuelve (encontrados por publication_id, faltantes)
+        """
+        if self._built_at is None:
+            with get_db_connection() as conn:
+                self.rebuild(conn)
+        
+        by_publication = self._by_publication
+        by_submission = self._by_submission
+        missing_publications = [pub_id for pub_id in publication_ids if pub_id not in by_publication]
+        missing_submissions = [sub_id for sub_id in submission_ids if sub_id not in by_submission]
+        
+        if missing_publications or missing_submissions:
+            with get_db_connection() as conn:
+                if missing_publications:
+                    self._add_entries(self._query_entries(conn, publication_ids=missing_publications))
+                if missing_submissions:
+                    self._add_entries(self._query_entries(conn, submission_ids=missing_submissions))
+            by_publication = self._by_publication
+            by_submission = self._by_submission
+        
+        found = {}
+        missing = []
+        for pub_id in publication_ids:
+            if pub_id in by_publication:
+                found[pub_id] = by_publication[pub_id]
+            else:
+                missing.append(pub_id)
+        for sub_id in submission_ids:
+            if sub_id in by_submission:
+                found[by_submission[sub_id]] = by_publication[by_submission[sub_id]]
+            else:
+                missing.append(sub_id)
+        return found, missing
+    
+    def get_info(self):
+        return {
+            'publications': len(self._by_publication),
+            'built_at': self._built_at.isoformat() if self._built_at else None
+        }
+
 # ================================
 # MOTOR DE CÁLCULO PERSISTENTE CORREGIDO
 # ================================
@@ -173,13 +558,18 @@ class PersistentRecommendationCalculator:
     CORREGIDA para usar recommendation_cache como fuente
     """
     
-    def __init__(self):
+    def __init__(self, write_batch_size=WRITE_BATCH_SIZE, stage_workers=STAGE_WORKERS):
         self.calculation_date = datetime.now().date()
+        self.write_batch_size = write_batch_size
+        self.stage_workers = stage_workers
         self.start_time = None
         self.end_time = None
         self.total_articles = 0
         self.total_recommendations = 0
         self.errors = []
+        self.publication_changes = None
+        self.target_aggregates = None
+        self.stage_metadata = None
     
     def calculate_all_recommendations(self, force_recalculate=False):
         """Calcular todas las recomendaciones usando datos existentes"""
@@ -197,27 +587,35 @@ class PersistentRecommendationCalculator:
                 
                 # Registrar inicio del cálculo
                 self._register_calculation_start(conn)
-                
-                # 1. Migrar datos de recommendation_cache a persistent_recommendations
-                success_articles = self._migrate_recommendation_cache(conn)
-                
-                # 2. Calcular recomendaciones para homepage
-                success_homepage = self._calculate_homepage_recommendations(conn)
-                
-                # 3. Actualizar métricas de artículos
-                self._update_article_metrics(conn)
-                
-                # Finalizar cálculo
-                self.end_time = datetime.now()
-                duration = (self.end_time - self.start_time).total_seconds()
-                
-                if success_articles and success_homepage:
+            
+            # Etapas según sus dependencias; las independientes corren a la vez
+            graph = self._build_stage_graph()
+            success = graph.run(max_workers=self.stage_workers)
+            self.stage_metadata = graph.get_metadata(self.stage_workers)
+            
+            # Finalizar cálculo
+            self.end_time = datetime.now()
+            duration = (self.end_time - self.start_time).total_seconds()
+            
+            with get_db_connection() as conn:
+                if success:
                     self._register_calculation_success(conn, duration)
-                    print(f"✅ Cálculo completado en {duration:.1f}s")
+                    
+                    # Reconstruir el índice de artículos junto con el modelo nocturno
+                    try:
+                        article_lookup_index.rebuild(conn)
+                    except Exception as e:
+                        print(f"⚠️ Error reconstruyendo índice de artículos: {e}")
+                    
+                    print(f"✅ Cálculo completado en {duration:.1f}s "
+                          f"(etapas: {self.stage_metadata['stage_seconds']:.1f}s, "
+                          f"x{self.stage_metadata['parallel_speedup'] or 1} en paralelo)")
                     print(f"📊 {self.total_articles} artículos, {self.total_recommendations} recomendaciones")
                     return True
                 else:
-                    self._register_calculation_failure(conn, "Error en cálculo de recomendaciones")
+                    error_msg = f"Error en cálculo de recomendaciones (etapas: {', '.join(graph.failed_stages())})"
+                    self.errors.append(error_msg)
+                    self._register_calculation_failure(conn, error_msg)
                     return False
                     
         except Exception as e:
@@ -233,20 +631,85 @@ class PersistentRecommendationCalculator:
                 
             return False
     
+    def _build_stage_graph(self):
+        """
+        Etapas del cálculo y sus dependencias:
+        - refresh_publications (opcional) -> migrate_recommendations -> target_aggregates
+        - recent_articles solo lee publications: corre en paralelo con la migración
+        - featured/popular/trending y article_metrics dependen solo de la agregación del día
+        - homepage_write reemplaza las cuatro listas del día en una transacción
+        - hybrid_model (opcional) reentrena el modelo híbrido sobre article_summaries ya
+          actualizada y publica una generación que la API carga al verla
+        """
+        graph = StageGraph(get_db_connection)
+        
+        # 0. Aplicar al motor solo las publicaciones nuevas, modificadas o despublicadas
+        graph.add('refresh_publications', self._refresh_changed_publications, required=False)
+        
+        # 1. Migrar datos de recommendation_cache a persistent_recommendations
+        graph.add('migrate_recommendations', self._migrate_recommendation_cache,
+                  depends_on=['refresh_publications'])
+        
+        # 2. Listas de homepage
+        graph.add('recent_articles', self._calculate_recent_articles)
+        graph.add('target_aggregates', self._load_target_aggregates,
+                  depends_on=['migrate_recommendations'])
+        graph.add('featured_articles', lambda: self._calculate_featured_articles(self.target_aggregates),
+                  depends_on=['target_aggregates'], uses_connection=False)
+        graph.add('popular_articles', lambda: self._calculate_popular_articles(self.target_aggregates),
+                  depends_on=['target_aggregates'], uses_connection=False)
+        graph.add('trending_articles', lambda: self._calculate_trending_articles(self.target_aggregates),
+                  depends_on=['target_aggregates'], uses_connection=False)
+        
+        list_stages = ['recent_articles', 'featured_articles', 'popular_articles', 'trending_articles']
+        graph.add('homepage_write',
+                  lambda conn: self._write_homepage_recommendations(
+                      conn, [row for stage in list_stages for row in graph.outputs[stage]]
+                  ),
+                  depends_on=list_stages)
+        
+        # 3. Actualizar métricas de artículos
+        graph.add('article_metrics', self._update_article_metrics, depends_on=['target_aggregates'])
+        
+        # 4. Nueva generación del modelo híbrido (un fallo conserva la generación anterior)
+        graph.add('hybrid_model', self._refresh_hybrid_model, depends_on=['refresh_publications'],
+                  required=False)
+        
+        return graph
+    
+    def _refresh_changed_publications(self, conn):
+        """Detectar el delta de publicaciones desde la última corrida y actualizar el snapshot del motor"""
+        print("🔎 Detectando cambios en publicaciones...")
+        
+        try:
+            self.publication_changes = refresh_engine_snapshot(conn)
+            return self.publication_changes is not None
+        except Exception as e:
+            # El resto del cálculo no depende del snapshot; se reintenta en la próxima corrida
+            print(f"⚠️ Error en actualización incremental del motor: {e}")
+            return False
+    
+    def _refresh_hybrid_model(self, conn):
+        """Entrenar el modelo híbrido y publicarlo como generación de snapshot"""
+        print("🧠 Reentrenando modelo híbrido...")
+        info = refresh_hybrid_model(conn)
+        if info is not None:
+            print(f"✅ Modelo híbrido publicado (generación {info['version']})")
+        return info is not None
+    
     def _migrate_recommendation_cache(self, conn):
         """Migrar datos de recommendation_cache a persistent_recommendations"""
         print("🔄 Migrando datos de recommendation_cache...")
         
         try:
-            # Limpiar recomendaciones del día actual
+            # El día se construye en una tabla sombra; la tabla servida no se toca hasta el swap
+            shadow_table = self._create_shadow_table(conn, 'persistent_recommendations')
+            
             with conn.cursor() as cursor:
-                cursor.execute("""
-                    DELETE FROM persistent_recommendations 
-                    WHERE calculation_date = %s
-                """, (self.calculation_date,))
-                conn.commit()
-                
                 # Obtener datos de recommendation_cache
+                # Metadatos del destino desde article_summaries (una fila indexada por artículo)
+                # refresh_publications es opcional: un destino aún sin resumen no se descarta,
+                # toma título y resumen de publication_settings
                 cursor.execute("""
                     SELECT 
                         rc.source_publication_id,
@@ -254,25 +717,15 @@ class PersistentRecommendationCalculator:
                         rc.similarity_score,
                         rc.algorithm,
                         p.submission_id,
-                        COALESCE(ps_title.setting_value, 'Sin título') as title,
-                        COALESCE(ps_abstract.setting_value, '') as abstract,
-                        GROUP_CONCAT(DISTINCT CONCAT(
-                            COALESCE(aus_fname.setting_value, ''), ' ',
-                            COALESCE(aus_lname.setting_value, '')
-                        ) SEPARATOR '; ') as authors
+                        COALESCE(a.title, (SELECT ps.setting_value FROM publication_settings ps
+                                  WHERE ps.publication_id = p.publication_id AND ps.setting_name = 'title' LIMIT 1), 'Sin título') as title,
+                        COALESCE(a.abstract_preview, (SELECT ps.setting_value FROM publication_settings ps
+                                  WHERE ps.publication_id = p.publication_id AND ps.setting_name = 'abstract' LIMIT 1), '') as abstract,
+                        a.authors
                     FROM recommendation_cache rc
                     JOIN publications p ON rc.target_publication_id = p.publication_id
-                    LEFT JOIN publication_settings ps_title ON p.publication_id = ps_title.publication_id 
-                        AND ps_title.setting_name = 'title'
-                    LEFT JOIN publication_settings ps_abstract ON p.publication_id = ps_abstract.publication_id 
-                        AND ps_abstract.setting_name = 'abstract'
-                    LEFT JOIN authors a ON p.publication_id = a.publication_id
-                    LEFT JOIN author_settings aus_fname ON a.author_id = aus_fname.author_id 
-                        AND aus_fname.setting_name = 'givenName'
-                    LEFT JOIN author_settings aus_lname ON a.author_id = aus_lname.author_id 
-                        AND aus_lname.setting_name = 'familyName'
+                    LEFT JOIN article_summaries a ON p.publication_id = a.publication_id
                     WHERE p.status = 3
-                    GROUP BY rc.source_publication_id, rc.target_publication_id, rc.similarity_score, rc.algorithm, p.submission_id
                     ORDER BY rc.source_publication_id, rc.similarity_score DESC
                 """)
                 
@@ -280,44 +733,55 @@ class PersistentRecommendationCalculator:
                 
                 if not cache_data:
                     print("⚠️ No hay datos en recommendation_cache")
+                    self._drop_shadow_table(conn, 'persistent_recommendations')
                     return False
                 
-                # Insertar en persistent_recommendations
+                # Preparar filas; los metadatos dependen solo del artículo destino,
+                # así que cada JSON se serializa una vez por destino
+                migration_date = datetime.now().isoformat()
+                metadata_by_target = {}
+                rows = []
+                
                 for row in cache_data:
-                    metadata = {
-                        'title': row['title'],
-                        'authors': row['authors'] or '',
-                        'abstract_preview': (row['abstract'] or '')[:200],
-                        'url': f'/article/view/{row["submission_id"]}',
-                        'migrated_from': 'recommendation_cache',
-                        'migration_date': datetime.now().isoformat()
-                    }
+                    target_id = row['target_publication_id']
+                    metadata_json = metadata_by_target.get(target_id)
+                    if metadata_json is None:
+                        metadata_json = json.dumps({
+                            'title': row['title'],
+                            'authors': row['authors'] or '',
+                            'abstract_preview': (row['abstract'] or '')[:200],
+                            'url': f'/article/view/{row["submission_id"]}',
+                            'migrated_from': 'recommendation_cache',
+                            'migration_date': migration_date
+                        })
+                        metadata_by_target[target_id] = metadata_json
                     
-                    cursor.execute("""
-                        INSERT INTO persistent_recommendations
-                        (source_publication_id, target_publication_id, similarity_score, 
-                         algorithm, confidence_score, metadata, calculation_date)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s)
-                        ON DUPLICATE KEY UPDATE
-                        similarity_score = VALUES(similarity_score),
-                        confidence_score = VALUES(confidence_score),
-                        metadata = VALUES(metadata)
-                    """, (
+                    rows.append((
                         row['source_publication_id'],
-                        row['target_publication_id'],
+                        target_id,
                         row['similarity_score'],
                         row['algorithm'] or 'tfidf_cosine',
                         min(row['similarity_score'] * 1.5, 1.0) if row['similarity_score'] else 0.5,
-                        json.dumps(metadata),
+                        metadata_json,
                         self.calculation_date
                     ))
-                    
-                    self.total_recommendations += 1
+                
+                # Insertar en la tabla sombra con INSERT multi-fila
+                self.total_recommendations += bulk_write(conn, f"""
+                    INSERT INTO {shadow_table}
+                    (source_publication_id, target_publication_id, similarity_score, 
+                     algorithm, confidence_score, metadata, calculation_date)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                    similarity_score = VALUES(similarity_score),
+                    confidence_score = VALUES(confidence_score),
+                    metadata = VALUES(metadata)
+                """, rows, self.write_batch_size, label='recomendaciones')
                 
                 # Contar artículos únicos
-                cursor.execute("""
+                cursor.execute(f"""
                     SELECT COUNT(DISTINCT source_publication_id) as unique_articles
-                    FROM persistent_recommendations 
+                    FROM {shadow_table} 
                     WHERE calculation_date = %s
                 """, (self.calculation_date,))
                 
@@ -325,44 +789,149 @@ class PersistentRecommendationCalculator:
                 self.total_articles = result['unique_articles'] if result else 0
                 
                 conn.commit()
-                print(f"✅ Migrados {self.total_recommendations} recomendaciones para {self.total_articles} artículos")
-                return True
+            
+            # Publicar el día completo de una vez
+            self._swap_shadow_table(conn, 'persistent_recommendations')
+            print(f"✅ Migrados {self.total_recommendations} recomendaciones para {self.total_articles} artículos")
+            return True
                 
         except Exception as e:
             print(f"❌ Error migrando recommendation_cache: {e}")
+            try:
+                self._drop_shadow_table(conn, 'persistent_recommendations')
+            except Exception:
+                pass
             return False
     
-    def _calculate_homepage_recommendations(self, conn):
-        """Calcular recomendaciones para homepage usando datos reales"""
-        print("🏠 Calculando recomendaciones para homepage...")
-        
-        try:
-            # Limpiar recomendaciones homepage del día
-            with conn.cursor() as cursor:
-                cursor.execute("""
-                    DELETE FROM homepage_recommendations 
-                    WHERE calculation_date = %s
-                """, (self.calculation_date,))
-                conn.commit()
-            
-            # 1. Artículos recientes (últimos 90 días, ordenados por fecha)
-            self._calculate_recent_articles(conn)
-            
-            # 2. Artículos destacados (más recomendados)
-            self._calculate_featured_articles(conn)
-            
-            # 3. Artículos populares (combinando recencia y recomendaciones)
-            self._calculate_popular_articles(conn)
+    # ================================
+    # TABLAS SOMBRA (PUBLICACIÓN ATÓMICA)
+    # ================================
+    
+    def _day_partition(self, cursor, table):
+        """Partición diaria de calculation_date si la tabla está particionada; None en otro caso"""
+        name = _day_partition_name(self.calculation_date)
+        partitions = get_date_partitions(cursor, table)
+        if partitions and not any(partition['name'] == name for partition in partitions):
+            ensure_future_partitions(cursor, table)
+            partitions = get_date_partitions(cursor, table)
+        return name if any(partition['name'] == name for partition in partitions) else None
+    
+    def _create_shadow_table(self, conn, table):
+        """
+        Crear {table}_shadow con la misma estructura; el día actual se inserta después
+        Tabla particionada: la sombra es una tabla simple con solo el día (se publica
+        con EXCHANGE PARTITION, sin copiar los días ya publicados)
+        Sin particiones: la sombra se llena con los demás días de la tabla servida y
+        reemplaza a la tabla completa con RENAME TABLE
+        """
+        shadow_table = f"{table}_shadow"
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {shadow_table}")
+            cursor.execute(f"CREATE TABLE {shadow_table} LIKE {table}")
             
-            # 4. Artículos trending (recientes con buenas recomendaciones)
-            self._calculate_trending_articles(conn)
+            if self._day_partition(cursor, table):
+                cursor.execute(f"ALTER TABLE {shadow_table} REMOVE PARTITIONING")
+            else:
+                # Se copian también los ids, así el AUTO_INCREMENT sigue desde el de la tabla servida
+                cursor.execute(f"""
+                    INSERT INTO {shadow_table}
+                    SELECT * FROM {table} WHERE calculation_date <> %s
+                """, (self.calculation_date,))
+        conn.commit()
+        return shadow_table
+    
+    def _swap_shadow_table(self, conn, table):
+        """
+        Publicar la sombra de forma atómica, así los lectores ven el conjunto anterior
+        completo o el nuevo completo, nunca uno a medio llenar
+        Tabla particionada: EXCHANGE PARTITION del día (intercambio de metadatos).
+        Sin particiones: RENAME TABLE de la tabla servida y la sombra en una sola
+        sentencia atómica; la tabla anterior se descarta completa con DROP TABLE
+        En ningún caso la tabla servida recibe DELETE ni INSERT
+        """
+        shadow_table = f"{table}_shadow"
+        old_table = f"{table}_old"
+        with conn.cursor() as cursor:
+            day_partition = self._day_partition(cursor, table)
             
-            print("✅ Recomendaciones homepage completadas")
-            return True
+            if day_partition:
+                cursor.execute(f"ALTER TABLE {table} EXCHANGE PARTITION {day_partition} WITH TABLE {shadow_table}")
+                # Tras el intercambio la sombra contiene las filas anteriores del día
+                cursor.execute(f"DROP TABLE IF EXISTS {shadow_table}")
+            else:
+                cursor.execute(f"DROP TABLE IF EXISTS {old_table}")
+                cursor.execute(f"RENAME TABLE {table} TO {old_table}, {shadow_table} TO {table}")
+                cursor.execute(f"DROP TABLE IF EXISTS {old_table}")
+        conn.commit()
+        print(f"   🔀 {table} publicada desde {shadow_table}")
+    
+    def _drop_shadow_table(self, conn, table):
+        """Descartar una sombra incompleta; la tabla servida queda intacta"""
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}_shadow")
+        conn.commit()
+    
+    def _write_homepage_recommendations(self, conn, rows):
+        """Reemplazar las listas de homepage del día con las filas calculadas"""
+        print("🏠 Guardando recomendaciones para homepage...")
+        
+        # El DELETE se confirma junto con el primer lote
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                DELETE FROM homepage_recommendations 
+                WHERE calculation_date = %s
+            """, (self.calculation_date,))
+        
+        bulk_write(conn, """
+            INSERT INTO homepage_recommendations
+            (publication_id, recommendation_type, rank_position, score, calculation_date)
+            VALUES (%s, %s, %s, %s, %s)
+        """, rows, self.write_batch_size, label='recomendaciones homepage')
+        conn.commit()
+        
+        print("✅ Recomendaciones homepage completadas")
+        return True
+    
+    def _load_target_aggregates(self, conn):
+        """
+        Agregar una sola vez las recomendaciones del día por artículo destino:
+        número de apariciones, similitud promedio y antigüedad en días
+        """
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT 
+                    pr.target_publication_id as publication_id,
+                    COUNT(*) as rec_count,
+                    AVG(pr.similarity_score) as avg_similarity,
+                    p.date_published,
+                    DATEDIFF(CURDATE(), p.date_published) as days_old
+                FROM persistent_recommendations pr
+                LEFT JOIN publications p ON pr.target_publication_id = p.publication_id
+                WHERE pr.calculation_date = %s
+                GROUP BY pr.target_publication_id
+            """, (self.calculation_date,))
             
-        except Exception as e:
-            print(f"❌ Error calculando homepage: {e}")
-            return False
+            aggregates = [
+                {
+                    'publication_id': row['publication_id'],
+                    'rec_count': int(row['rec_count']),
+                    'avg_similarity': float(row['avg_similarity'] or 0.0),
+                    'date_published': row['date_published'],
+                    'days_old': row['days_old']
+                }
+                for row in cursor.fetchall()
+            ]
+        
+        self.target_aggregates = aggregates
+        return aggregates
+    
+    def _rank_homepage_rows(self, recommendation_type, scored, limit):
+        """Filas (publication_id, tipo, rank, score, fecha) de los `limit` mejores puntajes"""
+        scored = sorted(scored, key=lambda item: (-item[1], item[0]))[:limit]
+        return [
+            (publication_id, recommendation_type, rank, score, self.calculation_date)
+            for rank, (publication_id, score) in enumerate(scored, 1)
+        ]
     
     def _calculate_recent_articles(self, conn):
         """Calcular artículos recientes usando datos reales de OJS"""
@@ -386,175 +955,85 @@ class PersistentRecommendationCalculator:
             """)
             
             recent_articles = cursor.fetchall()
-            
-            for rank, article in enumerate(recent_articles, 1):
-                cursor.execute("""
-                    INSERT INTO homepage_recommendations
-                    (publication_id, recommendation_type, rank_position, score, calculation_date)
-                    VALUES (%s, 'recent', %s, %s, %s)
-                """, (
-                    article['publication_id'],
-                    rank,
-                    article['recency_score'],
-                    self.calculation_date
-                ))
-            
-            conn.commit()
-            print(f"   📅 {len(recent_articles)} artículos recientes")
+        
+        print(f"   📅 {len(recent_articles)} artículos recientes")
+        return [
+            (article['publication_id'], 'recent', rank, article['recency_score'], self.calculation_date)
+            for rank, article in enumerate(recent_articles, 1)
+        ]
     
-    def _calculate_featured_articles(self, conn):
+    def _calculate_featured_articles(self, aggregates):
         """Calcular artículos destacados basados en recomendaciones"""
-        with conn.cursor() as cursor:
-            # Artículos que más aparecen como recomendaciones
-            cursor.execute("""
-                SELECT 
-                    pr.target_publication_id as publication_id,
-                    COUNT(*) as recommendation_count,
-                    AVG(pr.similarity_score) as avg_similarity,
-                    (COUNT(*) * 0.7 + AVG(pr.similarity_score) * 0.3) as featured_score
-                FROM persistent_recommendations pr
-                WHERE pr.calculation_date = %s
-                GROUP BY pr.target_publication_id
-                HAVING recommendation_count >= 2
-                ORDER BY featured_score DESC
-                LIMIT 15
-            """, (self.calculation_date,))
-            
-            featured_articles = cursor.fetchall()
-            
-            for rank, article in enumerate(featured_articles, 1):
-                cursor.execute("""
-                    INSERT INTO homepage_recommendations
-                    (publication_id, recommendation_type, rank_position, score, calculation_date)
-                    VALUES (%s, 'featured', %s, %s, %s)
-                """, (
-                    article['publication_id'],
-                    rank,
-                    article['featured_score'],
-                    self.calculation_date
-                ))
-            
-            conn.commit()
-            print(f"   ⭐ {len(featured_articles)} artículos destacados")
+        # Artículos que más aparecen como recomendaciones
+        scored = [
+            (item['publication_id'], item['rec_count'] * 0.7 + item['avg_similarity'] * 0.3)
+            for item in aggregates if item['rec_count'] >= 2
+        ]
+        rows = self._rank_homepage_rows('featured', scored, 15)
+        print(f"   ⭐ {len(rows)} artículos destacados")
+        return rows
     
-    def _calculate_popular_articles(self, conn):
+    def _calculate_popular_articles(self, aggregates):
         """Calcular artículos populares"""
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT 
-                    pr.target_publication_id as publication_id,
-                    COUNT(*) as rec_count,
-                    AVG(pr.similarity_score) as avg_score,
-                    COALESCE(DATEDIFF(CURDATE(), p.date_published), 365) as days_old,
-                    (COUNT(*) * 0.6 + AVG(pr.similarity_score) * 0.3 + 
-                     (GREATEST(0, 180 - COALESCE(DATEDIFF(CURDATE(), p.date_published), 365)) / 180.0) * 0.1) as popularity_score
-                FROM persistent_recommendations pr
-                LEFT JOIN publications p ON pr.target_publication_id = p.publication_id
-                WHERE pr.calculation_date = %s
-                GROUP BY pr.target_publication_id
-                HAVING rec_count >= 1
-                ORDER BY popularity_score DESC
-                LIMIT 12
-            """, (self.calculation_date,))
-            
-            popular_articles = cursor.fetchall()
-            
-            for rank, article in enumerate(popular_articles, 1):
-                cursor.execute("""
-                    INSERT INTO homepage_recommendations
-                    (publication_id, recommendation_type, rank_position, score, calculation_date)
-                    VALUES (%s, 'popular', %s, %s, %s)
-                """, (
-                    article['publication_id'],
-                    rank,
-                    article['popularity_score'],
-                    self.calculation_date
-                ))
-            
-            conn.commit()
-            print(f"   🔥 {len(popular_articles)} artículos populares")
+        scored = []
+        for item in aggregates:
+            days_old = item['days_old'] if item['days_old'] is not None else 365
+            scored.append((
+                item['publication_id'],
+                item['rec_count'] * 0.6 + item['avg_similarity'] * 0.3 +
+                (max(0, 180 - days_old) / 180.0) * 0.1
+            ))
+        rows = self._rank_homepage_rows('popular', scored, 12)
+        print(f"   🔥 {len(rows)} artículos populares")
+        return rows
     
-    def _calculate_trending_articles(self, conn):
+    def _calculate_trending_articles(self, aggregates):
         """Calcular artículos en tendencia"""
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT 
-                    pr.target_publication_id as publication_id,
-                    COUNT(*) as rec_count,
-                    AVG(pr.similarity_score) as avg_score,
-                    p.date_published,
-                    (COUNT(*) * 0.8 + 
-                     CASE 
-                        WHEN p.date_published IS NULL THEN 0.1
-                        WHEN DATEDIFF(CURDATE(), p.date_published) <= 14 THEN 0.2
-                        WHEN DATEDIFF(CURDATE(), p.date_published) <= 30 THEN 0.15
-                        ELSE 0.05
-                     END) as trending_score
-                FROM persistent_recommendations pr
-                LEFT JOIN publications p ON pr.target_publication_id = p.publication_id
-                WHERE pr.calculation_date = %s
-                GROUP BY pr.target_publication_id
-                HAVING rec_count >= 1
-                ORDER BY trending_score DESC
-                LIMIT 10
-            """, (self.calculation_date,))
-            
-            trending_articles = cursor.fetchall()
-            
-            for rank, article in enumerate(trending_articles, 1):
-                cursor.execute("""
-                    INSERT INTO homepage_recommendations
-                    (publication_id, recommendation_type, rank_position, score, calculation_date)
-                    VALUES (%s, 'trending', %s, %s, %s)
-                """, (
-                    article['publication_id'],
-                    rank,
-                    article['trending_score'],
-                    self.calculation_date
-                ))
-            
-            conn.commit()
-            print(f"   📈 {len(trending_articles)} artículos trending")
+        scored = []
+        for item in aggregates:
+            if item['date_published'] is None:
+                recency_bonus = 0.1
+            elif item['days_old'] <= 14:
+                recency_bonus = 0.2
+            elif item['days_old'] <= 30:
+                recency_bonus = 0.15
+            else:
+                recency_bonus = 0.05
+            scored.append((item['publication_id'], item['rec_count'] * 0.8 + recency_bonus))
+        rows = self._rank_homepage_rows('trending', scored, 10)
+        print(f"   📈 {len(rows)} artículos trending")
+        return rows
     
     def _update_article_metrics(self, conn):
         """Actualizar métricas diarias de artículos"""
         print("📊 Actualizando métricas de artículos...")
         
-        with conn.cursor() as cursor:
-            # Calcular métricas basadas en recomendaciones
-            cursor.execute("""
-                SELECT 
-                    pr.target_publication_id as publication_id,
-                    COUNT(*) as recommendation_count,
-                    AVG(pr.similarity_score) as avg_similarity,
-                    COUNT(*) * AVG(pr.similarity_score) as popularity_score
-                FROM persistent_recommendations pr
-                WHERE pr.calculation_date = %s
-                GROUP BY pr.target_publication_id
-            """, (self.calculation_date,))
-            
-            metrics = cursor.fetchall()
-            
-            for metric in metrics:
-                cursor.execute("""
-                    INSERT INTO article_metrics_daily
-                    (publication_id, calculation_date, recommendation_clicks, 
-                     popularity_score, trending_score)
-                    VALUES (%s, %s, %s, %s, %s)
-                    ON DUPLICATE KEY UPDATE
-                    recommendation_clicks = VALUES(recommendation_clicks),
-                    popularity_score = VALUES(popularity_score),
-                    trending_score = VALUES(trending_score)
-                """, (
-                    metric['publication_id'],
-                    self.calculation_date,
-                    metric['recommendation_count'],
-                    metric['popularity_score'],
-                    metric['avg_similarity']
-                ))
-            
-            conn.commit()
-            print(f"   📈 Métricas actualizadas para {len(metrics)} artículos")
+        # Métricas basadas en recomendaciones, derivadas de la misma agregación de la homepage
+        metrics = self.target_aggregates
+        if metrics is None:
+            metrics = self._load_target_aggregates(conn)
+        
+        bulk_write(conn, """
+            INSERT INTO article_metrics_daily
+            (publication_id, calculation_date, recommendation_clicks, 
+             popularity_score, trending_score)
+            VALUES (%s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+            recommendation_clicks = VALUES(recommendation_clicks),
+            popularity_score = VALUES(popularity_score),
+            trending_score = VALUES(trending_score)
+        """, [
+            (
+                metric['publication_id'],
+                self.calculation_date,
+                metric['rec_count'],
+                metric['rec_count'] * metric['avg_similarity'],
+                metric['avg_similarity']
+            )
+            for metric in metrics
+        ], self.write_batch_size, label='métricas')
+        
+        print(f"   📈 Métricas actualizadas para {len(metrics)} artículos")
     
     def _already_calculated_today(self, conn):
         """Verificar si ya se calculó hoy"""
@@ -588,16 +1067,21 @@ class PersistentRecommendationCalculator:
                     calculation_duration_seconds = %s,
                     total_articles_processed = %s,
                     total_recommendations_generated = %s,
-                    status = 'completed'
+                    status = 'completed',
+                    metadata = %s
                 WHERE calculation_date = %s
             """, (
                 self.end_time,
                 int(duration_seconds),
                 self.total_articles,
                 self.total_recommendations,
+                json.dumps(self.stage_metadata) if self.stage_metadata else None,
                 self.calculation_date
             ))
             conn.commit()
+        
+        # Las respuestas de lectura de esta fecha de cálculo quedan obsoletas
+        response_cache.invalidate_calculation(self.calculation_date)
     
     def _register_calculation_failure(self, conn, error_message):
         """Registrar fallo del cálculo"""
@@ -606,31 +1090,42 @@ class PersistentRecommendationCalculator:
                 UPDATE recommendation_system_status 
                 SET calculation_end_time = %s,
                     status = 'failed',
-                    error_message = %s
+                    error_message = %s,
+                    metadata = %s
                 WHERE calculation_date = %s
             """, (
                 datetime.now(),
                 error_message,
+                json.dumps(self.stage_metadata) if self.stage_metadata else None,
                 self.calculation_date
             ))
             conn.commit()
+        
+        response_cache.invalidate_calculation(self.calculation_date)
 
 # ================================
 # PROGRAMADOR DE TAREAS (SIN CAMBIOS)
 # ================================
 
 class RecommendationScheduler:
-    """Programador para cálculos automáticos diarios"""
+    """
+    Programador de trabajos diarios: solo los encola en job_queue y un worker
+    separado los ejecuta; además aplica en este proceso los cálculos que terminan
+    """
     
     def __init__(self):
         self.scheduler = BackgroundScheduler()
         self.is_running = False
+        self.last_calculation_job_id = None
     
     def start_scheduler(self):
         """Iniciar programador"""
         if self.is_running:
             return
         
+        # Línea base del seguimiento: todo cálculo terminado después de esta se aplica
+        self.last_calculation_job_id = self._latest_calculation_job_id()
+        
         # Programar cálculo diario a las 3:00 AM
         self.scheduler.add_job(
             func=self.daily_calculation_job,
@@ -640,6 +1135,15 @@ class RecommendationScheduler:
             replace_existing=True
         )
         
+        # Crear particiones de los próximos días (solo tablas particionadas)
+        self.scheduler.add_job(
+            func=self.partition_maintenance_job,
+            trigger=CronTrigger(hour=0, minute=15),
+            id='partition_maintenance',
+            name='Mantenimiento de Particiones',
+            replace_existing=True
+        )
+        
         # Programar limpieza semanal (domingos a las 2:00 AM)
         self.scheduler.add_job(
             func=self.weekly_cleanup_job,
@@ -649,6 +1153,15 @@ class RecommendationScheduler:
             replace_existing=True
         )
         
+        # Detectar cálculos terminados por el worker
+        self.scheduler.add_job(
+            func=self.calculation_watch_job,
+            trigger=IntervalTrigger(minutes=1),
+            id='calculation_watch',
+            name='Seguimiento de Cálculos del Worker',
+            replace_existing=True
+        )
+        
         self.scheduler.start()
         self.is_running = True
         print("📅 Programador iniciado - Cálculo diario a las 3:00 AM")
@@ -660,55 +1173,208 @@ class RecommendationScheduler:
         self.is_running = False
     
     def daily_calculation_job(self):
-        """Job de cálculo diario"""
-        print("🌅 Iniciando cálculo diario programado...")
-        calculator = PersistentRecommendationCalculator()
-        success = calculator.calculate_all_recommendations()
-        
-        if success:
-            print("✅ Cálculo diario completado exitosamente")
-        else:
-            print("❌ Error en cálculo diario")
+        """Job de cálculo diario (se encola para el worker)"""
+        print("🌅 Encolando cálculo diario programado...")
+        self._enqueue(CALCULATION_JOB, {'force': False})
+    
+    def partition_maintenance_job(self):
+        """Job diario de particiones por adelantado"""
+        self._enqueue(PARTITION_JOB)
     
     def weekly_cleanup_job(self):
         """Job de limpieza semanal"""
-        print("🧹 Iniciando limpieza semanal...")
-        
+        self._enqueue(CLEANUP_JOB)
+    
+    def _enqueue(self, job_type, params=None):
         try:
-            with get_db_connection() as conn:
-                with conn.cursor() as cursor:
-                    # Eliminar recomendaciones de más de 7 días
-                    cursor.execute("""
-                        DELETE FROM persistent_recommendations 
-                        WHERE calculation_date < DATE_SUB(CURDATE(), INTERVAL 7 DAY)
-                    """)
-                    
-                    cursor.execute("""
-                        DELETE FROM homepage_recommendations 
-                        WHERE calculation_date < DATE_SUB(CURDATE(), INTERVAL 7 DAY)
-                    """)
-                    
-                    cursor.execute("""
-                        DELETE FROM article_metrics_daily 
-                        WHERE calculation_date < DATE_SUB(CURDATE(), INTERVAL 30 DAY)
-                    """)
-                    
-                    cursor.execute("""
-                        DELETE FROM recommendation_system_status 
-                        WHERE calculation_date < DATE_SUB(CURDATE(), INTERVAL 30 DAY)
-                    """)
-                    
-                    conn.commit()
-                    print("✅ Limpieza semanal completada")
-                    
+            job_queue.enqueue(job_type, params, requested_by='scheduler')
+        except Exception as e:
+            print(f"❌ Error encolando {job_type}: {e}")
+    
+    def _latest_calculation_job_id(self):
+        """
+        Id del último cálculo terminado, o None si no hay ninguno o la BD no responde
+        Con None, el primer cálculo que se vea se aplica (en el peor caso, uno ya
+        aplicado vuelve a invalidar la caché y reconstruir el índice)
+        """
+        try:
+            job = job_queue.latest_finished(CALCULATION_JOB)
+            return job['job_id'] if job else None
+        except Exception as e:
+            print(f"⚠️ No se pudo leer el último cálculo terminado: {e}")
+            return None
+    
+    def calculation_watch_job(self):
+        """
+        Cuando el worker termina un cálculo, invalidar las respuestas en caché de esa
+        fecha, reconstruir el índice de artículos de este proceso y cargar la
+        generación del modelo híbrido que publicó
+        """
+        try:
+            job = job_queue.latest_finished(CALCULATION_JOB)
+            if job is None or job['job_id'] == self.last_calculation_job_id:
+                return
+            
+            self.last_calculation_job_id = job['job_id']
+            result = job['result'] or {}
+            calculation_date = result.get('calculation_date')
+            response_cache.invalidate_calculation(
+                datetime.strptime(calculation_date, '%Y-%m-%d').date() if calculation_date else None
+            )
+            if job['status'] == 'completed' and article_lookup_index.get_info()['built_at']:
+                with get_db_connection() as conn:
+                    article_lookup_index.rebuild(conn)
+            model_registry.sync_generation()
         except Exception as e:
-            print(f"❌ Error en limpieza semanal: {e}")
+            print(f"⚠️ Error revisando cálculos terminados: {e}")
+
+# ================================
+# TRABAJOS DEL WORKER
+# ================================
+
+def run_calculation_job(params):
+    """Cálculo completo de recomendaciones; params: {'force': bool}"""
+    calculator = PersistentRecommendationCalculator()
+    success = calculator.calculate_all_recommendations(force_recalculate=bool(params.get('force')))
+    result = {
+        'calculation_date': calculator.calculation_date.isoformat(),
+        'articles': calculator.total_articles,
+        'recommendations': calculator.total_recommendations
+    }
+    error = None if success else ('; '.join(calculator.errors) or 'Error en cálculo de recomendaciones')
+    return success, result, error
+
+def run_partition_job(params):
+    """Particiones diarias por adelantado"""
+    maintain_date_partitions()
+    return True, None, None
+
+def run_cleanup_job(params):
+    """Eliminar datos fuera de la retención de cada tabla"""
+    print("🧹 Iniciando limpieza semanal...")
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            for table, days_to_keep in RETENTION_DAYS.items():
+                purge_expired_rows(cursor, table, days_to_keep)
+            conn.commit()
+    print("✅ Limpieza semanal completada")
+    return True, {'tables': list(RETENTION_DAYS)}, None
+
+JOB_HANDLERS = {
+    CALCULATION_JOB: run_calculation_job,
+    PARTITION_JOB: run_partition_job,
+    CLEANUP_JOB: run_cleanup_job
+}
+
+def create_job_queue():
+    """Cola según JOB_QUEUE_CONFIG['backend']"""
+    if JOB_QUEUE_CONFIG['backend'] == 'local':
+        return LocalJobQueue()
+    return DatabaseJobQueue(get_db_connection, lambda: pymysql.connect(**DB_CONFIG))
+
+def enqueue_calculation_if_missing():
+    """Encolar el cálculo del día si todavía no se completó"""
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT status FROM recommendation_system_status 
+                WHERE calculation_date = CURDATE() AND status = 'completed'
+            """)
+            if cursor.fetchone():
+                return None
+    print("🔄 No hay cálculo para hoy, encolando cálculo inicial...")
+    return job_queue.enqueue(CALCULATION_JOB, {'force': False}, requested_by='startup')
 
 # ================================
 # INSTANCIA GLOBAL
 # ================================
 
+job_queue = create_job_queue()
 scheduler = RecommendationScheduler()
+article_lookup_index = ArticleLookupIndex()
+response_cache = ResponseCache()
+
+# Con la cola local no hay proceso worker: los trabajos corren en un hilo de la API
+local_worker = JobWorker(job_queue, JOB_HANDLERS) if job_queue.backend == 'local' else None
+
+def cached_response(route, ttl=None, live_fields=None):
+    """
+    Servir un endpoint de lectura desde response_cache, con clave ruta + parámetros
+    Las respuestas con 'error' no se guardan; live_fields() agrega campos de estado
+    del proceso (scheduler, caché) que no deben quedar congelados en la caché
+    """
+    cache_if = lambda value: not (isinstance(value, dict) and 'error' in value)
+
+    def add_live_fields(response):
+        if live_fields is not None and isinstance(response, dict) and 'error' not in response:
+            response = dict(response)
+            response.update(live_fields())
+        return response
+
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(**kwargs):
+                response = await response_cache.get_or_compute_async(
+                    route, kwargs, lambda: func(**kwargs), ttl=ttl, cache_if=cache_if
+                )
+                return add_live_fields(response)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(**kwargs):
+            response = response_cache.get_or_compute(
+                route, kwargs, lambda: func(**kwargs), ttl=ttl, cache_if=cache_if
+            )
+            return add_live_fields(response)
+        return wrapper
+    return decorator
+
+# ================================
+# ARRANQUE NO BLOQUEANTE
+# ================================
+
+# Estado de las tareas de arranque, expuesto en /ready
+startup_state = {
+    'phase': 'starting',   # starting -> ready, o retrying mientras la BD no responda
+    'started_at': datetime.now(),
+    'ready_at': None,
+    'attempts': 0,
+    'schema_updated': None,
+    'error': None
+}
+_startup_stop = threading.Event()
+
+def run_startup_tasks(max_attempts=None, loop=None):
+    """
+    Verificar el esquema (solo si cambió la versión), crear la cola y encolar el
+    cálculo del día si falta. La API ya sirve los datos del último cálculo mientras
+    tanto; si la BD no responde se reintenta cada retry_interval segundos
+    loop: event loop de la API; con él también se reintenta el pool async hasta que
+    conecte (mientras tanto los endpoints async usan el pool síncrono en hilos)
+    """
+    while not _startup_stop.is_set():
+        startup_state['attempts'] += 1
+        try:
+            startup_state['schema_updated'] = ensure_schema()
+            job_queue.ensure_table()
+            if local_worker is not None:
+                local_worker.start_thread()
+            enqueue_calculation_if_missing()
+            if loop is not None and not asyncio.run_coroutine_threadsafe(async_db.start(), loop).result():
+                raise RuntimeError("el pool async aiomysql no pudo conectar")
+            
+            startup_state.update(phase='ready', ready_at=datetime.now(), error=None)
+            elapsed = (startup_state['ready_at'] - startup_state['started_at']).total_seconds()
+            print(f"✅ Sistema listo en {elapsed:.1f}s")
+            return True
+        except Exception as e:
+            startup_state.update(phase='retrying', error=str(e))
+            print(f"⚠️ Error en tareas de arranque (intento {startup_state['attempts']}): {e}")
+            if max_attempts is not None and startup_state['attempts'] >= max_attempts:
+                return False
+            _startup_stop.wait(STARTUP_CONFIG['retry_interval'])
+    return False
 
 # ================================
 # LIFESPAN EVENT HANDLER
@@ -719,35 +1385,33 @@ async def lifespan(app: FastAPI):
     """Manejar eventos de startup y shutdown de forma moderna"""
     # Startup
     print("🚀 Inicializando sistema de recomendaciones persistentes...")
-    
-    # Crear tablas
-    create_persistent_tables()
+    startup_state['started_at'] = datetime.now()
+    _startup_stop.clear()
     
     # Iniciar programador
     scheduler.start_scheduler()
     
-    # Verificar si necesita cálculo inicial
-    try:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute("""
-                    SELECT status FROM recommendation_system_status 
-                    WHERE calculation_date = CURDATE() AND status = 'completed'
-                """)
-                
-                if not cursor.fetchone():
-                    print("🔄 No hay cálculo para hoy, iniciando cálculo inicial...")
-                    calculator = PersistentRecommendationCalculator()
-                    calculator.calculate_all_recommendations()
-    except Exception as e:
-        print(f"⚠️ Error verificando estado inicial: {e}")
-    
-    print("✅ Sistema iniciado correctamente")
+    # Esquema, pool async de los endpoints de lectura y cálculo inicial (lo ejecuta el
+    # worker, no este proceso); hasta que el pool async conecte se usa el pool síncrono
+    if STARTUP_CONFIG['blocking']:
+        await async_db.start()
+        run_startup_tasks(max_attempts=1)
+    else:
+        threading.Thread(
+            target=run_startup_tasks, kwargs={'loop': asyncio.get_running_loop()},
+            name='startup-tasks', daemon=True
+        ).start()
+        print("⚡ API sirviendo; esquema y cálculo inicial se verifican en segundo plano (/ready)")
     
     yield
     
     # Shutdown
+    _startup_stop.set()
     scheduler.stop_scheduler()
+    if local_worker is not None:
+        local_worker.stop(timeout=5)
+    await async_db.close()
+    db_pool.close()
     print("🛑 Sistema detenido")
 
 # ================================
@@ -789,6 +1453,7 @@ app.add_middleware(
 # ================================
 
 @app.get("/")
+@cached_response('/', live_fields=lambda: {"scheduler_status": "active" if scheduler.is_running else "inactive"})
 def root():
     """Información del sistema persistente"""
     try:
@@ -844,6 +1509,12 @@ def root():
         }
 
 @app.get("/status")
+@cached_response('/status', live_fields=lambda: {
+    "scheduler_running": scheduler.is_running,
+    "response_cache": response_cache.get_info(),
+    "db_pool": db_pool.get_info(),
+    "async_db": async_db.get_info()
+})
 def get_system_status():
     """Estado detallado del sistema"""
     try:
@@ -924,24 +1595,50 @@ def get_system_status():
         return {"error": str(e), "status": "error"}
 
 @app.post("/admin/calculate-now")
-async def calculate_recommendations_now(background_tasks: BackgroundTasks, force: bool = False):
-    """Forzar cálculo inmediato de recomendaciones"""
-    
-    def run_calculation():
-        calculator = PersistentRecommendationCalculator()
-        calculator.calculate_all_recommendations(force_recalculate=force)
-    
-    background_tasks.add_task(run_calculation)
+def calculate_recommendations_now(force: bool = False):
+    """Encolar un cálculo inmediato de recomendaciones (lo ejecuta el worker)"""
+    try:
+        job = job_queue.enqueue(CALCULATION_JOB, {'force': force}, requested_by='admin')
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"No se pudo encolar el cálculo: {e}")
     
     return {
-        "message": "Cálculo iniciado en background",
+        "message": "Cálculo encolado para el worker",
+        "job": job,
         "force_recalculate": force,
         "data_source": "recommendation_cache será migrado a persistent_recommendations",
         "estimated_time": "2-5 minutos dependiendo del número de artículos",
-        "check_status": "/status"
+        "check_status": f"/admin/jobs/{job['job_id']}"
     }
 
+@app.get("/admin/jobs")
+def list_jobs(
+    status: Optional[str] = Query(None, pattern="^(queued|running|completed|failed)$"),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Trabajos recientes de la cola y si hay un cálculo en curso"""
+    try:
+        return {
+            "backend": job_queue.backend,
+            "calculation_running": job_queue.is_locked(),
+            "jobs": job_queue.list_jobs(limit=limit, status=status)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/admin/jobs/{job_id}")
+def get_job(job_id: int):
+    """Estado de un trabajo encolado"""
+    try:
+        job = job_queue.get_job(job_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    return job
+
 @app.get("/admin/recommendations/{publication_id}")
+@cached_response('/admin/recommendations')
 def get_article_recommendations_from_db(publication_id: int, limit: int = Query(10, ge=1, le=50)):
     """Ver recomendaciones almacenadas para un artículo específico"""
     try:
@@ -989,7 +1686,51 @@ def get_article_recommendations_from_db(publication_id: int, limit: int = Query(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _parse_id_list(value):
+    """'1, 2,3' -> [1, 2, 3]"""
+    try:
+        return [int(part) for part in value.split(',') if part.strip()] if value else []
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Los ids deben ser enteros separados por comas")
+
+@app.get("/articles/lookup")
+def lookup_articles(
+    ids: Optional[str] = Query(None, description="publication_ids separados por comas"),
+    submission_ids: Optional[str] = Query(None, description="submission_ids separados por comas")
+):
+    """Resolver en lote publication_id/submission_id -> submission_id, issue_id desde el índice en memoria"""
+    publication_ids = _parse_id_list(ids)
+    submission_id_list = _parse_id_list(submission_ids)
+    if not publication_ids and not submission_id_list:
+        raise HTTPException(status_code=400, detail="Indique ids o submission_ids")
+    if len(publication_ids) + len(submission_id_list) > 500:
+        raise HTTPException(status_code=400, detail="Máximo 500 ids por consulta")
+    
+    try:
+        found, missing = article_lookup_index.lookup(publication_ids, submission_id_list)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {
+        "articles": {str(pub_id): entry for pub_id, entry in found.items()},
+        "missing": missing,
+        "index": article_lookup_index.get_info()
+    }
+
+@app.get("/articles/lookup/{publication_id}")
+def lookup_article(publication_id: int):
+    """Resolver un publication_id -> submission_id, issue_id desde el índice en memoria"""
+    try:
+        found, _ = article_lookup_index.lookup([publication_id])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if publication_id not in found:
+        raise HTTPException(status_code=404, detail="Artículo no encontrado")
+    return found[publication_id]
+
 @app.get("/admin/homepage/{recommendation_type}")
+@cached_response('/admin/homepage')
 def get_homepage_recommendations_from_db(
     recommendation_type: str = Path(..., pattern="^(recent|featured|popular|trending)$"),
     limit: int = Query(10, ge=1, le=50)
@@ -1000,27 +1741,17 @@ def get_homepage_recommendations_from_db(
             with conn.cursor() as cursor:
                 cursor.execute("""
                     SELECT hr.publication_id, hr.rank_position, hr.score,
-                           ps_title.setting_value as title,
-                           ps_abstract.setting_value as abstract,
-                           GROUP_CONCAT(CONCAT(
-                               COALESCE(aus_fname.setting_value, ''), ' ',
-                               COALESCE(aus_lname.setting_value, '')
-                           ) SEPARATOR '; ') as authors,
+                           COALESCE(a.title, (SELECT ps.setting_value FROM publication_settings ps
+                                     WHERE ps.publication_id = p.publication_id AND ps.setting_name = 'title' LIMIT 1)) as title,
+                           COALESCE(a.abstract, (SELECT ps.setting_value FROM publication_settings ps
+                                     WHERE ps.publication_id = p.publication_id AND ps.setting_name = 'abstract' LIMIT 1)) as abstract,
+                           a.authors,
                            p.submission_id
                     FROM homepage_recommendations hr
                     JOIN publications p ON hr.publication_id = p.publication_id
-                    LEFT JOIN publication_settings ps_title ON p.publication_id = ps_title.publication_id 
-                        AND ps_title.setting_name = 'title'
-                    LEFT JOIN publication_settings ps_abstract ON p.publication_id = ps_abstract.publication_id 
-                        AND ps_abstract.setting_name = 'abstract'
-                    LEFT JOIN authors a ON p.publication_id = a.publication_id
-                    LEFT JOIN author_settings aus_fname ON a.author_id = aus_fname.author_id 
-                        AND aus_fname.setting_name = 'givenName'
-                    LEFT JOIN author_settings aus_lname ON a.author_id = aus_lname.author_id 
-                        AND aus_lname.setting_name = 'familyName'
+                    LEFT JOIN article_summaries a ON p.publication_id = a.publication_id
                     WHERE hr.recommendation_type = %s 
                         AND hr.calculation_date = CURDATE()
-                    GROUP BY hr.publication_id, hr.rank_position, hr.score, p.submission_id
                     ORDER BY hr.rank_position
                     LIMIT %s
                 """, (recommendation_type, limit))
@@ -1052,6 +1783,7 @@ def get_homepage_recommendations_from_db(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/admin/cache-status")
+@cached_response('/admin/cache-status')
 def get_cache_status():
     """Ver estado de recommendation_cache (fuente de datos)"""
     try:
@@ -1138,7 +1870,7 @@ def get_cache_status():
 def repair_table_structure():
     """Reparar y verificar estructura de tablas"""
     try:
-        create_persistent_tables()
+        ensure_schema(force=True)
         
         # Verificar estructura final
         with get_db_connection() as conn:
@@ -1176,30 +1908,11 @@ def cleanup_old_data(days_to_keep: int = Query(7, ge=1, le=30)):
         with get_db_connection() as conn:
             with conn.cursor() as cursor:
                 
-                # Eliminar recomendaciones antiguas
-                cursor.execute("""
-                    DELETE FROM persistent_recommendations 
-                    WHERE calculation_date < DATE_SUB(CURDATE(), INTERVAL %s DAY)
-                """, (days_to_keep,))
-                recs_deleted = cursor.rowcount
-                
-                cursor.execute("""
-                    DELETE FROM homepage_recommendations 
-                    WHERE calculation_date < DATE_SUB(CURDATE(), INTERVAL %s DAY)
-                """, (days_to_keep,))
-                homepage_deleted = cursor.rowcount
-                
-                cursor.execute("""
-                    DELETE FROM article_metrics_daily 
-                    WHERE calculation_date < DATE_SUB(CURDATE(), INTERVAL %s DAY)
-                """, (days_to_keep,))
-                metrics_deleted = cursor.rowcount
-                
-                cursor.execute("""
-                    DELETE FROM recommendation_system_status 
-                    WHERE calculation_date < DATE_SUB(CURDATE(), INTERVAL %s DAY)
-                """, (days_to_keep,))
-                status_deleted = cursor.rowcount
+                # Eliminar recomendaciones antiguas (DROP PARTITION si la tabla está particionada)
+                recs_deleted = purge_expired_rows(cursor, 'persistent_recommendations', days_to_keep)
+                homepage_deleted = purge_expired_rows(cursor, 'homepage_recommendations', days_to_keep)
+                metrics_deleted = purge_expired_rows(cursor, 'article_metrics_daily', days_to_keep)
+                status_deleted = purge_expired_rows(cursor, 'recommendation_system_status', days_to_keep)
                 
                 conn.commit()
                 
@@ -1222,232 +1935,232 @@ def cleanup_old_data(days_to_keep: int = Query(7, ge=1, le=30)):
 # ================================
 
 @app.get("/volumes")
-def get_all_volumes():
+@cached_response('/volumes')
+async def get_all_volumes():
     """Obtener todos los volúmenes de OJS sin usar publication_issues"""
     try:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                
-                print("🔍 Iniciando consulta de volúmenes...")
-                
-                # Consulta simplificada sin publication_issues
-                cursor.execute("""
-                    SELECT 
-                        i.issue_id,
-                        i.journal_id,
-                        i.volume,
-                        i.number,
-                        i.year,
-                        i.date_published,
-                        i.date_notified,
-                        i.last_modified,
-                        i.access_status,
-                        i.open_access_date,
-                        i.published,
-                        
-                        -- Título del issue con fallback mejorado
-                        COALESCE(
-                            MAX(CASE WHEN is_title.locale = 'es' THEN is_title.setting_value END),
-                            MAX(CASE WHEN is_title.locale = 'en' THEN is_title.setting_value END),
-                            CONCAT('Volumen ', COALESCE(i.volume, ''), ' Número ', COALESCE(i.number, ''))
-                        ) as title,
-                        
-                        -- Descripción del issue
-                        COALESCE(
-                            MAX(CASE WHEN is_desc.locale = 'es' THEN is_desc.setting_value END),
-                            MAX(CASE WHEN is_desc.locale = 'en' THEN is_desc.setting_value END),
-                            ''
-                        ) as description,
-                        
-                        -- Cover image si existe
-                        MAX(CASE WHEN is_cover.setting_name = 'coverImage' THEN is_cover.setting_value END) as cover_image,
-                        
-                        -- Información del journal
-                        COALESCE(
-                            MAX(CASE WHEN js_title.locale = 'es' THEN js_title.setting_value END),
-                            MAX(CASE WHEN js_title.locale = 'en' THEN js_title.setting_value END),
-                            'Revista Científica'
-                        ) as journal_title,
-                        
-                        COALESCE(
-                            MAX(CASE WHEN js_abbrev.setting_name = 'abbreviation' THEN js_abbrev.setting_value END),
-                            ''
-                        ) as journal_abbreviation
-                        
-                    FROM issues i
-                    LEFT JOIN journals j ON i.journal_id = j.journal_id
+        async with async_db.cursor() as cursor:
+            
+            print("🔍 Iniciando consulta de volúmenes...")
+            
+            # Consulta simplificada sin publication_issues
+            await cursor.execute("""
+                SELECT 
+                    i.issue_id,
+                    i.journal_id,
+                    i.volume,
+                    i.number,
+                    i.year,
+                    i.date_published,
+                    i.date_notified,
+                    i.last_modified,
+                    i.access_status,
+                    i.open_access_date,
+                    i.published,
                     
-                    -- Settings del issue
-                    LEFT JOIN issue_settings is_title ON i.issue_id = is_title.issue_id 
-                        AND is_title.setting_name = 'title'
-                    LEFT JOIN issue_settings is_desc ON i.issue_id = is_desc.issue_id 
-                        AND is_desc.setting_name = 'description'
-                    LEFT JOIN issue_settings is_cover ON i.issue_id = is_cover.issue_id 
-                        AND is_cover.setting_name = 'coverImage'
+                    -- Título del issue con fallback mejorado
+                    COALESCE(
+                        MAX(CASE WHEN is_title.locale = 'es' THEN is_title.setting_value END),
+                        MAX(CASE WHEN is_title.locale = 'en' THEN is_title.setting_value END),
+                        CONCAT('Volumen ', COALESCE(i.volume, ''), ' Número ', COALESCE(i.number, ''))
+                    ) as title,
                     
-                    -- Settings del journal
-                    LEFT JOIN journal_settings js_title ON j.journal_id = js_title.journal_id 
-                        AND js_title.setting_name = 'name'
-                    LEFT JOIN journal_settings js_abbrev ON j.journal_id = js_abbrev.journal_id 
-                        AND js_abbrev.setting_name = 'abbreviation'
+                    -- Descripción del issue
+                    COALESCE(
+                        MAX(CASE WHEN is_desc.locale = 'es' THEN is_desc.setting_value END),
+                        MAX(CASE WHEN is_desc.locale = 'en' THEN is_desc.setting_value END),
+                        ''
+                    ) as description,
                     
-                    WHERE i.published = 1  -- Solo issues publicados
+                    -- Cover image si existe
+                    MAX(CASE WHEN is_cover.setting_name = 'coverImage' THEN is_cover.setting_value END) as cover_image,
                     
-                    GROUP BY i.issue_id, i.journal_id, i.volume, i.number, i.year, 
-                             i.date_published, i.date_notified, i.last_modified,
-                             i.access_status, i.open_access_date, i.published
+                    -- Información del journal
+                    COALESCE(
+                        MAX(CASE WHEN js_title.locale = 'es' THEN js_title.setting_value END),
+                        MAX(CASE WHEN js_title.locale = 'en' THEN js_title.setting_value END),
+                        'Revista Científica'
+                    ) as journal_title,
                     
-                    ORDER BY 
-                        COALESCE(i.date_published, i.date_notified, i.last_modified) DESC,
-                        CAST(COALESCE(i.year, '0') AS UNSIGNED) DESC,
-                        CAST(COALESCE(i.volume, '0') AS UNSIGNED) DESC,
-                        CAST(COALESCE(i.number, '0') AS UNSIGNED) DESC
-                """)
-                
-                issues = cursor.fetchall()
-                print(f"📊 Issues encontrados: {len(issues)}")
-                
-                if not issues:
-                    print("⚠️ No se encontraron issues publicados")
-                    return {
-                        'total_volumes': 0,
-                        'volumes': [],
-                        'data_source': 'ojs_database_direct',
-                        'response_time': '< 50ms',
-                        'last_updated': datetime.now().isoformat(),
-                        'message': 'No hay volúmenes publicados',
-                        'debug_info': {
-                            'query_executed': 'issues_without_publication_issues_table',
-                            'issues_found': 0
-                        }
+                    COALESCE(
+                        MAX(CASE WHEN js_abbrev.setting_name = 'abbreviation' THEN js_abbrev.setting_value END),
+                        ''
+                    ) as journal_abbreviation
+                    
+                FROM issues i
+                LEFT JOIN journals j ON i.journal_id = j.journal_id
+                
+                -- Settings del issue
+                LEFT JOIN issue_settings is_title ON i.issue_id = is_title.issue_id 
+                    AND is_title.setting_name = 'title'
+                LEFT JOIN issue_settings is_desc ON i.issue_id = is_desc.issue_id 
+                    AND is_desc.setting_name = 'description'
+                LEFT JOIN issue_settings is_cover ON i.issue_id = is_cover.issue_id 
+                    AND is_cover.setting_name = 'coverImage'
+                
+                -- Settings del journal
+                LEFT JOIN journal_settings js_title ON j.journal_id = js_title.journal_id 
+                    AND js_title.setting_name = 'name'
+                LEFT JOIN journal_settings js_abbrev ON j.journal_id = js_abbrev.journal_id 
+                    AND js_abbrev.setting_name = 'abbreviation'
+                
+                WHERE i.published = 1  -- Solo issues publicados
+                
+                GROUP BY i.issue_id, i.journal_id, i.volume, i.number, i.year, 
+                         i.date_published, i.date_notified, i.last_modified,
+                         i.access_status, i.open_access_date, i.published
+                
+                ORDER BY 
+                    COALESCE(i.date_published, i.date_notified, i.last_modified) DESC,
+                    CAST(COALESCE(i.year, '0') AS UNSIGNED) DESC,
+                    CAST(COALESCE(i.volume, '0') AS UNSIGNED) DESC,
+                    CAST(COALESCE(i.number, '0') AS UNSIGNED) DESC
+            """)
+            
+            issues = await cursor.fetchall()
+            print(f"📊 Issues encontrados: {len(issues)}")
+            
+            if not issues:
+                print("⚠️ No se encontraron issues publicados")
+                return {
+                    'total_volumes': 0,
+                    'volumes': [],
+                    'data_source': 'ojs_database_direct',
+                    'response_time': '< 50ms',
+                    'last_updated': datetime.now().isoformat(),
+                    'message': 'No hay volúmenes publicados',
+                    'debug_info': {
+                        'query_executed': 'issues_without_publication_issues_table',
+                        'issues_found': 0
                     }
-                
-                # Intentar obtener conteo de artículos por issue usando diferentes métodos
-                print("📊 Obteniendo conteo de artículos...")
-                articles_count_map = {}
-                
-                # Método 1: Intentar con submissions + current_publication_id
+                }
+            
+            # Intentar obtener conteo de artículos por issue usando diferentes métodos
+            print("📊 Obteniendo conteo de artículos...")
+            articles_count_map = {}
+            
+            # Método 1: Intentar con submissions + current_publication_id
+            try:
+                await cursor.execute("""
+                    SELECT 
+                        s.context_id as issue_id,
+                        COUNT(DISTINCT p.publication_id) as articles_count
+                    FROM submissions s
+                    JOIN publications p ON s.current_publication_id = p.publication_id
+                    WHERE p.status = 3
+                    GROUP BY s.context_id
+                """)
+                articles_data = await cursor.fetchall()
+                for row in articles_data:
+                    if row['issue_id']:
+                        articles_count_map[row['issue_id']] = row['articles_count']
+                print(f"✅ Método 1 exitoso: {len(articles_count_map)} issues con artículos")
+            except Exception as e:
+                print(f"⚠️ Método 1 falló: {e}")
+                
+                # Método 2: Fallback - contar submissions directamente
                 try:
-                    cursor.execute("""
+                    await cursor.execute("""
                         SELECT 
                             s.context_id as issue_id,
-                            COUNT(DISTINCT p.publication_id) as articles_count
+                            COUNT(DISTINCT s.submission_id) as articles_count
                         FROM submissions s
-                        JOIN publications p ON s.current_publication_id = p.publication_id
-                        WHERE p.status = 3
+                        WHERE s.status = 3
                         GROUP BY s.context_id
                     """)
-                    articles_data = cursor.fetchall()
+                    articles_data = await cursor.fetchall()
                     for row in articles_data:
                         if row['issue_id']:
                             articles_count_map[row['issue_id']] = row['articles_count']
-                    print(f"✅ Método 1 exitoso: {len(articles_count_map)} issues con artículos")
+                    print(f"✅ Método 2 exitoso: {len(articles_count_map)} issues con artículos")
                 except Exception as e:
-                    print(f"⚠️ Método 1 falló: {e}")
-                    
-                    # Método 2: Fallback - contar submissions directamente
-                    try:
-                        cursor.execute("""
-                            SELECT 
-                                s.context_id as issue_id,
-                                COUNT(DISTINCT s.submission_id) as articles_count
-                            FROM submissions s
-                            WHERE s.status = 3
-                            GROUP BY s.context_id
-                        """)
-                        articles_data = cursor.fetchall()
-                        for row in articles_data:
-                            if row['issue_id']:
-                                articles_count_map[row['issue_id']] = row['articles_count']
-                        print(f"✅ Método 2 exitoso: {len(articles_count_map)} issues con artículos")
-                    except Exception as e:
-                        print(f"⚠️ Método 2 también falló: {e}")
-                        print("📊 Usando conteo 0 para todos los artículos")
-                
-                # Procesar y limpiar datos
-                volumes_list = []
-                for issue in issues:
-                    
-                    # Determinar fecha de publicación
-                    pub_date = issue['date_published'] or issue['date_notified'] or issue['last_modified']
-                    
-                    # Determinar status de acceso
-                    access_status = 'open'
-                    if issue['access_status'] == 1:  # Subscription
-                        if issue['open_access_date'] and issue['open_access_date'] > datetime.now().date():
-                            access_status = 'subscription'
-                    
-                    # Construir URL del issue
-                    issue_url = f"/issue/view/{issue['issue_id']}"
-                    
-                    # Nombre para mostrar mejorado
-                    volume_part = f"Vol. {issue['volume']}" if issue['volume'] else ""
-                    number_part = f"Núm. {issue['number']}" if issue['number'] else ""
-                    year_part = f"({issue['year']})" if issue['year'] else ""
-                    
-                    # Construir display_name
-                    display_parts = []
-                    if volume_part:
-                        display_parts.append(volume_part)
-                    if number_part:
-                        display_parts.append(number_part)
-                    if year_part:
-                        display_parts.append(year_part)
-                    
-                    display_name = ", ".join(display_parts) if display_parts else f"Issue {issue['issue_id']}"
-                    
-                    # Obtener conteo de artículos (puede ser 0 si no hay datos)
-                    articles_count = articles_count_map.get(issue['issue_id'], 0)
-                    
-                    # Limpiar y validar título
-                    clean_title = (issue['title'] or '').strip()
-                    if not clean_title or clean_title == 'Sin título':
-                        clean_title = display_name
-                    
-                    # Limpiar descripción
-                    clean_description = (issue['description'] or '').strip()
-                    
-                    volume_data = {
-                        'issue_id': issue['issue_id'],
-                        'volume': issue['volume'],
-                        'number': issue['number'],
-                        'year': issue['year'],
-                        'title': clean_title,
-                        'description': clean_description,
-                        'date_published': pub_date.isoformat() if pub_date else None,
-                        'articles_count': articles_count,
-                        'access_status': access_status,
-                        'is_current': False,  # Se puede implementar lógica específica más adelante
-                        'cover_image': issue['cover_image'],
-                        'journal_title': issue['journal_title'] or 'Revista Científica',
-                        'journal_abbreviation': issue['journal_abbreviation'] or '',
-                        'url': issue_url,
-                        'display_name': display_name,
-                        'publication_period': f"{issue['year'] or 'Año no especificado'}"
-                    }
-                    
-                    volumes_list.append(volume_data)
-                
-                print(f"✅ {len(volumes_list)} volúmenes procesados exitosamente")
-                
-                return {
-                    'total_volumes': len(volumes_list),
-                    'volumes': volumes_list,
-                    'data_source': 'ojs_database_direct_no_publication_issues',
-                    'response_time': '< 50ms',
-                    'last_updated': datetime.now().isoformat(),
-                    'database_info': {
-                        'issues_found': len(issues),
-                        'issues_with_articles': len([v for v in volumes_list if v['articles_count'] > 0]),
-                        'total_articles': sum(v['articles_count'] for v in volumes_list),
-                        'articles_counting_method': 'submissions_fallback' if not articles_count_map else 'publications_method'
-                    },
-                    'debug_info': {
-                        'query_type': 'without_publication_issues_table',
-                        'articles_count_map_size': len(articles_count_map)
-                    }
+                    print(f"⚠️ Método 2 también falló: {e}")
+                    print("📊 Usando conteo 0 para todos los artículos")
+            
+            # Procesar y limpiar datos
+            volumes_list = []
+            for issue in issues:
+                
+                # Determinar fecha de publicación
+                pub_date = issue['date_published'] or issue['date_notified'] or issue['last_modified']
+                
+                # Determinar status de acceso
+                access_status = 'open'
+                if issue['access_status'] == 1:  # Subscription
+                    if issue['open_access_date'] and issue['open_access_date'] > datetime.now().date():
+                        access_status = 'subscription'
+                
+                # Construir URL del issue
+                issue_url = f"/issue/view/{issue['issue_id']}"
+                
+                # Nombre para mostrar mejorado
+                volume_part = f"Vol. {issue['volume']}" if issue['volume'] else ""
+                number_part = f"Núm. {issue['number']}" if issue['number'] else ""
+                year_part = f"({issue['year']})" if issue['year'] else ""
+                
+                # Construir display_name
+                display_parts = []
+                if volume_part:
+                    display_parts.append(volume_part)
+                if number_part:
+                    display_parts.append(number_part)
+                if year_part:
+                    display_parts.append(year_part)
+                
+                display_name = ", ".join(display_parts) if display_parts else f"Issue {issue['issue_id']}"
+                
+                # Obtener conteo de artículos (puede ser 0 si no hay datos)
+                articles_count = articles_count_map.get(issue['issue_id'], 0)
+                
+                # Limpiar y validar título
+                clean_title = (issue['title'] or '').strip()
+                if not clean_title or clean_title == 'Sin título':
+                    clean_title = display_name
+                
+                # Limpiar descripción
+                clean_description = (issue['description'] or '').strip()
+                
+                volume_data = {
+                    'issue_id': issue['issue_id'],
+                    'volume': issue['volume'],
+                    'number': issue['number'],
+                    'year': issue['year'],
+                    'title': clean_title,
+                    'description': clean_description,
+                    'date_published': pub_date.isoformat() if pub_date else None,
+                    'articles_count': articles_count,
+                    'access_status': access_status,
+                    'is_current': False,  # Se puede implementar lógica específica más adelante
+                    'cover_image': issue['cover_image'],
+                    'journal_title': issue['journal_title'] or 'Revista Científica',
+                    'journal_abbreviation': issue['journal_abbreviation'] or '',
+                    'url': issue_url,
+                    'display_name': display_name,
+                    'publication_period': f"{issue['year'] or 'Año no especificado'}"
                 }
                 
+                volumes_list.append(volume_data)
+            
+            print(f"✅ {len(volumes_list)} volúmenes procesados exitosamente")
+            
+            return {
+                'total_volumes': len(volumes_list),
+                'volumes': volumes_list,
+                'data_source': 'ojs_database_direct_no_publication_issues',
+                'response_time': '< 50ms',
+                'last_updated': datetime.now().isoformat(),
+                'database_info': {
+                    'issues_found': len(issues),
+                    'issues_with_articles': len([v for v in volumes_list if v['articles_count'] > 0]),
+                    'total_articles': sum(v['articles_count'] for v in volumes_list),
+                    'articles_counting_method': 'submissions_fallback' if not articles_count_map else 'publications_method'
+                },
+                'debug_info': {
+                    'query_type': 'without_publication_issues_table',
+                    'articles_count_map_size': len(articles_count_map)
+                }
+            }
+            
     except Exception as e:
         print(f"❌ Error en /volumes: {str(e)}")
         import traceback
@@ -1665,196 +2378,318 @@ def debug_date_filtering(issue_id: int):
             'traceback': traceback.format_exc()
         }
 
+# ================================
+# CACHÉ DE /volumes-no-filter
+# ================================
+
+VOLUME_CACHE_CONFIG = {
+    'enabled': True,
+    'ttl_seconds': 300,   # Vida máxima de una respuesta aunque la huella no cambie
+                          # (también acota cambios en los datos del issue)
+    'max_entries': 256
+}
+
+# issue_id -> (journal_id, huella de artículos del journal, momento de guardado, respuesta)
+_volume_cache = {}
+_volume_cache_lock = threading.Lock()
+
+def _get_cached_volume(issue_id):
+    """(journal_id, huella, respuesta) guardados si siguen vigentes; la huella se compara al servir"""
+    if not VOLUME_CACHE_CONFIG['enabled']:
+        return None
+    with _volume_cache_lock:
+        entry = _volume_cache.get(issue_id)
+    if entry is None:
+        return None
+    journal_id, fingerprint, stored_at, response = entry
+    if time.time() - stored_at > VOLUME_CACHE_CONFIG['ttl_seconds']:
+        return None
+    return journal_id, fingerprint, response
+
+def _store_cached_volume(issue_id, journal_id, fingerprint, response):
+    if not VOLUME_CACHE_CONFIG['enabled']:
+        return
+    with _volume_cache_lock:
+        if issue_id not in _volume_cache and len(_volume_cache) >= VOLUME_CACHE_CONFIG['max_entries']:
+            # Descartar la entrada más antigua
+            oldest = min(_volume_cache, key=lambda key: _volume_cache[key][2])
+            del _volume_cache[oldest]
+        _volume_cache[issue_id] = (journal_id, fingerprint, time.time(), response)
+
+async def _fetch_volume_fingerprint(cursor, journal_id):
+    """
+    Huella de los artículos del journal desde article_summaries: cambia si se publica
+    o despublica uno, o si se edita su título, resumen o autores (updated_at)
+    """
+    await cursor.execute("""
+        SELECT COUNT(*) as articles_count, MAX(updated_at) as last_updated
+        FROM article_summaries
+        WHERE context_id = %s AND status = 3
+    """, (journal_id,))
+    fingerprint = await cursor.fetchone()
+    return (fingerprint['articles_count'], fingerprint['last_updated'])
+
 @app.get("/volumes-no-filter/{issue_id}")
-def get_volume_details_no_date_filter(issue_id: int):
+async def get_volume_details_no_date_filter(issue_id: int):
     """Endpoint sin filtro de fecha para mostrar TODOS los artículos del journal"""
     try:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                
-                print(f"🔍 Obteniendo volumen {issue_id} SIN filtro de fecha")
-                
-                # Información del issue (igual que antes)
-                cursor.execute("""
-                    SELECT 
-                        i.issue_id, i.journal_id, i.volume, i.number, i.year,
-                        i.date_published, i.date_notified, i.published,
-                        
-                        COALESCE(
-                            MAX(CASE WHEN is_title.locale = 'es' THEN is_title.setting_value END),
-                            MAX(CASE WHEN is_title.locale = 'en' THEN is_title.setting_value END),
-                            CONCAT('Volumen ', COALESCE(i.volume, ''), ' Número ', COALESCE(i.number, ''))
-                        ) as title,
-                        
-                        COALESCE(
-                            MAX(CASE WHEN is_desc.locale = 'es' THEN is_desc.setting_value END),
-                            MAX(CASE WHEN is_desc.locale = 'en' THEN is_desc.setting_value END),
-                            ''
-                        ) as description
-                        
-                    FROM issues i
-                    LEFT JOIN issue_settings is_title ON i.issue_id = is_title.issue_id 
-                        AND is_title.setting_name = 'title'
-                    LEFT JOIN issue_settings is_desc ON i.issue_id = is_desc.issue_id 
-                        AND is_desc.setting_name = 'description'
+        async with async_db.cursor() as cursor:
+            
+            print(f"🔍 Obteniendo volumen {issue_id} SIN filtro de fecha")
+            
+            # Caché antes de cualquier otra consulta: un acierto cuesta solo la huella
+            fingerprint = None
+            cached = _get_cached_volume(issue_id)
+            if cached is not None:
+                cached_journal_id, cached_fingerprint, cached_response = cached
+                fingerprint = await _fetch_volume_fingerprint(cursor, cached_journal_id)
+                if fingerprint == cached_fingerprint:
+                    print(f"⚡ Volumen {issue_id} servido desde caché")
+                    return cached_response
+            
+            # Información del issue (igual que antes)
+            await cursor.execute("""
+                SELECT 
+                    i.issue_id, i.journal_id, i.volume, i.number, i.year,
+                    i.date_published, i.date_notified, i.published,
                     
-                    WHERE i.issue_id = %s AND i.published = 1
-                    GROUP BY i.issue_id, i.journal_id, i.volume, i.number, i.year, 
-                             i.date_published, i.date_notified, i.published
-                """, (issue_id,))
-                
-                issue_data = cursor.fetchone()
-                
-                if not issue_data:
-                    raise HTTPException(status_code=404, detail="Volumen no encontrado")
+                    COALESCE(
+                        MAX(CASE WHEN is_title.locale = 'es' THEN is_title.setting_value END),
+                        MAX(CASE WHEN is_title.locale = 'en' THEN is_title.setting_value END),
+                        CONCAT('Volumen ', COALESCE(i.volume, ''), ' Número ', COALESCE(i.number, ''))
+                    ) as title,
+                    
+                    COALESCE(
+                        MAX(CASE WHEN is_desc.locale = 'es' THEN is_desc.setting_value END),
+                        MAX(CASE WHEN is_desc.locale = 'en' THEN is_desc.setting_value END),
+                        ''
+                    ) as description
+                    
+                FROM issues i
+                LEFT JOIN issue_settings is_title ON i.issue_id = is_title.issue_id 
+                    AND is_title.setting_name = 'title'
+                LEFT JOIN issue_settings is_desc ON i.issue_id = is_desc.issue_id 
+                    AND is_desc.setting_name = 'description'
+                
+                WHERE i.issue_id = %s AND i.published = 1
+                GROUP BY i.issue_id, i.journal_id, i.volume, i.number, i.year, 
+                         i.date_published, i.date_notified, i.published
+            """, (issue_id,))
+            
+            issue_data = await cursor.fetchone()
+            
+            if not issue_data:
+                raise HTTPException(status_code=404, detail="Volumen no encontrado")
+            
+            # La huella se toma antes de leer los artículos, así nunca queda más nueva que la respuesta
+            if cached is None or cached_journal_id != issue_data['journal_id']:
+                fingerprint = await _fetch_volume_fingerprint(cursor, issue_data['journal_id'])
+            
+            # SIN FILTRO DE FECHA - Obtener TODOS los artículos del journal
+            await cursor.execute("""
+                SELECT 
+                    p.publication_id,
+                    p.submission_id,
+                    p.date_published,
+                    p.seq
+                FROM submissions s
+                JOIN publications p ON s.current_publication_id = p.publication_id
+                WHERE s.context_id = %s AND p.status = 3
+                ORDER BY p.date_published DESC, p.seq ASC
+            """, (issue_data['journal_id'],))
+            
+            basic_articles = await cursor.fetchall()
+            print(f"📄 TODOS los artículos encontrados (sin filtro): {len(basic_articles)}")
+            
+            # Settings y autores de todos los artículos en dos consultas (sin N+1)
+            pub_ids = [article['publication_id'] for article in basic_articles]
+            settings_by_pub = {}
+            authors_by_pub = {}
+            
+            if pub_ids:
+                placeholders = ', '.join(['%s'] * len(pub_ids))
+                
+                await cursor.execute(f"""
+                    SELECT publication_id, setting_name, locale, setting_value
+                    FROM publication_settings
+                    WHERE publication_id IN ({placeholders})
+                      AND ((setting_name IN ('title', 'abstract') AND locale IN ('es', 'en'))
+                           OR setting_name = 'pages')
+                """, tuple(pub_ids))
+                
+                for row in await cursor.fetchall():
+                    settings = settings_by_pub.setdefault(row['publication_id'], {})
+                    if row['setting_name'] == 'pages':
+                        settings.setdefault('pages', row['setting_value'])
+                    else:
+                        # Priorizar español sobre inglés
+                        settings.setdefault(row['setting_name'], {})[row['locale']] = row['setting_value']
                 
-                # SIN FILTRO DE FECHA - Obtener TODOS los artículos del journal
-                cursor.execute("""
+                await cursor.execute(f"""
                     SELECT 
-                        p.publication_id,
-                        p.submission_id,
-                        p.date_published,
-                        p.seq
-                    FROM submissions s
-                    JOIN publications p ON s.current_publication_id = p.publication_id
-                    WHERE s.context_id = %s AND p.status = 3
-                    ORDER BY p.date_published DESC, p.seq ASC
-                """, (issue_data['journal_id'],))
-                
-                basic_articles = cursor.fetchall()
-                print(f"📄 TODOS los artículos encontrados (sin filtro): {len(basic_articles)}")
+                        a.publication_id,
+                        COALESCE(fname.setting_value, '') as first_name,
+                        COALESCE(lname.setting_value, '') as last_name
+                    FROM authors a
+                    LEFT JOIN author_settings fname ON a.author_id = fname.author_id 
+                        AND fname.setting_name = 'givenName'
+                    LEFT JOIN author_settings lname ON a.author_id = lname.author_id 
+                        AND lname.setting_name = 'familyName'
+                    WHERE a.publication_id IN ({placeholders})
+                    ORDER BY a.publication_id, a.seq ASC
+                """, tuple(pub_ids))
+                
+                for row in await cursor.fetchall():
+                    authors_by_pub.setdefault(row['publication_id'], []).append(row)
+            
+            # Procesar artículos (mismo código que el endpoint principal)
+            import re
+            articles = []
+            for article in basic_articles:
+                pub_id = article['publication_id']
+                settings = settings_by_pub.get(pub_id, {})
+                
+                # Título
+                titles = settings.get('title', {})
+                if titles:
+                    title = titles['es'] if 'es' in titles else titles['en']
+                else:
+                    title = f"Artículo #{pub_id}"
                 
-                # Procesar artículos (mismo código que el endpoint principal)
-                articles = []
-                for article in basic_articles:
-                    pub_id = article['publication_id']
-                    
-                    # Obtener título
-                    cursor.execute("""
-                        SELECT setting_value 
-                        FROM publication_settings 
-                        WHERE publication_id = %s AND setting_name = 'title' 
-                          AND locale IN ('es', 'en')
-                        ORDER BY CASE WHEN locale = 'es' THEN 1 ELSE 2 END
-                        LIMIT 1
-                    """, (pub_id,))
-                    title_result = cursor.fetchone()
-                    title = title_result['setting_value'] if title_result else f"Artículo #{pub_id}"
-                    
-                    # Obtener abstract
-                    cursor.execute("""
-                        SELECT setting_value 
-                        FROM publication_settings 
-                        WHERE publication_id = %s AND setting_name = 'abstract' 
-                          AND locale IN ('es', 'en')
-                        ORDER BY CASE WHEN locale = 'es' THEN 1 ELSE 2 END
-                        LIMIT 1
-                    """, (pub_id,))
-                    abstract_result = cursor.fetchone()
-                    abstract = abstract_result['setting_value'] if abstract_result else ''
-                    
-                    # Obtener páginas
-                    cursor.execute("""
-                        SELECT setting_value 
-                        FROM publication_settings 
-                        WHERE publication_id = %s AND setting_name = 'pages'
-                        LIMIT 1
-                    """, (pub_id,))
-                    pages_result = cursor.fetchone()
-                    pages = pages_result['setting_value'] if pages_result else ''
-                    
-                    # Obtener autores
-                    cursor.execute("""
-                        SELECT 
-                            COALESCE(fname.setting_value, '') as first_name,
-                            COALESCE(lname.setting_value, '') as last_name
-                        FROM authors a
-                        LEFT JOIN author_settings fname ON a.author_id = fname.author_id 
-                            AND fname.setting_name = 'givenName'
-                        LEFT JOIN author_settings lname ON a.author_id = lname.author_id 
-                            AND lname.setting_name = 'familyName'
-                        WHERE a.publication_id = %s
-                        ORDER BY a.seq ASC
-                    """, (pub_id,))
-                    
-                    authors_data = cursor.fetchall()
-                    
-                    # Procesar autores
-                    if authors_data:
-                        authors_list = []
-                        for author in authors_data:
-                            first_name = (author['first_name'] or '').strip()
-                            last_name = (author['last_name'] or '').strip()
-                            
-                            if first_name and last_name:
-                                full_name = f"{first_name} {last_name}"
-                            elif first_name:
-                                full_name = first_name
-                            elif last_name:
-                                full_name = last_name
-                            else:
-                                continue
-                            
-                            authors_list.append(full_name)
+                # Abstract
+                abstracts = settings.get('abstract', {})
+                if abstracts:
+                    abstract = abstracts['es'] if 'es' in abstracts else abstracts['en']
+                else:
+                    abstract = ''
+                
+                # Páginas
+                pages = settings.get('pages', '')
+                
+                # Procesar autores
+                authors_data = authors_by_pub.get(pub_id, [])
+                if authors_data:
+                    authors_list = []
+                    for author in authors_data:
+                        first_name = (author['first_name'] or '').strip()
+                        last_name = (author['last_name'] or '').strip()
                         
-                        authors_string = '; '.join(authors_list) if authors_list else 'Autor no especificado'
-                    else:
-                        authors_string = 'Autor no especificado'
-                    
-                    # Limpiar HTML
-                    if abstract:
-                        import re
-                        abstract = re.sub(r'<[^>]+>', '', abstract)
-                        abstract = re.sub(r'\s+', ' ', abstract).strip()
-                        if len(abstract) > 300:
-                            abstract = abstract[:300] + '...'
-                    
-                    if title:
-                        import re
-                        title = re.sub(r'<[^>]+>', '', title).strip()
-                    
-                    # Construir artículo
-                    complete_article = {
-                        'publication_id': pub_id,
-                        'submission_id': article['submission_id'],
-                        'title': title,
-                        'abstract': abstract or 'Sin resumen disponible',
-                        'authors': authors_string,
-                        'pages': pages,
-                        'date_published': article['date_published'].isoformat() if article['date_published'] else None,
-                        'url': f"/article/view/{article['submission_id']}"
-                    }
+                        if first_name and last_name:
+                            full_name = f"{first_name} {last_name}"
+                        elif first_name:
+                            full_name = first_name
+                        elif last_name:
+                            full_name = last_name
+                        else:
+                            continue
+                        
+                        authors_list.append(full_name)
                     
-                    articles.append(complete_article)
-                
-                return {
-                    'issue': {
-                        'issue_id': issue_data['issue_id'],
-                        'volume': issue_data['volume'],
-                        'number': issue_data['number'],
-                        'year': issue_data['year'],
-                        'title': issue_data['title'],
-                        'description': issue_data['description'],
-                        'date_published': issue_data['date_published'].isoformat() if issue_data['date_published'] else None,
-                        'is_current': False
-                    },
-                    'articles': articles,
-                    'total_articles': len(articles),
-                    'data_source': 'ojs_database_no_date_filter',
-                    'last_updated': datetime.now().isoformat(),
-                    'debug_info': {
-                        'method_used': 'all_journal_articles_no_date_filter',
-                        'searched_journal_id': issue_data['journal_id'],
-                        'note': 'Shows ALL articles from journal without date filtering'
-                    }
+                    authors_string = '; '.join(authors_list) if authors_list else 'Autor no especificado'
+                else:
+                    authors_string = 'Autor no especificado'
+                
+                # Limpiar HTML
+                if abstract:
+                    abstract = re.sub(r'<[^>]+>', '', abstract)
+                    abstract = re.sub(r'\s+', ' ', abstract).strip()
+                    if len(abstract) > 300:
+                        abstract = abstract[:300] + '...'
+                
+                if title:
+                    title = re.sub(r'<[^>]+>', '', title).strip()
+                
+                # Construir artículo
+                complete_article = {
+                    'publication_id': pub_id,
+                    'submission_id': article['submission_id'],
+                    'title': title,
+                    'abstract': abstract or 'Sin resumen disponible',
+                    'authors': authors_string,
+                    'pages': pages,
+                    'date_published': article['date_published'].isoformat() if article['date_published'] else None,
+                    'url': f"/article/view/{article['submission_id']}"
                 }
                 
+                articles.append(complete_article)
+            
+            response = {
+                'issue': {
+                    'issue_id': issue_data['issue_id'],
+                    'volume': issue_data['volume'],
+                    'number': issue_data['number'],
+                    'year': issue_data['year'],
+                    'title': issue_data['title'],
+                    'description': issue_data['description'],
+                    'date_published': issue_data['date_published'].isoformat() if issue_data['date_published'] else None,
+                    'is_current': False
+                },
+                'articles': articles,
+                'total_articles': len(articles),
+                'data_source': 'ojs_database_no_date_filter',
+                'last_updated': datetime.now().isoformat(),
+                'debug_info': {
+                    'method_used': 'all_journal_articles_no_date_filter',
+                    'searched_journal_id': issue_data['journal_id'],
+                    'note': 'Shows ALL articles from journal without date filtering'
+                }
+            }
+            
+            _store_cached_volume(issue_id, issue_data['journal_id'], fingerprint, response)
+            return response
+            
     except HTTPException:
         raise
     except Exception as e:
         print(f"❌ Error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# ================================
+# SONDAS DE LIVENESS Y READINESS
+# ================================
+
+@app.get("/live")
+def liveness_probe():
+    """Liveness: el proceso responde; no consulta la base de datos"""
+    return {
+        "status": "alive",
+        "uptime_seconds": round((datetime.now() - startup_state['started_at']).total_seconds(), 1)
+    }
+
+@app.get("/ready")
+def readiness_probe():
+    """
+    Readiness: tareas de arranque terminadas y base de datos accesible (503 si no)
+    No exige el cálculo de hoy: mientras corre se sirven los datos del último cálculo
+    """
+    state = {
+        "phase": startup_state['phase'],
+        "attempts": startup_state['attempts'],
+        "schema_updated": startup_state['schema_updated'],
+        "ready_at": startup_state['ready_at'].isoformat() if startup_state['ready_at'] else None,
+        "error": startup_state['error']
+    }
+    if startup_state['phase'] != 'ready':
+        return JSONResponse(status_code=503, content={"status": "starting", **state})
+    
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT MAX(calculation_date) as data_date FROM recommendation_system_status
+                    WHERE status = 'completed'
+                """)
+                data_date = cursor.fetchone()['data_date']
+    except Exception as e:
+        return JSONResponse(status_code=503, content={"status": "database_unavailable", **state, "error": str(e)})
+    
+    return {
+        "status": "ready",
+        **state,
+        "data_date": data_date.isoformat() if data_date else None,
+        "serving_today": data_date == datetime.now().date()
+    }
+
 # ================================
 # ENDPOINTS LEGACY (Para compatibilidad)
 # ================================
@@ -1900,6 +2735,7 @@ if __name__ == "__main__":
     print("📍 URL Principal: http://localhost:8000")
     print("📖 Documentación: http://localhost:8000/docs")
     print("🎯 Estado: http://localhost:8000/status")
+    print("🩺 Sondas: /live (liveness) y /ready (readiness)")
     print("📊 Cache Status: http://localhost:8000/admin/cache-status")
     print("=" * 70)
     print("🔄 Arquitectura Persistente:")
@@ -1910,7 +2746,8 @@ if __name__ == "__main__":
     print("   • Respuestas < 5ms desde base de datos")
     print("=" * 70)
     print("📊 Endpoints Administrativos:")
-    print("   • Calcular Ahora: POST /admin/calculate-now")
+    print("   • Calcular Ahora: POST /admin/calculate-now (worker: python recommendation_worker.py)")
+    print("   • Trabajos: /admin/jobs")
     print("   • Ver Recomendaciones: /admin/recommendations/{id}")
     print("   • Ver Homepage: /admin/homepage/{type}")
     print("   • Estado Cache: /admin/cache-status")
@@ -0,0 +1,494 @@
+"""
+Persistencia de Snapshots de Modelos
+Guarda en disco los artefactos entrenados (TF-IDF, vecinos top-k, SVD, KMeans)
+para que un proceso cargue un modelo listo sin reentrenar
+Los arrays NumPy se guardan como .npy y se cargan con memory-map, así todos los
+workers de uvicorn que cargan la misma generación comparten las mismas páginas físicas
+"""
+
+import os
+import json
+import shutil
+import hashlib
+from contextlib import contextmanager
+from datetime import datetime, date
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+import numpy as np
+from scipy import sparse
+from sklearn.cluster import KMeans
+from sklearn.decomposition import TruncatedSVD
+
+# Incrementar cuando cambie el formato o los artefactos guardados
+SNAPSHOT_SCHEMA_VERSION = 1
+
+# Directorio por defecto de snapshots
+DEFAULT_SNAPSHOT_DIR = 'model_snapshots'
+
+MANIFEST_FILE = 'manifest.json'
+
+# Puntero a la generación publicada dentro de un directorio raíz de snapshots
+CURRENT_FILE = 'CURRENT'
+
+# Generaciones anteriores que se conservan para workers que aún las tienen mapeadas
+DEFAULT_KEEP_GENERATIONS = 2
+
+# Lock entre procesos de un directorio raíz al publicar generaciones
+PUBLISH_LOCK_FILE = '.publish.lock'
+
+# Campos que alimentan el contenido TF-IDF del motor
+ENGINE_HASH_FIELDS = ('title', 'abstract', 'authors', 'affiliations')
+
+# ================================
+# HASH DE CONTENIDO
+# ================================
+
+def compute_articles_hash(articles_data, fields=('title', 'abstract', 'authors'), fingerprint=None):
+    """
+    Hash del corpus de artículos; cambia si se agrega, quita o edita un artículo
+    fingerprint: datos adicionales del modelo (p. ej. usuarios e interacciones) que
+    también invalidan el snapshot al cambiar
+    """
+    digest = hashlib.sha256()
+    if fingerprint is not None:
+        digest.update(json.dumps(fingerprint, sort_keys=True, default=_json_default).encode('utf-8'))
+        digest.update(b'\x1d')
+    for pub_id in sorted(articles_data.keys()):
+        article = articles_data[pub_id]
+        digest.update(str(pub_id).encode('utf-8'))
+        for field in fields:
+            digest.update(b'\x1f')
+            digest.update(str(article.get(field) or '').encode('utf-8'))
+        digest.update(b'\x1e')
+    return digest.hexdigest()
+
+# ================================
+# LECTURA / ESCRITURA DE BAJO NIVEL
+# ================================
+
+def _write_snapshot(snapshot_dir, kind, content_hash, arrays, documents, metadata=None):
+    """
+    Escribir un snapshot completo en un directorio temporal y publicarlo con rename
+    arrays: nombre -> np.ndarray (se guardan como .npy)
+    documents: nombre -> objeto JSON
+    """
+    parent = os.path.dirname(os.path.abspath(snapshot_dir))
+    os.makedirs(parent, exist_ok=True)
+
+    tmp_dir = f"{snapshot_dir}.tmp-{os.getpid()}"
+    old_dir = f"{snapshot_dir}.old-{os.getpid()}"
+    if os.path.exists(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    os.makedirs(tmp_dir)
+
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+
+    for name, document in documents.items():
+        with open(os.path.join(tmp_dir, f"{name}.json"), 'w', encoding='utf-8') as f:
+            json.dump(document, f, ensure_ascii=False, default=_json_default)
+
+    manifest = {
+        'schema_version': SNAPSHOT_SCHEMA_VERSION,
+        'kind': kind,
+        'content_hash': content_hash,
+        'created_at': datetime.now().isoformat(),
+        'arrays': sorted(arrays.keys()),
+        'documents': sorted(documents.keys()),
+        'metadata': metadata or {}
+    }
+    with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, default=_json_default)
+
+    # Publicar: el snapshot anterior se aparta antes de mover el nuevo a su lugar
+    if os.path.exists(snapshot_dir):
+        os.rename(snapshot_dir, old_dir)
+    os.rename(tmp_dir, snapshot_dir)
+    if os.path.exists(old_dir):
+        shutil.rmtree(old_dir)
+
+    return manifest
+
+def read_manifest(snapshot_dir):
+    """Leer el manifest de un snapshot; None si no existe o está corrupto"""
+    try:
+        with open(os.path.join(snapshot_dir, MANIFEST_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _check_manifest(snapshot_dir, kind, expected_hash):
+    """Validar esquema, tipo y hash de contenido de un snapshot"""
+    manifest = read_manifest(snapshot_dir)
+    if manifest is None:
+        return None, 'snapshot inexistente'
+    if manifest.get('schema_version') != SNAPSHOT_SCHEMA_VERSION:
+        return None, f"versión de esquema {manifest.get('schema_version')} != {SNAPSHOT_SCHEMA_VERSION}"
+    if manifest.get('kind') != kind:
+        return None, f"tipo {manifest.get('kind')} != {kind}"
+    if expected_hash is not None and manifest.get('content_hash') != expected_hash:
+        return None, 'hash de contenido distinto (snapshot desactualizado)'
+    return manifest, None
+
+def _load_array(snapshot_dir, name, mmap_mode='r'):
+    """Cargar un array .npy con memory-map"""
+    return np.load(os.path.join(snapshot_dir, f"{name}.npy"), mmap_mode=mmap_mode, allow_pickle=False)
+
+def _load_document(snapshot_dir, name):
+    with open(os.path.join(snapshot_dir, f"{name}.json"), encoding='utf-8') as f:
+        return json.load(f)
+
+def _csr_arrays(prefix, matrix):
+    return {
+        f"{prefix}_data": matrix.data,
+        f"{prefix}_indices": matrix.indices,
+        f"{prefix}_indptr": matrix.indptr
+    }
+
+def _load_csr(snapshot_dir, prefix, shape):
+    return sparse.csr_matrix(
+        (
+            _load_array(snapshot_dir, f"{prefix}_data"),
+            _load_array(snapshot_dir, f"{prefix}_indices"),
+            _load_array(snapshot_dir, f"{prefix}_indptr")
+        ),
+        shape=tuple(shape),
+        copy=False
+    )
+
+def _restore_vectorizer(vectorizer, vocabulary, idf):
+    """Reconstruir un TfidfVectorizer ajustado a partir de vocabulario e IDF"""
+    vectorizer.vocabulary_ = {term: int(index) for term, index in vocabulary.items()}
+    vectorizer.idf_ = np.asarray(idf)
+    return vectorizer
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+def _parse_date(value):
+    """Restaurar fechas guardadas como ISO (date si no tiene hora)"""
+    if not value or not isinstance(value, str):
+        return value
+    try:
+        if len(value) == 10:
+            return date.fromisoformat(value)
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return value
+
+# ================================
+# GENERACIONES PUBLICADAS
+# ================================
+
+def generation_dir(root, generation):
+    """Directorio de una generación de snapshot"""
+    return os.path.join(root, f"gen-{generation:06d}")
+
+def current_generation(root):
+    """Generación publicada actualmente; None si no hay ninguna"""
+    try:
+        with open(os.path.join(root, CURRENT_FILE), encoding='utf-8') as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+def _list_generations(root):
+    generations = []
+    if os.path.isdir(root):
+        for name in os.listdir(root):
+            if name.startswith('gen-') and name[4:].isdigit():
+                generations.append(int(name[4:]))
+    return sorted(generations)
+
+@contextmanager
+def _publish_lock(root):
+    """
+    Lock exclusivo (flock) sobre el directorio raíz: el worker nocturno y los workers
+    de uvicorn publican de a uno, sin elegir la misma generación ni retroceder CURRENT
+    Sin fcntl (Windows) no hay lock; ahí se asume un solo proceso publicador
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(root, PUBLISH_LOCK_FILE), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def publish_generation(root, save_fn, keep=DEFAULT_KEEP_GENERATIONS):
+    """
+    Escribir una generación nueva con save_fn(directorio) y publicarla
+    El puntero CURRENT se reemplaza con os.replace, así los lectores ven la
+    generación anterior o la nueva completa, nunca una a medio escribir
+    Numerar, escribir y apuntar CURRENT ocurre bajo _publish_lock
+    """
+    os.makedirs(root, exist_ok=True)
+    with _publish_lock(root):
+        generation = max(_list_generations(root) + [current_generation(root) or 0]) + 1
+        save_fn(generation_dir(root, generation))
+        
+        tmp_pointer = os.path.join(root, f"{CURRENT_FILE}.tmp-{os.getpid()}")
+        with open(tmp_pointer, 'w', encoding='utf-8') as f:
+            f.write(str(generation))
+        os.replace(tmp_pointer, os.path.join(root, CURRENT_FILE))
+        
+        prune_generations(root, keep)
+    print(f"📦 Generación {generation} publicada en {root}")
+    return generation
+
+def prune_generations(root, keep=DEFAULT_KEEP_GENERATIONS):
+    """
+    Eliminar generaciones antiguas conservando las últimas `keep`
+    Los workers que aún tengan mapeada una generación borrada siguen leyéndola
+    hasta cambiar de generación (el archivo se libera al cerrar el mapeo)
+    """
+    current = current_generation(root)
+    for generation in _list_generations(root)[:-keep] if keep > 0 else _list_generations(root):
+        if generation != current:
+            shutil.rmtree(generation_dir(root, generation), ignore_errors=True)
+
+# ================================
+# SNAPSHOT DE OJSRecommendationEngine
+# ================================
+
+def save_engine_snapshot(engine, snapshot_dir):
+    """Guardar TF-IDF, vecinos top-k, ids y metadatos de artículos de un OJSRecommendationEngine"""
+    if engine.similarity_matrix is None or engine.tfidf_matrix is None:
+        raise ValueError("El motor no tiene matrices construidas")
+
+    arrays = {
+        'article_ids': np.asarray(engine.article_ids, dtype=np.int64),
+        'tfidf_idf': engine.tfidf_vectorizer.idf_
+    }
+    arrays.update(_csr_arrays('tfidf', engine.tfidf_matrix.tocsr()))
+    arrays.update(_csr_arrays('similarity', engine.similarity_matrix))
+
+    documents = {
+        'vocabulary': engine.tfidf_vectorizer.vocabulary_,
+        'articles': [engine.articles_data[pub_id] for pub_id in engine.article_ids]
+    }
+
+    metadata = {
+        'tfidf_shape': list(engine.tfidf_matrix.shape),
+        'similarity_shape': list(engine.similarity_matrix.shape),
+        'top_k': engine.top_k,
+        'similarity_threshold': engine.similarity_threshold,
+        # Estado de deriva para actualizaciones incrementales
+        'last_full_fit': engine.last_full_fit,
+        'baseline_oov_ratio': engine.baseline_oov_ratio,
+        'drift_tokens_total': engine.drift_tokens_total,
+        'drift_tokens_oov': engine.drift_tokens_oov
+    }
+
+    manifest = _write_snapshot(
+        snapshot_dir, 'ojs_engine', compute_articles_hash(engine.articles_data, ENGINE_HASH_FIELDS),
+        arrays, documents, metadata
+    )
+    print(f"💾 Snapshot del motor guardado en {snapshot_dir} ({len(engine.article_ids)} artículos)")
+    return manifest
+
+def load_engine_snapshot(engine, snapshot_dir, expected_hash=None):
+    """
+    Cargar un snapshot en un OJSRecommendationEngine
+    Devuelve False (sin modificar el motor) si no existe, el esquema no coincide
+    o expected_hash difiere del hash guardado
+    """
+    manifest, reason = _check_manifest(snapshot_dir, 'ojs_engine', expected_hash)
+    if manifest is None:
+        print(f"⚠️ Snapshot del motor no utilizable: {reason}")
+        return False
+
+    metadata = manifest['metadata']
+    if (metadata.get('top_k') != engine.top_k or
+            metadata.get('similarity_threshold') != engine.similarity_threshold):
+        print("⚠️ Snapshot del motor no utilizable: parámetros top-k distintos")
+        return False
+
+    article_ids = [int(pub_id) for pub_id in _load_array(snapshot_dir, 'article_ids')]
+    articles = _load_document(snapshot_dir, 'articles')
+
+    articles_data = {}
+    for article in articles:
+        article['date_published'] = _parse_date(article.get('date_published'))
+        articles_data[article['publication_id']] = article
+
+    engine.articles_data = articles_data
+    engine.article_ids = article_ids
+    engine.article_index = {pub_id: i for i, pub_id in enumerate(article_ids)}
+    engine.tfidf_vectorizer = _restore_vectorizer(
+        engine._create_tfidf_vectorizer(),
+        _load_document(snapshot_dir, 'vocabulary'),
+        _load_array(snapshot_dir, 'tfidf_idf')
+    )
+    engine.tfidf_matrix = _load_csr(snapshot_dir, 'tfidf', metadata['tfidf_shape'])
+    engine.similarity_matrix = _load_csr(snapshot_dir, 'similarity', metadata['similarity_shape'])
+    engine.last_full_fit = _parse_date(metadata.get('last_full_fit'))
+    engine.baseline_oov_ratio = metadata.get('baseline_oov_ratio', 0.0)
+    engine.drift_tokens_total = metadata.get('drift_tokens_total', 0)
+    engine.drift_tokens_oov = metadata.get('drift_tokens_oov', 0)
+
+    print(f"⚡ Snapshot del motor cargado ({len(article_ids)} artículos, {manifest['created_at']})")
+    return True
+
+def load_or_build_engine(engine, snapshot_dir=DEFAULT_SNAPSHOT_DIR):
+    """
+    Cargar artículos desde BD y usar la generación publicada si coincide con el
+    corpus actual; en otro caso reconstruir las matrices y publicar una generación nueva
+    """
+    engine_root = os.path.join(snapshot_dir, 'ojs_engine')
+
+    if not engine.articles_data:
+        engine.load_articles_data()
+
+    generation = current_generation(engine_root)
+    if generation is not None and load_engine_snapshot(
+            engine, generation_dir(engine_root, generation),
+            compute_articles_hash(engine.articles_data, ENGINE_HASH_FIELDS)):
+        return True
+
+    if not engine.build_similarity_matrix():
+        return False
+
+    publish_generation(engine_root, lambda path: save_engine_snapshot(engine, path))
+    return True
+
+# ================================
+# SNAPSHOT DE HybridRecommendationSystem
+# ================================
+
+def save_hybrid_snapshot(system, snapshot_dir):
+    """Guardar TF-IDF, factores SVD, centroides KMeans, agregados y datos de un HybridRecommendationSystem"""
+    if system.content_similarity_matrix is None:
+        raise ValueError("El sistema no tiene la matriz de contenido construida")
+
+    content_article_ids = sorted(system.content_article_index, key=system.content_article_index.get)
+    cluster_article_ids = sorted(system.cluster_article_index, key=system.cluster_article_index.get)
+
+    arrays = {
+        'user_ids': np.asarray(system.user_ids, dtype=np.int64),
+        'article_ids': np.asarray(system.article_ids, dtype=np.int64),
+        'content_article_ids': np.asarray(content_article_ids, dtype=np.int64),
+        'tfidf_idf': system.tfidf_vectorizer.idf_,
+        'content_similarity': system.content_similarity_matrix
+    }
+
+    if system.svd_model is not None:
+        arrays['user_factors'] = system.user_factors
+        arrays['item_factors'] = system.item_factors
+
+    if system.user_clusters is not None:
+        arrays['cluster_centers'] = system.user_clusters.cluster_centers_
+        arrays['cluster_article_ids'] = np.asarray(cluster_article_ids, dtype=np.int64)
+        arrays['cluster_rating_sums'] = system.cluster_rating_sums
+        arrays['cluster_rating_counts'] = system.cluster_rating_counts
+
+    articles = []
+    for article in system.articles_data.values():
+        record = dict(article)
+        record['content_vector'] = None  # Derivable de la matriz TF-IDF
+        articles.append(record)
+
+    users = []
+    for behavior in system.user_behavior_data.values():
+        record = dict(behavior)
+        record['article_interactions'] = [
+            [article_id, interaction] for article_id, interaction in behavior['article_interactions'].items()
+        ]
+        users.append(record)
+
+    documents = {
+        'vocabulary': system.tfidf_vectorizer.vocabulary_,
+        'articles': articles,
+        'users': users,
+        'profiles': [[user_id, profile] for user_id, profile in system.user_profiles.items()],
+        'popularity': [[article_id, value] for article_id, value in system.article_popularity.items()]
+    }
+
+    manifest = _write_snapshot(
+        snapshot_dir, 'hybrid_system',
+        compute_articles_hash(system.articles_data, fingerprint=system.data_fingerprint),
+        arrays, documents, {'data_fingerprint': system.data_fingerprint}
+    )
+    print(f"💾 Snapshot híbrido guardado en {snapshot_dir} ({len(articles)} artículos, {len(users)} usuarios)")
+    return manifest
+
+def load_hybrid_snapshot(system, snapshot_dir, expected_hash=None):
+    """
+    Cargar un snapshot en un HybridRecommendationSystem
+    Devuelve False (sin modificar el sistema) si no existe o no coincide
+    """
+    manifest, reason = _check_manifest(snapshot_dir, 'hybrid_system', expected_hash)
+    if manifest is None:
+        print(f"⚠️ Snapshot híbrido no utilizable: {reason}")
+        return False
+
+    available = set(manifest['arrays'])
+
+    articles_data = {}
+    for article in _load_document(snapshot_dir, 'articles'):
+        article['date_published'] = _parse_date(article.get('date_published'))
+        articles_data[article['publication_id']] = article
+
+    user_behavior_data = {}
+    for behavior in _load_document(snapshot_dir, 'users'):
+        interactions = {}
+        for article_id, interaction in behavior['article_interactions']:
+            interaction['interaction_date'] = _parse_date(interaction.get('interaction_date'))
+            interactions[article_id] = interaction
+        behavior['article_interactions'] = interactions
+        user_behavior_data[behavior['user_id']] = behavior
+
+    system.articles_data = articles_data
+    system.user_behavior_data = user_behavior_data
+    system.data_fingerprint = manifest['metadata'].get('data_fingerprint')
+    system.user_profiles = {user_id: profile for user_id, profile in _load_document(snapshot_dir, 'profiles')}
+    system.article_popularity = {article_id: value for article_id, value in _load_document(snapshot_dir, 'popularity')}
+
+    system.user_ids = [int(user_id) for user_id in _load_array(snapshot_dir, 'user_ids')]
+    system.article_ids = [int(article_id) for article_id in _load_array(snapshot_dir, 'article_ids')]
+    system.user_index = {user_id: i for i, user_id in enumerate(system.user_ids)}
+    system.article_index = {article_id: j for j, article_id in enumerate(system.article_ids)}
+    system.content_article_index = {
+        int(article_id): i for i, article_id in enumerate(_load_array(snapshot_dir, 'content_article_ids'))
+    }
+
+    system.tfidf_vectorizer = _restore_vectorizer(
+        system._create_tfidf_vectorizer(),
+        _load_document(snapshot_dir, 'vocabulary'),
+        _load_array(snapshot_dir, 'tfidf_idf')
+    )
+    system.content_similarity_matrix = _load_array(snapshot_dir, 'content_similarity')
+
+    if 'user_factors' in available:
+        system.user_factors = _load_array(snapshot_dir, 'user_factors')
+        system.item_factors = _load_array(snapshot_dir, 'item_factors')
+        system.svd_model = TruncatedSVD(n_components=system.item_factors.shape[1])
+        system.svd_model.components_ = system.item_factors.T
+
+    if 'cluster_centers' in available:
+        centers = np.array(_load_array(snapshot_dir, 'cluster_centers'))
+        # Un KMeans ajustado sobre sus propios centroides los conserva exactamente
+        system.user_clusters = KMeans(n_clusters=len(centers), init=centers, n_init=1, max_iter=1).fit(centers)
+        system.cluster_article_index = {
+            int(article_id): j for j, article_id in enumerate(_load_array(snapshot_dir, 'cluster_article_ids'))
+        }
+        # Copy-on-write: los agregados se actualizan de forma incremental
+        system.cluster_rating_sums = _load_array(snapshot_dir, 'cluster_rating_sums', mmap_mode='c')
+        system.cluster_rating_counts = _load_array(snapshot_dir, 'cluster_rating_counts', mmap_mode='c')
+
+    print(f"⚡ Snapshot híbrido cargado ({len(articles_data)} artículos, {manifest['created_at']})")
+    return True
@@ -4,134 +4,347 @@ Adaptado para cálculos batch y almacenamiento en BD
 Mantiene compatibilidad con uso directo desde plugin PHP
 """
 
+import os
+import itertools
+import multiprocessing
 import pymysql
 import numpy as np
 import re
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from datetime import datetime, timedelta
 from collections import defaultdict
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+from scipy import sparse
 import html
 import json
+from model_snapshot import load_or_build_engine
+from ann_index import build_lsh_topk_similarity, benchmark_lsh
+
+# ================================
+# CONFIGURACIÓN DE SIMILITUD DISPERSA
+# ================================
+
+# Vecinos más cercanos que se conservan por artículo (None = todos sobre el umbral)
+DEFAULT_SIMILARITY_TOP_K = 50
+
+# Umbral mínimo almacenado; coincide con el umbral de fallback de get_similar_articles
+DEFAULT_SIMILARITY_THRESHOLD = 0.005
+
+# Filas TF-IDF procesadas por bloque al calcular similitudes
+DEFAULT_SIMILARITY_BLOCK_SIZE = 512
+
+# Procesos que calculan bloques de similitud (1 = en el proceso actual, None = un proceso por núcleo)
+DEFAULT_SIMILARITY_WORKERS = 1
+
+# Artículos mínimos para usar procesos; por debajo, arrancar el pool cuesta más que el cálculo
+PARALLEL_SIMILARITY_MIN_ROWS = 5000
+
+# Backend de vecinos: 'exact' (todos contra todos) o 'lsh' (aproximado, ver ann_index.LSH_CONFIG)
+DEFAULT_SIMILARITY_BACKEND = 'exact'
+
+# Artículos mínimos para usar 'lsh'; por debajo el cálculo exacto es igual de rápido y sin pérdida de recall
+ANN_MIN_ROWS = 20000
+
+# Actualización incremental: días máximos entre reajustes completos del vocabulario
+DEFAULT_REFIT_INTERVAL_DAYS = 7
+
+# Actualización incremental: aumento de términos fuera de vocabulario que fuerza un reajuste
+DEFAULT_REFIT_DRIFT_THRESHOLD = 0.10
+
+# Documentos usados para estimar la tasa base de términos fuera de vocabulario
+DRIFT_BASELINE_SAMPLE = 200
+
+def build_topk_similarity(tfidf_matrix, top_k=DEFAULT_SIMILARITY_TOP_K,
+                          threshold=DEFAULT_SIMILARITY_THRESHOLD,
+                          block_size=DEFAULT_SIMILARITY_BLOCK_SIZE,
+                          workers=DEFAULT_SIMILARITY_WORKERS):
+    """
+    Calcular similitud coseno por bloques de filas y conservar solo los top-k vecinos
+    Devuelve una matriz CSR (N x N) sin diagonal, con cada fila ordenada por score descendente.
+    La memoria pico depende de block_size x N (por proceso), nunca de N x N.
+    Con workers > 1 y al menos PARALLEL_SIMILARITY_MIN_ROWS filas, los bloques se
+    reparten en un pool de procesos (ver _parallel_topk_blocks)
+    """
+    n_rows = tfidf_matrix.shape[0]
+    ranges = [(start, min(start + block_size, n_rows)) for start in range(0, n_rows, block_size)]
+    
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(ranges))
+    
+    blocks = None
+    if workers > 1 and n_rows >= PARALLEL_SIMILARITY_MIN_ROWS:
+        try:
+            blocks = _parallel_topk_blocks(tfidf_matrix, ranges, top_k, threshold, workers)
+        except Exception as e:
+            print(f"⚠️ Cálculo paralelo de similitudes no disponible ({e}); se calcula en este proceso")
+    
+    if blocks is None:
+        blocks = [
+            _topk_similarity_block(tfidf_matrix, start, end, top_k, threshold)
+            for start, end in ranges
+        ]
+    
+    row_counts = np.zeros(n_rows, dtype=np.int64)
+    all_indices = []
+    all_scores = []
+    for (start, end), (counts, indices, scores) in zip(ranges, blocks):
+        row_counts[start:end] = counts
+        all_indices.append(indices)
+        all_scores.append(scores)
+    
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(row_counts, out=indptr[1:])
+    
+    return sparse.csr_matrix(
+        (
+            np.concatenate(all_scores) if all_scores else np.zeros(0, dtype=np.float32),
+            np.concatenate(all_indices) if all_indices else np.zeros(0, dtype=np.int32),
+            indptr
+        ),
+        shape=(n_rows, n_rows)
+    )
+
+def _parallel_topk_blocks(tfidf_matrix, ranges, top_k, threshold, workers):
+    """
+    Top-k de cada bloque de filas en un pool de procesos
+    Los arreglos CSR de la matriz TF-IDF se copian una sola vez a memoria compartida;
+    cada proceso los adjunta al iniciar y las tareas solo llevan (start, end).
+    Se usa 'spawn' porque el cálculo corre dentro de hilos (etapas, worker)
+    """
+    matrix = tfidf_matrix.tocsr()
+    segments = []
+    try:
+        specs = []
+        for array in (matrix.data, matrix.indices, matrix.indptr):
+            segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            segments.append(segment)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[:] = array
+            specs.append((segment.name, array.shape, array.dtype.str))
+        
+        print(f"   🧵 {len(ranges)} bloques en {workers} procesos "
+              f"({_csr_nbytes(matrix) / 1024 / 1024:.1f} MB en memoria compartida)")
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_attach_shared_matrix,
+            initargs=(specs, matrix.shape)
+        ) as executor:
+            return list(executor.map(
+                _shared_topk_block, ranges, itertools.repeat(top_k), itertools.repeat(threshold),
+                chunksize=max(1, len(ranges) // (workers * 4))
+            ))
+    finally:
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+
+# Matriz TF-IDF adjunta desde memoria compartida en cada proceso del pool
+_shared_matrix = None
+_shared_segments = []
+
+def _attach_shared_matrix(specs, shape):
+    """Inicializador del pool: vista CSR sobre los segmentos compartidos, sin copiar"""
+    global _shared_matrix
+    arrays = []
+    for name, array_shape, dtype in specs:
+        segment = shared_memory.SharedMemory(name=name)
+        _shared_segments.append(segment)
+        arrays.append(np.ndarray(array_shape, dtype=np.dtype(dtype), buffer=segment.buf))
+    _shared_matrix = sparse.csr_matrix(tuple(arrays), shape=shape, copy=False)
+
+def _shared_topk_block(bounds, top_k, threshold):
+    start, end = bounds
+    return _topk_similarity_block(_shared_matrix, start, end, top_k, threshold)
+
+def _topk_similarity_block(tfidf_matrix, start, end, top_k, threshold):
+    """Top-k vecinos de las filas [start, end) contra la matriz TF-IDF completa"""
+    block = cosine_similarity(tfidf_matrix[start:end], tfidf_matrix, dense_output=False).tocsr()
+    
+    counts = np.zeros(end - start, dtype=np.int64)
+    block_indices = []
+    block_scores = []
+    
+    for row in range(end - start):
+        row_start, row_end = block.indptr[row], block.indptr[row + 1]
+        columns = block.indices[row_start:row_end]
+        values = block.data[row_start:row_end]
+        
+        # Descartar diagonal y scores bajo el umbral
+        keep = (columns != start + row) & (values >= threshold)
+        columns = columns[keep]
+        values = values[keep]
+        
+        if top_k is not None and len(values) > top_k:
+            selected = np.argpartition(-values, top_k - 1)[:top_k]
+            columns = columns[selected]
+            values = values[selected]
+        
+        order = np.argsort(-values, kind='stable')
+        block_indices.append(columns[order].astype(np.int32))
+        block_scores.append(values[order].astype(np.float32))
+        counts[row] = len(order)
+    
+    return (
+        counts,
+        np.concatenate(block_indices) if block_indices else np.zeros(0, dtype=np.int32),
+        np.concatenate(block_scores) if block_scores else np.zeros(0, dtype=np.float32)
+    )
+
+def _top_k_positions(scores, mask, k):
+    """Posiciones de los k mayores scores que cumplen la máscara, en orden descendente"""
+    candidates = np.flatnonzero(mask)
+    if k <= 0 or len(candidates) == 0:
+        return candidates[:0]
+    
+    if len(candidates) > k:
+        candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+    
+    return candidates[np.argsort(-scores[candidates], kind='stable')]
+
+def _merge_topk_entries(rows, columns, scores, n_rows, top_k):
+    """
+    Construir una matriz CSR de vecinos a partir de tripletas (fila, columna, score)
+    conservando los top_k mayores por fila, ordenados de forma descendente
+    """
+    order = np.lexsort((-scores, rows))
+    rows = rows[order]
+    columns = columns[order]
+    scores = scores[order]
+    
+    if top_k is not None and len(rows):
+        # Posición de cada entrada dentro de su fila
+        rank = np.arange(len(rows)) - np.searchsorted(rows, rows, side='left')
+        keep = rank < top_k
+        rows = rows[keep]
+        columns = columns[keep]
+        scores = scores[keep]
+    
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+    
+    return sparse.csr_matrix(
+        (scores.astype(np.float32), columns.astype(np.int32), indptr),
+        shape=(n_rows, n_rows)
+    )
+
+def _csr_nbytes(matrix):
+    """Memoria ocupada por una matriz CSR"""
+    return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
 
 class OJSRecommendationEngine:
     """
     Motor de recomendaciones optimizado para OJS 3.3+ con almacenamiento persistente
     """
     
-    def __init__(self, connection):
+    def __init__(self, connection, top_k=DEFAULT_SIMILARITY_TOP_K,
+                 similarity_threshold=DEFAULT_SIMILARITY_THRESHOLD,
+                 block_size=DEFAULT_SIMILARITY_BLOCK_SIZE,
+                 workers=DEFAULT_SIMILARITY_WORKERS,
+                 similarity_backend=DEFAULT_SIMILARITY_BACKEND,
+                 ann_params=None,
+                 refit_interval_days=DEFAULT_REFIT_INTERVAL_DAYS,
+                 refit_drift_threshold=DEFAULT_REFIT_DRIFT_THRESHOLD):
         self.connection = connection
         self.articles_data = {}
         self.tfidf_vectorizer = None
         self.tfidf_matrix = None
+        # Matriz CSR (N x N) con los top-k vecinos de cada artículo, sin diagonal
         self.similarity_matrix = None
         self.article_ids = []
+        self.article_index = {}
+        
+        # Parámetros de la estructura de vecinos
+        self.top_k = top_k
+        self.similarity_threshold = similarity_threshold
+        self.block_size = block_size
+        self.workers = workers
+        self.similarity_backend = similarity_backend
+        self.ann_params = dict(ann_params or {})
+        
+        # Estado de actualización incremental (vocabulario e IDF fijos entre reajustes)
+        self.refit_interval = timedelta(days=refit_interval_days)
+        self.refit_drift_threshold = refit_drift_threshold
+        self.last_full_fit = None
+        self.baseline_oov_ratio = 0.0
+        self.drift_tokens_total = 0
+        self.drift_tokens_oov = 0
         
-    def load_articles_data(self):
+    def load_articles_data(self, publication_ids=None):
         """Cargar datos de artículos desde publications - Optimizado para batch"""
         print("📚 Cargando datos de artículos para procesamiento batch...")
         
+        self.articles_data.update(self.fetch_article_records(publication_ids))
+        
+        print(f"✅ Cargados {len(self.articles_data)} artículos únicos")
+        return len(self.articles_data)
+    
+    def fetch_article_records(self, publication_ids=None):
+        """
+        Consultar y limpiar artículos publicados sin modificar articles_data
+        Solo lee de la tabla desnormalizada article_summaries; la actualiza el cálculo
+        nocturno (refresh_engine_snapshot), nunca una carga de lectura
+        publication_ids limita la consulta a esas publicaciones (cargas incrementales)
+        """
+        if publication_ids is not None and not publication_ids:
+            return {}
+        
+        id_filter = ''
+        params = None
+        if publication_ids is not None:
+            publication_ids = list(publication_ids)
+            id_filter = f"AND publication_id IN ({', '.join(['%s'] * len(publication_ids))})"
+            params = tuple(publication_ids)
+        
         with self.connection.cursor() as cursor:
-            # Query optimizado para cargar todos los artículos de una vez
-            cursor.execute("""
+            # Una fila indexada por artículo, sin JOIN sobre tablas EAV
+            cursor.execute(f"""
                 SELECT 
-                    p.publication_id,
-                    p.submission_id,
-                    s.context_id,
-                    p.date_published,
-                    p.status,
-                    
-                    -- Títulos priorizando español
-                    COALESCE(
-                        ps_title_es.setting_value,
-                        ps_title_en.setting_value,
-                        'Sin título'
-                    ) as title,
-                    
-                    -- Abstracts priorizando español
-                    COALESCE(
-                        ps_abstract_es.setting_value,
-                        ps_abstract_en.setting_value,
-                        ''
-                    ) as abstract,
-                    
-                    -- Autores con nombres completos
-                    GROUP_CONCAT(
-                        DISTINCT COALESCE(
-                            CONCAT(
-                                COALESCE(aus_fname.setting_value, ''), 
-                                ' ', 
-                                COALESCE(aus_lname.setting_value, '')
-                            ),
-                            a.email,
-                            'Autor desconocido'
-                        ) 
-                        SEPARATOR '; '
-                    ) as authors,
-                    
-                    -- Afiliaciones de autores
-                    GROUP_CONCAT(
-                        DISTINCT aus_affiliation.setting_value
-                        SEPARATOR '; '
-                    ) as affiliations
-                    
-                FROM publications p
-                JOIN submissions s ON p.submission_id = s.submission_id
-                
-                -- Títulos
-                LEFT JOIN publication_settings ps_title_es ON p.publication_id = ps_title_es.publication_id 
-                    AND ps_title_es.setting_name = 'title' AND ps_title_es.locale = 'es'
-                LEFT JOIN publication_settings ps_title_en ON p.publication_id = ps_title_en.publication_id 
-                    AND ps_title_en.setting_name = 'title' AND ps_title_en.locale = 'en'
-                
-                -- Abstracts
-                LEFT JOIN publication_settings ps_abstract_es ON p.publication_id = ps_abstract_es.publication_id 
-                    AND ps_abstract_es.setting_name = 'abstract' AND ps_abstract_es.locale = 'es'
-                LEFT JOIN publication_settings ps_abstract_en ON p.publication_id = ps_abstract_en.publication_id 
-                    AND ps_abstract_en.setting_name = 'abstract' AND ps_abstract_en.locale = 'en'
-                
-                -- Autores
-                LEFT JOIN authors a ON p.publication_id = a.publication_id
-                LEFT JOIN author_settings aus_fname ON a.author_id = aus_fname.author_id 
-                    AND aus_fname.setting_name = 'givenName'
-                LEFT JOIN author_settings aus_lname ON a.author_id = aus_lname.author_id 
-                    AND aus_lname.setting_name = 'familyName'
-                LEFT JOIN author_settings aus_affiliation ON a.author_id = aus_affiliation.author_id 
-                    AND aus_affiliation.setting_name = 'affiliation'
-                
-                WHERE p.status = 3  -- Solo publicaciones activas
-                
-                GROUP BY p.publication_id, p.submission_id, s.context_id, p.date_published, p.status
-                HAVING title != 'Sin título'  -- Solo artículos con título
-                ORDER BY p.date_published DESC
-            """)
+                    publication_id,
+                    submission_id,
+                    context_id,
+                    date_published,
+                    status,
+                    title,
+                    abstract,
+                    authors,
+                    affiliations
+                FROM article_summaries
+                WHERE status = 3  -- Solo publicaciones activas
+                AND title != 'Sin título'  -- Solo artículos con título
+                {id_filter}
+                ORDER BY date_published DESC
+            """, params)
             
-            articles = cursor.fetchall()
-            
-            for article in articles:
-                # Limpiar título y abstract de HTML
-                clean_title = self._clean_html_text(article['title'] or 'Sin título')
-                clean_abstract = self._clean_html_text(article['abstract'] or '')
-                clean_authors = self._clean_authors(article['authors'] or '')
-                
-                self.articles_data[article['publication_id']] = {
-                    'publication_id': article['publication_id'],
-                    'submission_id': article['submission_id'],
-                    'title': clean_title,
-                    'abstract': clean_abstract,
-                    'authors': clean_authors,
-                    'affiliations': article['affiliations'] or '',
-                    'date_published': article['date_published'],
-                    'content': self._prepare_content_for_analysis(
-                        clean_title, 
-                        clean_abstract, 
-                        clean_authors,
-                        article['affiliations'] or ''
-                    )
-                }
-            
-            print(f"✅ Cargados {len(self.articles_data)} artículos únicos")
-            return len(self.articles_data)
+            return {
+                article['publication_id']: self._build_article_record(article)
+                for article in cursor.fetchall()
+            }
+    
+    def _build_article_record(self, article):
+        """Limpiar una fila de publicación y preparar su contenido para TF-IDF"""
+        # Limpiar título y abstract de HTML
+        clean_title = self._clean_html_text(article['title'] or 'Sin título')
+        clean_abstract = self._clean_html_text(article['abstract'] or '')
+        clean_authors = self._clean_authors(article['authors'] or '')
+        
+        return {
+            'publication_id': article['publication_id'],
+            'submission_id': article['submission_id'],
+            'title': clean_title,
+            'abstract': clean_abstract,
+            'authors': clean_authors,
+            'affiliations': article['affiliations'] or '',
+            'date_published': article['date_published'],
+            'content': self._prepare_content_for_analysis(
+                clean_title, 
+                clean_abstract, 
+                clean_authors,
+                article['affiliations'] or ''
+            )
+        }
     
     def build_similarity_matrix(self):
         """Construir matriz de similitud TF-IDF optimizada para batch processing"""
@@ -152,31 +365,44 @@ class OJSRecommendationEngine:
             article_contents.append(article['content'])
             self.article_ids.append(pub_id)
         
+        self.article_index = {pub_id: i for i, pub_id in enumerate(self.article_ids)}
+        
         # Crear vectorizador TF-IDF optimizado para procesamiento batch
-        self.tfidf_vectorizer = TfidfVectorizer(
-            max_features=3000,  # Incrementado para mejor precisión en batch
-            stop_words=self._get_stopwords(),
-            ngram_range=(1, 3),  # Unigrams, bigrams, trigrams
-            min_df=2,  # Mínimo 2 documentos para reducir ruido
-            max_df=0.85,  # Máximo 85% para filtrar términos muy comunes
-            analyzer='word',
-            lowercase=True,
-            token_pattern=r'\b[a-záéíóúñü]{2,}\b',  # Solo palabras válidas
-            dtype=np.float32  # Optimización de memoria
-        )
+        self.tfidf_vectorizer = self._create_tfidf_vectorizer()
         
         try:
             # Crear matriz TF-IDF
             print("   🔢 Generando matriz TF-IDF...")
             self.tfidf_matrix = self.tfidf_vectorizer.fit_transform(article_contents)
             
-            # Calcular similitud coseno con optimización de memoria
-            print("   📊 Calculando similitudes coseno...")
-            self.similarity_matrix = cosine_similarity(self.tfidf_matrix, dense_output=True)
+            if self.similarity_backend == 'lsh' and self.tfidf_matrix.shape[0] >= ANN_MIN_ROWS:
+                # Vecinos aproximados: coseno exacto solo entre artículos de la misma cubeta LSH
+                print("   📊 Calculando similitudes coseno (LSH aproximado)...")
+                self.similarity_matrix, lsh_index = build_lsh_topk_similarity(
+                    self.tfidf_matrix, self.top_k, self.similarity_threshold, **self.ann_params
+                )
+                print(f"   🗂️ Índice LSH: {lsh_index.get_info()}")
+            else:
+                # Calcular similitud coseno por bloques conservando solo top-k vecinos
+                print("   📊 Calculando similitudes coseno (top-k disperso por bloques)...")
+                self.similarity_matrix = build_topk_similarity(
+                    self.tfidf_matrix,
+                    top_k=self.top_k,
+                    threshold=self.similarity_threshold,
+                    block_size=self.block_size,
+                    workers=self.workers
+                )
+            
+            # Reiniciar estado de deriva del vocabulario
+            self.last_full_fit = datetime.now()
+            oov, total = self._count_oov_tokens(article_contents[:DRIFT_BASELINE_SAMPLE])
+            self.baseline_oov_ratio = oov / total if total else 0.0
+            self.drift_tokens_total = 0
+            self.drift_tokens_oov = 0
             
-            print(f"✅ Matriz de similitud creada: {self.similarity_matrix.shape}")
+            print(f"✅ Matriz de similitud creada: {self.similarity_matrix.shape} ({self.similarity_matrix.nnz} vecinos)")
             print(f"📊 Vocabulario TF-IDF: {len(self.tfidf_vectorizer.vocabulary_)} términos")
-            print(f"💾 Memoria matriz: {self.similarity_matrix.nbytes / 1024 / 1024:.1f} MB")
+            print(f"💾 Memoria matriz: {_csr_nbytes(self.similarity_matrix) / 1024 / 1024:.1f} MB")
             
             return True
             
@@ -184,6 +410,130 @@ class OJSRecommendationEngine:
             print(f"❌ Error construyendo matriz de similitud: {e}")
             return False
     
+    def update_articles(self, changed_articles, removed_ids=()):
+        """
+        Actualizar incrementalmente artículos nuevos, modificados o despublicados
+        changed_articles: publication_id -> registro (ver _build_article_record)
+        Conserva vocabulario e IDF, transforma solo los artículos cambiados y
+        recalcula sus filas y columnas en la estructura de vecinos.
+        Hace un reajuste completo si no hay modelo, si venció refit_interval o si
+        la deriva del vocabulario supera refit_drift_threshold.
+        Nota: una fila no afectada que pierde un vecino puede quedar con menos de
+        top_k entradas hasta el siguiente reajuste completo.
+        """
+        removed_ids = {pub_id for pub_id in removed_ids if pub_id not in changed_articles}
+        
+        if not changed_articles and not removed_ids:
+            return True
+        
+        if self.needs_full_refit(changed_articles.values()):
+            print("🔁 Reajuste completo del vocabulario TF-IDF...")
+            for pub_id in removed_ids:
+                self.articles_data.pop(pub_id, None)
+            self.articles_data.update(changed_articles)
+            return self.build_similarity_matrix()
+        
+        print(f"🧩 Actualización incremental: {len(changed_articles)} cambiados, {len(removed_ids)} eliminados")
+        
+        # Contabilizar deriva del vocabulario con los documentos nuevos
+        oov, total = self._count_oov_tokens([article['content'] for article in changed_articles.values()])
+        self.drift_tokens_oov += oov
+        self.drift_tokens_total += total
+        
+        # Nuevo orden de artículos: se conservan posiciones y se agregan los nuevos al final
+        old_count = len(self.article_ids)
+        kept_old = np.array([pub_id not in removed_ids for pub_id in self.article_ids], dtype=bool)
+        new_ids = [pub_id for pub_id in changed_articles if pub_id not in self.article_index]
+        article_ids = [pub_id for pub_id, keep in zip(self.article_ids, kept_old) if keep] + new_ids
+        
+        # Mapa índice viejo -> índice nuevo (-1 si se eliminó)
+        old_to_new = np.full(old_count, -1, dtype=np.int64)
+        old_to_new[kept_old] = np.arange(int(kept_old.sum()))
+        
+        # Matriz TF-IDF: filas viejas conservadas + filas transformadas al final, reordenadas
+        changed_ids = list(changed_articles.keys())
+        changed_rows = self.tfidf_vectorizer.transform([changed_articles[pub_id]['content'] for pub_id in changed_ids])
+        stacked = sparse.vstack([self.tfidf_matrix, changed_rows]).tocsr()
+        changed_position = {pub_id: old_count + i for i, pub_id in enumerate(changed_ids)}
+        row_source = np.array([
+            changed_position[pub_id] if pub_id in changed_position else self.article_index[pub_id]
+            for pub_id in article_ids
+        ], dtype=np.int64)
+        tfidf_matrix = stacked[row_source]
+        
+        article_index = {pub_id: i for i, pub_id in enumerate(article_ids)}
+        affected = np.array(sorted(article_index[pub_id] for pub_id in changed_ids), dtype=np.int64)
+        is_affected = np.zeros(len(article_ids), dtype=bool)
+        is_affected[affected] = True
+        
+        # Entradas viejas entre artículos no afectados, con índices remapeados
+        old_matrix = self.similarity_matrix
+        old_rows = np.repeat(np.arange(old_count), np.diff(old_matrix.indptr))
+        old_rows = old_to_new[old_rows]
+        old_cols = old_to_new[old_matrix.indices]
+        old_scores = np.asarray(old_matrix.data)
+        valid = (old_rows >= 0) & (old_cols >= 0)
+        valid[valid] &= ~is_affected[old_rows[valid]] & ~is_affected[old_cols[valid]]
+        
+        # Filas completas de los afectados; su transpuesta da sus columnas (coseno simétrico)
+        product = cosine_similarity(tfidf_matrix[affected], tfidf_matrix, dense_output=False).tocoo()
+        product_rows = affected[product.row]
+        product_cols = product.col.astype(np.int64)
+        product_scores = product.data
+        product_keep = (product_rows != product_cols) & (product_scores >= self.similarity_threshold)
+        product_rows = product_rows[product_keep]
+        product_cols = product_cols[product_keep]
+        product_scores = product_scores[product_keep]
+        column_keep = ~is_affected[product_cols]
+        
+        self.similarity_matrix = _merge_topk_entries(
+            np.concatenate([old_rows[valid], product_rows, product_cols[column_keep]]),
+            np.concatenate([old_cols[valid], product_cols, product_rows[column_keep]]),
+            np.concatenate([old_scores[valid], product_scores, product_scores[column_keep]]).astype(np.float64),
+            len(article_ids),
+            self.top_k
+        )
+        
+        for pub_id in removed_ids:
+            self.articles_data.pop(pub_id, None)
+        self.articles_data.update(changed_articles)
+        self.tfidf_matrix = tfidf_matrix
+        self.article_ids = article_ids
+        self.article_index = article_index
+        
+        print(f"✅ Estructura de vecinos actualizada: {self.similarity_matrix.shape} ({self.similarity_matrix.nnz} vecinos)")
+        return True
+    
+    def needs_full_refit(self, changed_articles=()):
+        """Decidir si la actualización debe reajustar el vocabulario completo"""
+        if self.tfidf_vectorizer is None or self.similarity_matrix is None or self.last_full_fit is None:
+            return True
+        
+        if datetime.now() - self.last_full_fit >= self.refit_interval:
+            return True
+        
+        oov, total = self._count_oov_tokens([article['content'] for article in changed_articles])
+        return self._vocabulary_drift(oov, total) > self.refit_drift_threshold
+    
+    def _vocabulary_drift(self, extra_oov=0, extra_total=0):
+        """Aumento de la tasa de términos fuera de vocabulario respecto al último reajuste"""
+        total = self.drift_tokens_total + extra_total
+        if total == 0:
+            return 0.0
+        return max(0.0, (self.drift_tokens_oov + extra_oov) / total - self.baseline_oov_ratio)
+    
+    def _count_oov_tokens(self, contents):
+        """Contar términos (n-gramas) fuera del vocabulario ajustado"""
+        analyzer = self.tfidf_vectorizer.build_analyzer()
+        vocabulary = self.tfidf_vectorizer.vocabulary_
+        oov = 0
+        total = 0
+        for content in contents:
+            terms = analyzer(content)
+            total += len(terms)
+            oov += sum(1 for term in terms if term not in vocabulary)
+        return oov, total
+    
     def get_similar_articles(self, publication_id, n_recommendations=5):
         """Obtener artículos similares - Optimizado para almacenamiento persistente"""
         if self.similarity_matrix is None:
@@ -193,82 +543,70 @@ class OJSRecommendationEngine:
         if publication_id not in self.articles_data:
             return []
         
-        try:
-            # Obtener índice del artículo
-            article_index = self.article_ids.index(publication_id)
-        except ValueError:
+        # Obtener índice del artículo
+        article_index = self.article_index.get(publication_id)
+        if article_index is None:
             return []
         
-        # Obtener similitudes
-        similarities = self.similarity_matrix[article_index]
+        # Obtener vecinos almacenados (la diagonal no se guarda)
+        neighbour_indices, neighbour_scores = self._get_neighbours(article_index)
         
-        # Crear lista de recomendaciones con metadatos para persistencia
-        recommendations = []
-        for i, similarity_score in enumerate(similarities):
-            if i != article_index and similarity_score > 0.01:  # Umbral mínimo
-                other_pub_id = self.article_ids[i]
-                article = self.articles_data[other_pub_id]
-                
-                recommendations.append({
-                    'publication_id': other_pub_id,
-                    'submission_id': article['submission_id'],
-                    'title': article['title'],
-                    'abstract': article['abstract'][:300] + '...' if len(article['abstract']) > 300 else article['abstract'],
-                    'authors': article['authors'],
-                    'date_published': article['date_published'].isoformat() if hasattr(article['date_published'], 'isoformat') else str(article['date_published']) if article['date_published'] else None,
-                    'similarity_score': float(similarity_score),
-                    'algorithm': 'content_based_tfidf',
-                    'score': float(similarity_score),
-                    'confidence': min(similarity_score * 1.5, 1.0),  # Confianza ajustada
-                    'url': f'/article/view/{article["submission_id"]}',
-                    # Metadatos adicionales para persistencia
-                    'calculation_timestamp': datetime.now().isoformat(),
-                    'tfidf_features': len(self.tfidf_vectorizer.vocabulary_),
-                    'total_articles_compared': len(self.articles_data)
-                })
+        # Seleccionar ganadores con umbral mínimo antes de construir resultados
+        primary_mask = neighbour_scores > 0.01
+        primary = _top_k_positions(neighbour_scores, primary_mask, n_recommendations)
         
-        # Ordenar por similitud descendente
-        recommendations.sort(key=lambda x: x['similarity_score'], reverse=True)
+        recommendations = [
+            self._build_similar_article(
+                neighbour_indices[pos], neighbour_scores[pos],
+                'content_based_tfidf', min(neighbour_scores[pos] * 1.5, 1.0)
+            )
+            for pos in primary
+        ]
         
         # Si no hay suficientes similares con umbral alto, usar umbral más bajo
         if len(recommendations) < n_recommendations:
-            additional_recs = []
-            for i, similarity_score in enumerate(similarities):
-                if (i != article_index and 
-                    similarity_score > 0.005 and  # Umbral muy bajo
-                    not any(r['publication_id'] == self.article_ids[i] for r in recommendations)):
-                    
-                    other_pub_id = self.article_ids[i]
-                    article = self.articles_data[other_pub_id]
-                    
-                    additional_recs.append({
-                        'publication_id': other_pub_id,
-                        'submission_id': article['submission_id'],
-                        'title': article['title'],
-                        'abstract': article['abstract'][:300] + '...' if len(article['abstract']) > 300 else article['abstract'],
-                        'authors': article['authors'],
-                        'date_published': article['date_published'].isoformat() if hasattr(article['date_published'], 'isoformat') else str(article['date_published']) if article['date_published'] else None,
-                        'similarity_score': float(similarity_score),
-                        'algorithm': 'content_based_tfidf_fallback',
-                        'score': float(similarity_score),
-                        'confidence': min(similarity_score * 1.2, 0.7),  # Menor confianza para fallback
-                        'url': f'/article/view/{article["submission_id"]}',
-                        'calculation_timestamp': datetime.now().isoformat(),
-                        'tfidf_features': len(self.tfidf_vectorizer.vocabulary_),
-                        'total_articles_compared': len(self.articles_data)
-                    })
-            
-            # Ordenar adicionales y agregar los necesarios
-            additional_recs.sort(key=lambda x: x['similarity_score'], reverse=True)
+            fallback_mask = (neighbour_scores > 0.005) & ~primary_mask  # Umbral muy bajo
             needed = n_recommendations - len(recommendations)
-            recommendations.extend(additional_recs[:needed])
+            fallback = _top_k_positions(neighbour_scores, fallback_mask, needed)
+            
+            recommendations.extend(
+                self._build_similar_article(
+                    neighbour_indices[pos], neighbour_scores[pos],
+                    'content_based_tfidf_fallback', min(neighbour_scores[pos] * 1.2, 0.7)  # Menor confianza para fallback
+                )
+                for pos in fallback
+            )
         
-        return recommendations[:n_recommendations]
+        return recommendations
+    
+    def _build_similar_article(self, other_index, similarity_score, algorithm, confidence):
+        """Construir resultado de artículo similar con metadatos para persistencia"""
+        other_pub_id = self.article_ids[other_index]
+        article = self.articles_data[other_pub_id]
+        
+        return {
+            'publication_id': other_pub_id,
+            'submission_id': article['submission_id'],
+            'title': article['title'],
+            'abstract': article['abstract'][:300] + '...' if len(article['abstract']) > 300 else article['abstract'],
+            'authors': article['authors'],
+            'date_published': article['date_published'].isoformat() if hasattr(article['date_published'], 'isoformat') else str(article['date_published']) if article['date_published'] else None,
+            'similarity_score': float(similarity_score),
+            'algorithm': algorithm,
+            'score': float(similarity_score),
+            'confidence': float(confidence),
+            'url': f'/article/view/{article["submission_id"]}',
+            # Metadatos adicionales para persistencia
+            'calculation_timestamp': datetime.now().isoformat(),
+            'tfidf_features': len(self.tfidf_vectorizer.vocabulary_),
+            'total_articles_compared': len(self.articles_data)
+        }
     
     def get_all_similarities_batch(self, min_similarity=0.01):
         """
         Obtener todas las similitudes para almacenamiento batch
         Nuevo método optimizado para la arquitectura persistente
+        Solo incluye los top-k vecinos almacenados con score >= similarity_threshold
         """
         if self.similarity_matrix is None:
             if not self.build_similarity_matrix():
@@ -276,41 +614,80 @@ class OJSRecommendationEngine:
         
         print("🔄 Generando similitudes batch para almacenamiento persistente...")
         
-        all_similarities = {}
-        total_pairs = 0
+        # Filtrado y ordenamiento de todos los pares en una sola operación matricial
+        matrix = self.similarity_matrix
+        source_rows = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+        keep = matrix.data >= min_similarity
+        source_rows = source_rows[keep]
+        target_cols = matrix.indices[keep]
+        scores = matrix.data[keep].astype(np.float64)
         
+        order = np.lexsort((-scores, source_rows))
+        source_rows = source_rows[order]
+        target_cols = target_cols[order]
+        scores = scores[order]
+        confidences = np.minimum(scores * 1.5, 1.0)
+        boundaries = np.searchsorted(source_rows, np.arange(matrix.shape[0] + 1))
+        
+        # Metadatos por artículo destino, construidos una sola vez
+        targets = [
+            (
+                target_id,
+                self.articles_data[target_id]['submission_id'],
+                self.articles_data[target_id]['title'],
+                self.articles_data[target_id]['authors'],
+                self.articles_data[target_id]['abstract'][:200] if self.articles_data[target_id]['abstract'] else ''
+            )
+            for target_id in self.article_ids
+        ]
+        
+        all_similarities = {}
         for i, source_id in enumerate(self.article_ids):
-            similarities = self.similarity_matrix[i]
+            start, end = boundaries[i], boundaries[i + 1]
             article_similarities = []
             
-            for j, similarity_score in enumerate(similarities):
-                if i != j and similarity_score >= min_similarity:
-                    target_id = self.article_ids[j]
-                    target_article = self.articles_data[target_id]
-                    
-                    article_similarities.append({
-                        'target_publication_id': target_id,
-                        'target_submission_id': target_article['submission_id'],
-                        'similarity_score': float(similarity_score),
-                        'target_title': target_article['title'],
-                        'target_authors': target_article['authors'],
-                        'target_abstract_preview': target_article['abstract'][:200] if target_article['abstract'] else '',
-                        'algorithm': 'batch_tfidf_cosine',
-                        'confidence': min(similarity_score * 1.5, 1.0)
-                    })
-                    total_pairs += 1
+            for j, similarity_score, confidence in zip(
+                    target_cols[start:end].tolist(), scores[start:end].tolist(), confidences[start:end].tolist()):
+                target_id, submission_id, title, authors, abstract_preview = targets[j]
+                article_similarities.append({
+                    'target_publication_id': target_id,
+                    'target_submission_id': submission_id,
+                    'similarity_score': similarity_score,
+                    'target_title': title,
+                    'target_authors': authors,
+                    'target_abstract_preview': abstract_preview,
+                    'algorithm': 'batch_tfidf_cosine',
+                    'confidence': confidence
+                })
             
-            # Ordenar por similitud descendente
-            article_similarities.sort(key=lambda x: x['similarity_score'], reverse=True)
             all_similarities[source_id] = article_similarities
-            
-            # Log progreso cada 100 artículos
-            if (i + 1) % 100 == 0:
-                print(f"   Procesados {i + 1}/{len(self.article_ids)} artículos...")
         
-        print(f"✅ Batch similitudes generado: {total_pairs} pares de similitud")
+        print(f"✅ Batch similitudes generado: {len(scores)} pares de similitud")
         return all_similarities
     
+    def _create_tfidf_vectorizer(self):
+        """Vectorizador TF-IDF (sin ajustar) con la configuración del motor"""
+        return TfidfVectorizer(
+            max_features=3000,  # Incrementado para mejor precisión en batch
+            stop_words=self._get_stopwords(),
+            ngram_range=(1, 3),  # Unigrams, bigrams, trigrams
+            min_df=2,  # Mínimo 2 documentos para reducir ruido
+            max_df=0.85,  # Máximo 85% para filtrar términos muy comunes
+            analyzer='word',
+            lowercase=True,
+            token_pattern=r'\b[a-záéíóúñü]{2,}\b',  # Solo palabras válidas
+            dtype=np.float32  # Optimización de memoria
+        )
+    
+    def _get_neighbours(self, article_index):
+        """Obtener índices y scores de los vecinos almacenados para una fila"""
+        start = self.similarity_matrix.indptr[article_index]
+        end = self.similarity_matrix.indptr[article_index + 1]
+        return (
+            self.similarity_matrix.indices[start:end],
+            self.similarity_matrix.data[start:end]
+        )
+    
     def get_recommendations_by_author_similarity(self, target_authors, n_recommendations=5):
         """Recomendaciones basadas en autores similares - Optimizado"""
         if not self.articles_data:
@@ -585,35 +962,46 @@ class OJSRecommendationEngine:
         }
     
     def validate_similarity_matrix(self):
-        """Validar integridad de la matriz de similitud"""
+        """Validar integridad de la estructura de vecinos top-k"""
         if self.similarity_matrix is None:
             return {'valid': False, 'error': 'Matriz no inicializada'}
         
         try:
-            # Verificar que es simétrica
-            is_symmetric = np.allclose(self.similarity_matrix, self.similarity_matrix.T, rtol=1e-10)
+            matrix = self.similarity_matrix
+            n_rows = matrix.shape[0]
+            row_counts = np.diff(matrix.indptr)
+            row_ids = np.repeat(np.arange(n_rows), row_counts)
             
-            # Verificar diagonal = 1
-            diagonal_ones = np.allclose(np.diag(self.similarity_matrix), 1.0, rtol=1e-10)
+            # Verificar que no se almacena la diagonal
+            no_self_neighbours = not np.any(matrix.indices == row_ids)
             
-            # Verificar rango [0,1]
-            values_in_range = (self.similarity_matrix >= 0).all() and (self.similarity_matrix <= 1).all()
+            # Verificar rango [umbral, 1] con tolerancia float32
+            values_in_range = bool(
+                (matrix.data >= self.similarity_threshold).all() and
+                (matrix.data <= 1.0 + 1e-5).all()
+            )
             
-            # Estadísticas básicas
+            # Verificar que ninguna fila excede top_k
+            within_top_k = self.top_k is None or bool((row_counts <= self.top_k).all())
+            
+            # Estadísticas básicas sobre los vecinos almacenados
             stats = {
-                'mean_similarity': float(np.mean(self.similarity_matrix)),
-                'std_similarity': float(np.std(self.similarity_matrix)),
-                'max_similarity': float(np.max(self.similarity_matrix[self.similarity_matrix < 1.0])),
-                'min_similarity': float(np.min(self.similarity_matrix))
+                'mean_similarity': float(np.mean(matrix.data)) if matrix.nnz else 0.0,
+                'std_similarity': float(np.std(matrix.data)) if matrix.nnz else 0.0,
+                'max_similarity': float(np.max(matrix.data)) if matrix.nnz else 0.0,
+                'min_similarity': float(np.min(matrix.data)) if matrix.nnz else 0.0,
+                'stored_neighbours': int(matrix.nnz),
+                'articles_without_neighbours': int(np.sum(row_counts == 0)),
+                'memory_mb': _csr_nbytes(matrix) / 1024 / 1024
             }
             
             return {
-                'valid': is_symmetric and diagonal_ones and values_in_range,
-                'is_symmetric': is_symmetric,
-                'diagonal_ones': diagonal_ones,
+                'valid': no_self_neighbours and values_in_range and within_top_k,
+                'no_self_neighbours': no_self_neighbours,
                 'values_in_range': values_in_range,
+                'within_top_k': within_top_k,
                 'statistics': stats,
-                'shape': self.similarity_matrix.shape
+                'shape': matrix.shape
             }
             
         except Exception as e:
@@ -627,6 +1015,9 @@ def get_recommendations_for_article(connection, publication_id, n_recommendation
     """Obtener recomendaciones para un artículo específico - Compatible con plugin PHP"""
     try:
         engine = OJSRecommendationEngine(connection)
+        # Reutilizar el snapshot en disco si el corpus no cambió
+        if not load_or_build_engine(engine):
+            return []
         return engine.get_similar_articles(publication_id, n_recommendations)
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -659,9 +1050,8 @@ def get_batch_similarities(connection, min_similarity=0.01):
     """
     try:
         engine = OJSRecommendationEngine(connection)
-        engine.load_articles_data()
         
-        if not engine.build_similarity_matrix():
+        if not load_or_build_engine(engine):
             return {}
         
         return engine.get_all_similarities_batch(min_similarity)
@@ -669,6 +1059,37 @@ def get_batch_similarities(connection, min_similarity=0.01):
         print(f"❌ Error en batch similarities: {e}")
         return {}
 
+def benchmark_ann_recall(connection, configs=None, sample_size=500):
+    """
+    Medir recall@k y latencia del backend LSH contra los top-k exactos del motor
+    configs: parámetros de RandomProjectionLSH a comparar (por defecto ann_index.BENCHMARK_CONFIGS)
+    """
+    try:
+        engine = OJSRecommendationEngine(connection)
+        if not load_or_build_engine(engine):
+            return []
+        
+        exact_matrix = engine.similarity_matrix
+        if engine.similarity_backend != 'exact':
+            exact_matrix = build_topk_similarity(
+                engine.tfidf_matrix, top_k=engine.top_k,
+                threshold=engine.similarity_threshold, block_size=engine.block_size
+            )
+        
+        results = benchmark_lsh(
+            engine.tfidf_matrix, exact_matrix, engine.top_k,
+            threshold=engine.similarity_threshold, configs=configs, sample_size=sample_size
+        )
+        for result in results:
+            print(f"   🎯 svd={result['svd_components']} tablas={result['n_tables']} bits={result['n_bits']}: "
+                  f"recall@{result['top_k']}={result['recall_at_k']:.3f}, "
+                  f"{result['avg_query_ms']:.2f} ms/artículo, "
+                  f"{result['candidate_fraction']:.1%} candidatos, índice {result['build_seconds']:.2f}s")
+        return results
+    except Exception as e:
+        print(f"❌ Error en benchmark ANN: {e}")
+        return []
+
 def validate_system_health(connection):
     """
     Validar salud del sistema de recomendaciones
@@ -0,0 +1,40 @@
+"""
+Worker de Recomendaciones
+Proceso separado de la API que ejecuta los trabajos encolados en recommendation_jobs
+(cálculo diario, particiones, limpieza). La API y su programador solo encolan
+Uso:
+    python recommendation_worker.py          # escuchar la cola hasta SIGINT/SIGTERM
+    python recommendation_worker.py --once   # vaciar la cola y terminar (cron)
+"""
+
+import sys
+import signal
+
+from main_hybrid import JOB_HANDLERS, db_pool, ensure_schema, job_queue
+from job_queue import JobWorker
+
+def main():
+    once = '--once' in sys.argv[1:]
+
+    if job_queue.backend == 'local':
+        print("⚠️ JOB_QUEUE_CONFIG['backend'] = 'local': la cola vive dentro de la API y este worker no la ve")
+        return 1
+
+    ensure_schema()
+    worker = JobWorker(job_queue, JOB_HANDLERS)
+
+    def handle_signal(signum, frame):
+        print(f"🛑 Señal {signum} recibida, terminando después del trabajo actual...")
+        worker.stop()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    try:
+        worker.run_forever(once=once)
+    finally:
+        db_pool.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
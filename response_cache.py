@@ -0,0 +1,258 @@
+"""
+Caché de Respuestas para Endpoints de Lectura
+Las respuestas se guardan por ruta + parámetros y se etiquetan con la fecha de
+cálculo; al registrarse un cálculo se invalidan las entradas de esa fecha
+Backends: LRU en proceso (por defecto) o Redis compartido entre workers; si Redis
+no está instalado o no responde se usa el LRU local en su lugar
+"""
+
+import json
+import time
+import threading
+from collections import OrderedDict
+from datetime import date
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+RESPONSE_CACHE_CONFIG = {
+    'enabled': True,
+    'backend': 'local',                 # 'local' o 'redis'
+    'redis_url': 'redis://localhost:6379/0',
+    'key_prefix': 'ojs_rec:',
+    'default_ttl': 300,                 # Segundos; el cálculo diario invalida antes
+    'max_entries': 1000,
+    'max_bytes': 64 * 1024 * 1024       # Tamaño aproximado (JSON) del backend local
+}
+
+def calculation_tag(calculation_date=None):
+    """Etiqueta de las entradas que dependen de los datos calculados para una fecha"""
+    return f"calc:{(calculation_date or date.today()).isoformat()}"
+
+def _encode(value):
+    return json.dumps(value, default=str, separators=(',', ':'))
+
+# ================================
+# BACKENDS
+# ================================
+
+class LocalLRUBackend:
+    """LRU en proceso con límite de entradas y de bytes"""
+
+    name = 'local'
+
+    def __init__(self, max_entries=1000, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (expira_en, tamaño, tags, valor)
+        self._tags = {}                # tag -> set(keys)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[3]
+
+    def set(self, key, value, ttl, tags=()):
+        size = len(_encode(value))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.time() + ttl, size, tuple(tags), value)
+            self._bytes += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        _, size, tags, _ = self._entries.pop(key)
+        self._bytes -= size
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def invalidate_tag(self, tag):
+        with self._lock:
+            keys = list(self._tags.get(tag, ()))
+            for key in keys:
+                if key in self._entries:
+                    self._remove(key)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes, 'tags': len(self._tags)}
+
+class RedisBackend:
+    """Backend compartido en Redis; las etiquetas se guardan como sets de claves"""
+
+    name = 'redis'
+
+    def __init__(self, url, key_prefix='ojs_rec:'):
+        self.client = redis.Redis.from_url(url)
+        self.key_prefix = key_prefix
+        self.client.ping()
+
+    def get(self, key):
+        raw = self.client.get(self.key_prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl, tags=()):
+        pipe = self.client.pipeline()
+        pipe.set(self.key_prefix + key, _encode(value), ex=ttl)
+        for tag in tags:
+            tag_key = f"{self.key_prefix}tag:{tag}"
+            pipe.sadd(tag_key, key)
+            pipe.expire(tag_key, ttl)
+        pipe.execute()
+
+    def invalidate_tag(self, tag):
+        tag_key = f"{self.key_prefix}tag:{tag}"
+        keys = self.client.smembers(tag_key)
+        if keys:
+            self.client.delete(*[self.key_prefix + key.decode('utf-8') for key in keys])
+        self.client.delete(tag_key)
+        return len(keys)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.key_prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+    def stats(self):
+        return {'entries': sum(1 for _ in self.client.scan_iter(match=self.key_prefix + '*'))}
+
+def create_backend(config=None):
+    """Backend según config; Redis no disponible -> LRU local"""
+    config = config or RESPONSE_CACHE_CONFIG
+    if config.get('backend') == 'redis':
+        if redis is None:
+            print("⚠️ redis no está instalado; caché de respuestas en memoria local")
+        else:
+            try:
+                return RedisBackend(config['redis_url'], config.get('key_prefix', 'ojs_rec:'))
+            except Exception as e:
+                print(f"⚠️ Redis no disponible ({e}); caché de respuestas en memoria local")
+    return LocalLRUBackend(config.get('max_entries', 1000), config.get('max_bytes', 64 * 1024 * 1024))
+
+# ================================
+# CACHÉ DE RESPUESTAS
+# ================================
+
+class ResponseCache:
+    """Caché por ruta y parámetros sobre un backend intercambiable"""
+
+    def __init__(self, backend=None, default_ttl=None, enabled=None):
+        self.backend = backend or create_backend()
+        self.default_ttl = default_ttl or RESPONSE_CACHE_CONFIG['default_ttl']
+        self.enabled = RESPONSE_CACHE_CONFIG['enabled'] if enabled is None else enabled
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, route, params=None):
+        """Clave de ruta + parámetros ordenados + día (los datos diarios cambian de clave a medianoche)"""
+        parts = [f"{name}={params[name]}" for name in sorted(params or {})]
+        return f"{date.today().isoformat()}|{route}?{'&'.join(parts)}"
+
+    def get_or_compute(self, route, params, compute, ttl=None, tags=None, cache_if=None):
+        """
+        Devolver la respuesta guardada o calcularla con compute() y guardarla
+        Las excepciones de compute() se propagan y no se guardan; cache_if(valor)
+        permite no guardar respuestas de error. tags por defecto: la fecha de cálculo de hoy
+        """
+        if not self.enabled:
+            return compute()
+
+        key = self.make_key(route, params)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        value = compute()
+        self._store(key, value, ttl, tags, cache_if)
+        return value
+
+    async def get_or_compute_async(self, route, params, compute, ttl=None, tags=None, cache_if=None):
+        """Igual que get_or_compute para endpoints async: compute() devuelve un awaitable"""
+        if not self.enabled:
+            return await compute()
+
+        key = self.make_key(route, params)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        value = await compute()
+        self._store(key, value, ttl, tags, cache_if)
+        return value
+
+    def _lookup(self, key):
+        try:
+            cached = self.backend.get(key)
+        except Exception as e:
+            print(f"⚠️ Error leyendo caché de respuestas: {e}")
+            cached = None
+
+        if cached is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return cached
+
+    def _store(self, key, value, ttl, tags, cache_if):
+        if cache_if is not None and not cache_if(value):
+            return
+        try:
+            self.backend.set(key, value, ttl or self.default_ttl, tags or [calculation_tag()])
+        except Exception as e:
+            print(f"⚠️ Error guardando en caché de respuestas: {e}")
+
+    def invalidate_calculation(self, calculation_date=None):
+        """Invalidar todas las respuestas etiquetadas con una fecha de cálculo"""
+        try:
+            removed = self.backend.invalidate_tag(calculation_tag(calculation_date))
+        except Exception as e:
+            print(f"⚠️ Error invalidando caché de respuestas: {e}")
+            return 0
+        if removed:
+            print(f"🧹 {removed} respuestas en caché invalidadas ({calculation_tag(calculation_date)})")
+        return removed
+
+    def clear(self):
+        self.backend.clear()
+
+    def get_info(self):
+        total = self.hits + self.misses
+        info = {
+            'enabled': self.enabled,
+            'backend': self.backend.name,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0
+        }
+        try:
+            info.update(self.backend.stats())
+        except Exception as e:
+            info['error'] = str(e)
+        return info
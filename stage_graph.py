@@ -0,0 +1,134 @@
+"""
+Grafo de Etapas
+Ejecuta las etapas de un cálculo según sus dependencias: cada etapa empieza en
+cuanto terminan las que necesita, y las independientes corren a la vez en hilos,
+cada una con su propia conexión del pool. Registra inicio, duración y estado de
+cada etapa para guardarlos junto al cálculo
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+class StageGraph:
+    """
+    Etapas con dependencias sobre un ThreadPoolExecutor
+    Una etapa falla si lanza una excepción o devuelve False; sus dependientes se
+    omiten salvo que la etapa sea opcional (required=False). Lo que devuelve cada
+    etapa queda en outputs[nombre] para las siguientes
+    """
+
+    def __init__(self, connection_factory=None):
+        self.connection_factory = connection_factory
+        self.stages = {}
+        self.outputs = {}
+        self.timings = {}
+        self.wall_seconds = None
+        self._lock = threading.Lock()
+
+    def add(self, name, func, depends_on=(), required=True, uses_connection=True):
+        """
+        Registrar una etapa; func(conn) si uses_connection, func() si no
+        Las dependencias deben estar registradas antes (así el grafo no tiene ciclos)
+        """
+        if name in self.stages:
+            raise ValueError(f"Etapa duplicada: {name}")
+        unknown = [dep for dep in depends_on if dep not in self.stages]
+        if unknown:
+            raise ValueError(f"Etapa {name} depende de etapas no registradas: {unknown}")
+        self.stages[name] = {
+            'func': func,
+            'depends_on': tuple(depends_on),
+            'required': required,
+            'uses_connection': uses_connection
+        }
+
+    def _execute(self, name, started):
+        stage = self.stages[name]
+        start = time.perf_counter()
+        status, error, output = 'ok', None, None
+        try:
+            if stage['uses_connection']:
+                with self.connection_factory() as conn:
+                    output = stage['func'](conn)
+            else:
+                output = stage['func']()
+            if output is False:
+                status = 'failed'
+        except Exception as e:
+            status, error = 'failed', str(e)
+            print(f"❌ Etapa {name} falló: {e}")
+
+        with self._lock:
+            self.outputs[name] = output
+            self.timings[name] = {
+                'status': status,
+                'start_offset': round(start - started, 3),
+                'duration': round(time.perf_counter() - start, 3),
+                'depends_on': list(stage['depends_on']),
+                'thread': threading.current_thread().name,
+                'error': error
+            }
+        return status
+
+    def _blocking_failure(self, name):
+        """Dependencia obligatoria fallida u omitida que impide correr la etapa"""
+        for dep in self.stages[name]['depends_on']:
+            dep_status = self.timings[dep]['status']
+            if dep_status == 'skipped' or (dep_status == 'failed' and self.stages[dep]['required']):
+                return dep
+        return None
+
+    def run(self, max_workers=4):
+        """Ejecutar todas las etapas; devuelve True si todas las obligatorias terminaron bien"""
+        started = time.perf_counter()
+        pending = list(self.stages)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='stage') as executor:
+            while pending or running:
+                for name in list(pending):
+                    if not all(dep in self.timings for dep in self.stages[name]['depends_on']):
+                        continue
+                    pending.remove(name)
+                    blocker = self._blocking_failure(name)
+                    if blocker is not None:
+                        print(f"⏭️ Etapa {name} omitida: {blocker} no terminó bien")
+                        self.timings[name] = {
+                            'status': 'skipped',
+                            'start_offset': None,
+                            'duration': 0.0,
+                            'depends_on': list(self.stages[name]['depends_on']),
+                            'thread': None,
+                            'error': f"Dependencia sin terminar: {blocker}"
+                        }
+                        continue
+                    running[executor.submit(self._execute, name, started)] = name
+
+                if not running:
+                    # Las omisiones pueden liberar más etapas pendientes
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    running.pop(future)
+
+        self.wall_seconds = round(time.perf_counter() - started, 3)
+        return all(
+            self.timings[name]['status'] == 'ok'
+            for name, stage in self.stages.items() if stage['required']
+        )
+
+    def failed_stages(self):
+        return [name for name, timing in self.timings.items() if timing['status'] == 'failed']
+
+    def get_metadata(self, max_workers=None):
+        """Tiempos por etapa para recommendation_system_status.metadata"""
+        stage_seconds = sum(timing['duration'] for timing in self.timings.values())
+        wall_seconds = self.wall_seconds
+        return {
+            'stages': {name: self.timings[name] for name in self.stages if name in self.timings},
+            'wall_seconds': wall_seconds,
+            'stage_seconds': round(stage_seconds, 3),
+            'parallel_speedup': round(stage_seconds / wall_seconds, 2) if wall_seconds else None,
+            'max_workers': max_workers
+        }